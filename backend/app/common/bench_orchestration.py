@@ -0,0 +1,57 @@
+"""Measure the per-request overhead of running work as a Prefect flow.
+
+Run from backend/app with the Prefect server (or an ephemeral API) available:
+    uv run python -m common.bench_orchestration --iterations 200
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+
+from prefect import flow, task
+
+
+@task(name="Benchmark Task")
+async def noop_task(text: str) -> str:
+    """Stand-in for a single LLM call."""
+    await asyncio.sleep(0)
+    return text
+
+
+@flow(name="Benchmark Flow")
+async def noop_flow(text: str) -> str:
+    """Flow wrapping the task the same way the services do."""
+    return await noop_task.fn(text)
+
+
+async def measure(label: str, call: Callable[[str], Awaitable[str]], iterations: int) -> list[float]:
+    """Time repeated calls and print latency percentiles in milliseconds."""
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await call("benchmark")
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    print(  # noqa: T201
+        f"{label:>8}: mean {statistics.mean(timings):8.2f} ms | "
+        f"p50 {timings[len(timings) // 2]:8.2f} ms | p95 {timings[int(len(timings) * 0.95) - 1]:8.2f} ms",
+    )
+    return timings
+
+
+async def main(iterations: int) -> None:
+    """Compare direct execution against recorded Prefect flow runs."""
+    await noop_flow("warmup")
+    direct = await measure("direct", noop_flow.fn, iterations)
+    prefect = await measure("prefect", noop_flow, iterations)
+    overhead = statistics.mean(prefect) - statistics.mean(direct)
+    print(f"Prefect overhead per request: {overhead:.2f} ms over {iterations} iterations")  # noqa: T201
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=100, help="Number of calls per mode")
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations))
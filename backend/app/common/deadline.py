@@ -0,0 +1,83 @@
+"""Request deadlines propagated between services through an HTTP header."""
+
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from .tracing import trace_headers
+
+# Absolute unix timestamp (seconds) after which nobody is waiting for the response
+DEADLINE_HEADER = "X-Request-Deadline"
+CLIENT_CLOSED_REQUEST = 499
+GATEWAY_TIMEOUT = 504
+
+
+class RequestAbandoned(Exception):  # noqa: N818
+    """The caller gave up on the request before it finished."""
+
+    def __init__(self, reason: str) -> None:
+        """Initialize with the reason: "deadline" or "disconnected"."""
+        super().__init__(f"Request abandoned: {reason}")
+        self.reason = reason
+
+
+@dataclass
+class RequestScope:
+    """Deadline and connection of the request currently being served."""
+
+    deadline: float | None = None
+    request: Request | None = None
+
+    def remaining(self) -> float | None:
+        """Seconds left until the deadline, if there is one."""
+        return None if self.deadline is None else self.deadline - time.time()
+
+    async def abandoned(self) -> str | None:
+        """Why nobody is waiting for the response anymore, or None if somebody is."""
+        if self.deadline is not None and time.time() >= self.deadline:
+            return "deadline"
+        if self.request is not None and await self.request.is_disconnected():
+            return "disconnected"
+        return None
+
+
+_current_scope: ContextVar[RequestScope] = ContextVar("request_scope", default=RequestScope())  # noqa: B039
+
+
+def parse_deadline(value: str | None) -> float | None:
+    """Read a deadline header value, ignoring malformed ones."""
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+async def request_scope(request: Request) -> RequestScope:
+    """FastAPI dependency that makes the request's deadline visible to the task code."""
+    scope = RequestScope(parse_deadline(request.headers.get(DEADLINE_HEADER)), request)
+    _current_scope.set(scope)
+    return scope
+
+
+def current_scope() -> RequestScope:
+    """Deadline and connection of the request being served."""
+    return _current_scope.get()
+
+
+def forward_headers(deadline: float | None = None) -> dict[str, str]:
+    """Headers that pass the current deadline and trace id on to a downstream service."""
+    deadline = current_scope().deadline if deadline is None else deadline
+    return {**trace_headers(), DEADLINE_HEADER: f"{deadline:.3f}"} if deadline is not None else trace_headers()
+
+
+def install_deadline_handling(app: FastAPI) -> None:
+    """Answer abandoned requests with 504 (deadline) or 499 (client went away)."""
+
+    async def handle_abandoned(_request: Request, exc: RequestAbandoned) -> JSONResponse:
+        status_code = GATEWAY_TIMEOUT if exc.reason == "deadline" else CLIENT_CLOSED_REQUEST
+        return JSONResponse(status_code=status_code, content={"detail": str(exc)})
+
+    app.add_exception_handler(RequestAbandoned, handle_abandoned)
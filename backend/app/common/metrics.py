@@ -0,0 +1,95 @@
+"""Prometheus metrics shared by the services, exposed on GET /metrics."""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from fastapi import FastAPI, Request, Response
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+METRICS_PATH = "/metrics"
+# LLM calls take seconds to minutes, so the buckets reach past the services' 300 s timeout
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+SEARCH_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+NS_PER_SECOND = 1_000_000_000
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Time to serve a request, until its body is sent", ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "Requests being served")
+UPSTREAM_SECONDS = Histogram(
+    "upstream_request_duration_seconds", "Time of calls to other services", ["upstream", "operation"], buckets=LATENCY_BUCKETS,
+)
+UPSTREAM_ERRORS = Counter("upstream_errors_total", "Failed or abandoned calls to other services", ["upstream", "operation", "error"])
+LLM_PHASE_SECONDS = Histogram(
+    "ollama_phase_duration_seconds", "Model load, prompt prefill and generation time reported by Ollama", ["model", "phase"], buckets=LATENCY_BUCKETS,
+)
+LLM_TOKENS = Counter("ollama_tokens_total", "Prompt and generated tokens", ["model", "kind"])
+SEARCH_STAGE_SECONDS = Histogram("search_stage_duration_seconds", "Query embedding and knn lookup time", ["index", "stage"], buckets=SEARCH_BUCKETS)
+INDEX_BUILD_SECONDS = Gauge("index_build_seconds", "Time the last index build took", ["index"])
+INDEX_DOCUMENTS = Gauge("index_documents", "Documents in the index", ["index"])
+
+
+@contextmanager
+def track_upstream(upstream: str, operation: str) -> Iterator[None]:
+    """Time a call to another service, counting it as an error by exception type if it raises."""
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException as e:
+        UPSTREAM_ERRORS.labels(upstream, operation, type(e).__name__).inc()
+        raise
+    finally:
+        UPSTREAM_SECONDS.labels(upstream, operation).observe(time.perf_counter() - start)
+
+
+def observe_generation(body: dict, model: str | None) -> None:
+    """Record the phase durations and token counts of a finished Ollama generation."""
+    model = model or "unknown"
+    for phase, key in (("load", "load_duration"), ("prefill", "prompt_eval_duration"), ("generation", "eval_duration")):
+        LLM_PHASE_SECONDS.labels(model, phase).observe(body.get(key, 0) / NS_PER_SECOND)
+    LLM_TOKENS.labels(model, "prompt").inc(body.get("prompt_eval_count", 0))
+    LLM_TOKENS.labels(model, "generated").inc(body.get("eval_count", 0))
+
+
+class MetricsMiddleware:
+    """ASGI middleware counting requests in flight and timing each one by its route template."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        """Wrap the application."""
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Serve the request, recording its latency once the response is complete."""
+        if scope["type"] != "http" or scope["path"] == METRICS_PATH:
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            # The route template rather than the raw path keeps the label set small
+            route = getattr(scope.get("route"), "path", "unmatched")
+            REQUEST_SECONDS.labels(scope["method"], route, str(status)).observe(time.perf_counter() - start)
+
+
+async def metrics_endpoint(_request: Request) -> Response:
+    """Return the current values of every metric in the Prometheus text format."""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+def install_metrics(app: FastAPI) -> None:
+    """Time every request of the app and serve the metrics on GET /metrics."""
+    app.add_middleware(MetricsMiddleware)
+    app.add_route(METRICS_PATH, metrics_endpoint, methods=["GET"], include_in_schema=False)
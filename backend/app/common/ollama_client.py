@@ -0,0 +1,122 @@
+"""Ollama generate calls that stop as soon as the caller gives up."""
+
+import asyncio
+import json
+import time
+from datetime import UTC, datetime
+
+import httpx
+
+from .deadline import RequestAbandoned, current_scope
+from .metrics import observe_generation, track_upstream
+from .telemetry import TelemetryQueue
+from .tracing import record_span
+
+POLL_INTERVAL = 0.5
+# Model loads slower than this are counted as cold starts
+COLD_LOAD_SECONDS = 1.0
+NS_PER_SECOND = 1_000_000_000
+NS_PER_MS = 1_000_000
+
+
+class GenerationStats:
+    """Counters for cold model loads and generations cancelled because nobody was waiting."""
+
+    def __init__(self) -> None:
+        """Initialize all counters at zero."""
+        self.abandoned = 0
+        self.wasted_generation_seconds = 0.0
+        self.cold_loads = 0
+        self.cold_load_seconds = 0.0
+
+    def record_load(self, body: dict) -> None:
+        """Count the generation as a cold start if Ollama had to load the model for it."""
+        load_seconds = body.get("load_duration", 0) / NS_PER_SECOND
+        if load_seconds >= COLD_LOAD_SECONDS:
+            self.cold_loads += 1
+            self.cold_load_seconds += load_seconds
+
+    def stats(self) -> dict[str, float]:
+        """Counters as a flat dict."""
+        return {
+            "abandoned_generations": self.abandoned,
+            "wasted_generation_seconds": round(self.wasted_generation_seconds, 3),
+            "cold_loads": self.cold_loads,
+            "cold_load_seconds": round(self.cold_load_seconds, 3),
+        }
+
+
+generation_stats = GenerationStats()
+
+
+def record_generation_spans(body: dict, task: str, model: str | None, elapsed_ms: float) -> None:
+    """Log the call and the model load, prompt prefill and token generation times Ollama reports."""
+    fields = {"task": task, "model": model}
+    record_span("llm.load", body.get("load_duration", 0) / NS_PER_MS, **fields)
+    record_span("llm.prefill", body.get("prompt_eval_duration", 0) / NS_PER_MS, tokens=body.get("prompt_eval_count", 0), **fields)
+    record_span("llm.generation", body.get("eval_duration", 0) / NS_PER_MS, tokens=body.get("eval_count", 0), **fields)
+    record_span("llm.call", elapsed_ms, **fields)
+
+
+async def _stream(url: str, payload: dict, timeout_seconds: float) -> dict:
+    """Stream one generation and merge the chunks into a single response body."""
+    parts, final = [], {}
+    async with httpx.AsyncClient(timeout=timeout_seconds) as client, client.stream("POST", url, json={**payload, "stream": True}) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line:
+                continue
+            chunk = json.loads(line)
+            parts.append(chunk.get("response", ""))
+            if chunk.get("done"):
+                final = chunk
+                break
+    return {**final, "response": "".join(parts)}
+
+
+async def generate(
+    url: str, payload: dict, *, timeout_seconds: float = 300.0, telemetry: TelemetryQueue | None = None, task: str = "generation",
+) -> dict:
+    """Run an Ollama generation, cancelling the upstream stream if the request deadline passes or the client leaves."""
+    with track_upstream("ollama", task):
+        return await _generate(url, payload, timeout_seconds, telemetry, task)
+
+
+async def _generate(url: str, payload: dict, timeout_seconds: float, telemetry: TelemetryQueue | None, task: str) -> dict:
+    """Poll the generation until it finishes or nobody is waiting for it anymore."""
+    scope = current_scope()
+    reason = await scope.abandoned()
+    if reason:
+        raise RequestAbandoned(reason)
+
+    start = time.perf_counter()
+    stream = asyncio.ensure_future(_stream(url, payload, timeout_seconds))
+    try:
+        while True:
+            remaining = scope.remaining()
+            interval = POLL_INTERVAL if remaining is None else max(0.0, min(POLL_INTERVAL, remaining))
+            done, _ = await asyncio.wait({stream}, timeout=interval)
+            if done:
+                body = stream.result()
+                generation_stats.record_load(body)
+                observe_generation(body, payload.get("model"))
+                record_generation_spans(body, task, payload.get("model"), (time.perf_counter() - start) * 1000)
+                return body
+            reason = await scope.abandoned()
+            if reason:
+                break
+    finally:
+        # Closing the connection makes Ollama stop generating
+        stream.cancel()
+
+    wasted = time.perf_counter() - start
+    generation_stats.abandoned += 1
+    generation_stats.wasted_generation_seconds += wasted
+    if telemetry is not None:
+        telemetry.record(
+            task=f"{task}_abandoned",
+            run_name=f"{task}_abandoned_{datetime.now(UTC).isoformat()}",
+            params={"model": payload.get("model"), "reason": reason},
+            metrics={"wasted_generation_seconds": wasted},
+        )
+    raise RequestAbandoned(reason)
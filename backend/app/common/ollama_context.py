@@ -0,0 +1,105 @@
+"""Per-conversation cache of the context tokens returned by Ollama."""
+
+import hashlib
+import time
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+
+FOLLOWUP_PROMPT = (
+    "The conversation continues with the turns below. Re-evaluate the whole conversation so far "
+    "and answer again in exactly the same output format, do not add anything else.\n\n{input}"
+)
+
+
+def followup_prompt(new_turns: list[str]) -> str:
+    """Build the prompt sent on top of a cached context."""
+    return FOLLOWUP_PROMPT.replace("{input}", "\n\n".join(new_turns))
+
+
+def fingerprint(model: str, template: str) -> str:
+    """Identify the model and prompt template a context was built with."""
+    return hashlib.sha256(f"{model}\0{template}".encode()).hexdigest()
+
+
+@dataclass
+class ContextEntry:
+    """Ollama context of one conversation and prompt type."""
+
+    fingerprint: str
+    context: array
+    turn_count: int
+    response: str
+    last_used: float
+
+    def tokens(self) -> list[int]:
+        """Return the context in the form the Ollama API expects."""
+        return self.context.tolist()
+
+
+class OllamaContextCache:
+    """Bounded LRU cache of Ollama contexts keyed by conversation id and prompt type."""
+
+    def __init__(self, max_tokens: int = 2_000_000, max_idle_seconds: float = 1800.0) -> None:
+        """Initialize the cache with a total token budget and an idle timeout."""
+        self.max_tokens = max_tokens
+        self.max_idle_seconds = max_idle_seconds
+        self.total_tokens = 0
+        self._entries: OrderedDict[tuple[str, str], ContextEntry] = OrderedDict()
+
+    def lookup(
+        self, conversation_id: str | None, prompt_type: str, model: str, template: str, turns: list[str] | None,
+    ) -> ContextEntry | None:
+        """Return a context that covers a prefix of the given turns, if one is cached."""
+        if not conversation_id or not turns:
+            return None
+        key = (conversation_id, prompt_type)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if (
+            entry.fingerprint != fingerprint(model, template)
+            or entry.turn_count > len(turns)
+            or time.monotonic() - entry.last_used > self.max_idle_seconds
+        ):
+            self._discard(key)
+            return None
+        entry.last_used = time.monotonic()
+        self._entries.move_to_end(key)
+        return entry
+
+    def store(  # noqa: PLR0913
+        self,
+        conversation_id: str | None,
+        prompt_type: str,
+        *,
+        model: str,
+        template: str,
+        turns: list[str] | None,
+        context: list[int] | None,
+        response: str,
+    ) -> None:
+        """Remember the context Ollama returned for a conversation."""
+        if not conversation_id or not turns or not context:
+            return
+        key = (conversation_id, prompt_type)
+        self._discard(key)
+        entry = ContextEntry(fingerprint(model, template), array("i", context), len(turns), response, time.monotonic())
+        self._entries[key] = entry
+        self.total_tokens += len(entry.context)
+        self._evict()
+
+    def _discard(self, key: tuple[str, str]) -> None:
+        """Remove one entry and release its tokens from the budget."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total_tokens -= len(entry.context)
+
+    def _evict(self) -> None:
+        """Drop idle conversations, then the least recently used ones until within budget."""
+        now = time.monotonic()
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if now - entry.last_used <= self.max_idle_seconds and self.total_tokens <= self.max_tokens:
+                break
+            self._discard(key)
@@ -0,0 +1,39 @@
+"""Run service flows directly or as recorded Prefect flow runs."""
+
+import random
+from typing import Any, Literal
+
+from prefect import Flow
+
+
+class FlowDispatcher:
+    """Decide per request whether a flow is recorded in Prefect or just executed.
+
+    Modes:
+        prefect: every request creates a Prefect flow run.
+        sampled: batch jobs and a random fraction of interactive requests create flow runs.
+        direct: the flow function is always called directly.
+    """
+
+    def __init__(self, mode: Literal["prefect", "sampled", "direct"] = "sampled", sample_rate: float = 0.05) -> None:
+        """Initialize the dispatcher with an execution mode and sample rate."""
+        self.mode = mode
+        self.sample_rate = sample_rate
+        self.recorded = 0
+        self.direct = 0
+
+    def should_record(self, *, batch: bool = False) -> bool:
+        """Whether this request should go through Prefect orchestration."""
+        if self.mode == "prefect":
+            return True
+        if self.mode == "direct":
+            return False
+        return batch or random.random() < self.sample_rate  # noqa: S311
+
+    async def run(self, flow: Flow, *args: Any, batch: bool = False, **kwargs: Any) -> Any:  # noqa: ANN401
+        """Run a flow, bypassing Prefect's run tracking unless the request is recorded."""
+        if self.should_record(batch=batch):
+            self.recorded += 1
+            return await flow(*args, **kwargs)
+        self.direct += 1
+        return await flow.fn(*args, **kwargs)
@@ -0,0 +1,79 @@
+"""Pick a model per request from input size, task type and current load."""
+
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import NamedTuple
+
+from .tokens import count_tokens
+
+
+@dataclass
+class Route:
+    """A model and the conditions under which requests are sent to it."""
+
+    name: str
+    model: str
+    tasks: list[str] | None = None
+    max_input_tokens: int | None = None
+    max_queue_depth: int | None = None
+
+    def matches(self, task: str, input_tokens: int, queue_depth: int) -> bool:
+        """Whether a request fits this route."""
+        return (
+            (self.tasks is None or task in self.tasks)
+            and (self.max_input_tokens is None or input_tokens <= self.max_input_tokens)
+            and (self.max_queue_depth is None or queue_depth < self.max_queue_depth)
+        )
+
+
+class RouteDecision(NamedTuple):
+    """The route chosen for one request."""
+
+    route: str
+    model: str
+    input_tokens: int
+    queue_depth: int
+
+    def params(self) -> dict:
+        """Decision fields as MLflow params."""
+        return {f"route_{key}": value for key, value in self._asdict().items()}
+
+
+@dataclass
+class RouteTiming:
+    """Latency of one routed call."""
+
+    start: float
+    elapsed_ms: float = 0.0
+
+
+class ModelRouter:
+    """Choose the first matching route, falling back to the service's configured model."""
+
+    def __init__(self, default_model: str, routes: list[dict] | None = None) -> None:
+        """Initialize the router with a default model and ordered routing rules."""
+        self.default = Route(name="default", model=default_model)
+        self.routes = [Route(**route) for route in routes or []]
+        self.in_flight: Counter[str] = Counter()
+
+    def select(self, task: str, text: str) -> RouteDecision:
+        """Pick a model for a request of the given task and input text."""
+        input_tokens = count_tokens(text)
+        for route in self.routes:
+            if route.matches(task, input_tokens, self.in_flight[route.model]):
+                return RouteDecision(route.name, route.model, input_tokens, self.in_flight[route.model])
+        return RouteDecision(self.default.name, self.default.model, input_tokens, self.in_flight[self.default.model])
+
+    @contextmanager
+    def track(self, decision: RouteDecision) -> Iterator[RouteTiming]:
+        """Count the request as in flight on its model and time it."""
+        timing = RouteTiming(start=time.perf_counter())
+        self.in_flight[decision.model] += 1
+        try:
+            yield timing
+        finally:
+            self.in_flight[decision.model] -= 1
+            timing.elapsed_ms = (time.perf_counter() - timing.start) * 1000
@@ -0,0 +1,163 @@
+"""Background MLflow logging that keeps tracking I/O off the request path."""
+
+import atexit
+import queue
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+
+from loguru import logger
+from mlflow.entities import Metric, Param
+from mlflow.tracking import MlflowClient
+
+from .tracing import current_trace_id, record_span
+
+
+@dataclass
+class TelemetryRecord:
+    """One MLflow run waiting to be written."""
+
+    task: str
+    run_name: str
+    params: dict = field(default_factory=dict)
+    metrics: dict = field(default_factory=dict)
+    tags: dict = field(default_factory=dict)
+    artifacts: dict[str, str] = field(default_factory=dict)
+    timestamp_ms: int = field(default_factory=lambda: int(time.time() * 1000))
+    # Trace of the request that produced the run; the write happens later on the flush thread
+    trace_id: str = field(default_factory=current_trace_id)
+
+
+class TelemetryQueue:
+    """Bounded queue of MLflow runs flushed in batches by a daemon thread."""
+
+    def __init__(  # noqa: PLR0913
+        self,
+        experiment: str,
+        *,
+        sample_rates: dict[str, float] | None = None,
+        default_sample_rate: float = 1.0,
+        max_queue: int = 1000,
+        batch_size: int = 50,
+        flush_interval: float = 2.0,
+        max_artifact_chars: int = 100_000,
+    ) -> None:
+        """Initialize the queue for one MLflow experiment."""
+        self.experiment = experiment
+        self.sample_rates = sample_rates or {}
+        self.default_sample_rate = default_sample_rate
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_artifact_chars = max_artifact_chars
+        self.dropped = 0
+        self.sampled_out = 0
+        self.logged = 0
+        self.failed = 0
+        self._queue: queue.Queue[TelemetryRecord] = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        atexit.register(self.close)
+
+    def record(  # noqa: PLR0913
+        self,
+        task: str,
+        run_name: str,
+        *,
+        params: dict | None = None,
+        metrics: dict | None = None,
+        tags: dict | None = None,
+        artifacts: dict[str, str] | None = None,
+    ) -> None:
+        """Queue a run without blocking; drop it if sampled out or the queue is full."""
+        if random.random() >= self.sample_rates.get(task, self.default_sample_rate):  # noqa: S311
+            self.sampled_out += 1
+            return
+        record = TelemetryRecord(
+            task=task,
+            run_name=run_name,
+            params=params or {},
+            metrics=metrics or {},
+            tags=tags or {},
+            artifacts={name: text[: self.max_artifact_chars] for name, text in (artifacts or {}).items()},
+        )
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return
+        self._ensure_worker()
+
+    def stats(self) -> dict[str, int]:
+        """Counters describing what happened to recorded runs."""
+        return {
+            "queued": self._queue.qsize(),
+            "logged": self.logged,
+            "dropped": self.dropped,
+            "sampled_out": self.sampled_out,
+            "failed": self.failed,
+        }
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Give the worker a bounded amount of time to drain the queue."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline and self._thread is not None:
+            time.sleep(0.05)
+
+    def _ensure_worker(self) -> None:
+        """Start the flush thread on first use."""
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._worker, name=f"telemetry-{self.experiment}", daemon=True)
+                self._thread.start()
+
+    def _next_batch(self) -> list[TelemetryRecord]:
+        """Wait for one record, then collect more until the batch is full or the interval passes."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _worker(self) -> None:
+        """Flush batches of runs to MLflow forever."""
+        client = MlflowClient()
+        experiment_id = None
+        while True:
+            batch = self._next_batch()
+            for record in batch:
+                try:
+                    if experiment_id is None:
+                        experiment = client.get_experiment_by_name(self.experiment)
+                        experiment_id = experiment.experiment_id if experiment else client.create_experiment(self.experiment)
+                    self._write(client, experiment_id, record)
+                except Exception:  # noqa: BLE001
+                    logger.exception("Failed to write telemetry run {} to MLflow", record.run_name)
+                    self.failed += 1
+                finally:
+                    self._queue.task_done()
+
+    def _write(self, client: MlflowClient, experiment_id: str, record: TelemetryRecord) -> None:
+        """Write one run with a single batched params/metrics call, logging the time taken as a span."""
+        start = time.perf_counter()
+        tags = {"task": record.task, **({"trace_id": record.trace_id} if record.trace_id else {}), **record.tags}
+        run = client.create_run(experiment_id, start_time=record.timestamp_ms, tags=tags, run_name=record.run_name)
+        run_id = run.info.run_id
+        client.log_batch(
+            run_id,
+            metrics=[Metric(key, float(value), record.timestamp_ms, 0) for key, value in record.metrics.items()],
+            params=[Param(key, str(value)) for key, value in record.params.items()],
+        )
+        for name, text in record.artifacts.items():
+            client.log_text(run_id, text, name)
+        client.set_terminated(run_id)
+        self.logged += 1
+        record_span("mlflow.log", (time.perf_counter() - start) * 1000, trace_id=record.trace_id, task=record.task)
@@ -0,0 +1,21 @@
+"""Approximate token counting without a model tokenizer."""
+
+import re
+
+# Words and individual punctuation marks; close to LLaMA-style token counts for English chat text
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+def count_tokens(text: str) -> int:
+    """Estimate the number of tokens in a text."""
+    return sum(1 for _ in TOKEN_PATTERN.finditer(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut a text after its first max_tokens tokens."""
+    if max_tokens <= 0:
+        return ""
+    for i, match in enumerate(TOKEN_PATTERN.finditer(text), start=1):
+        if i == max_tokens:
+            return text[: match.end()]
+    return text
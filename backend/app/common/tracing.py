@@ -0,0 +1,174 @@
+"""Trace ids propagated between services and timing spans shipped to the unified log server as JSON."""
+
+import atexit
+import json
+import os
+import secrets
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import UTC, datetime
+
+import zmq
+from fastapi import FastAPI
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Identifies one user action (e.g. a "Get insights" click) across every service it reaches
+TRACE_HEADER = "X-Trace-Id"
+# The unified log server; set to an empty string to turn span shipping off
+LOG_SERVER_ADDRESS = os.environ.get("LOG_SERVER_ADDRESS", "tcp://127.0.0.1:9999")
+MAX_TRACE_ID_LENGTH = 64
+
+_trace_id: ContextVar[str] = ContextVar("trace_id", default="")
+
+
+def new_trace_id() -> str:
+    """Return a random trace id."""
+    return secrets.token_hex(8)
+
+
+def current_trace_id() -> str:
+    """Trace id of the request being served, or "" outside a traced request."""
+    return _trace_id.get()
+
+
+def trace_headers() -> dict[str, str]:
+    """Headers that pass the current trace id on to a downstream service."""
+    trace_id = _trace_id.get()
+    return {TRACE_HEADER: trace_id} if trace_id else {}
+
+
+class SpanShipper:
+    """Buffers span records and sends them in batches over a PUSH socket, never blocking the caller.
+
+    Uses the unified logging wire format (alternating level and text frames), which the
+    service images cannot import, so the server writes each record as one JSON line.
+    """
+
+    def __init__(self, address: str, buffer_size: int = 10000, batch_size: int = 256, flush_interval: float = 0.5) -> None:
+        """Connect the socket lazily from the shipping thread."""
+        self.address = address
+        self.buffer_size = buffer_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.service = "unknown"
+        self.sent = 0
+        self.dropped = 0
+        self._buffer: deque[str] = deque()
+        self._lock = threading.Lock()
+        # ZeroMQ sockets are not thread safe and atexit flushes from the main thread
+        self._send_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        atexit.register(self.flush)
+
+    def emit(self, record: dict) -> None:
+        """Queue one record, dropping it if the buffer is full or shipping is off."""
+        if not self.address:
+            return
+        line = json.dumps(record, default=str)
+        with self._lock:
+            if len(self._buffer) >= self.buffer_size:
+                self.dropped += 1
+                return
+            self._buffer.append(line)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="span-shipper", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        """Send whatever was buffered every flush interval."""
+        self._socket = zmq.Context.instance().socket(zmq.PUSH)
+        self._socket.setsockopt(zmq.SNDHWM, 1000)
+        self._socket.setsockopt(zmq.LINGER, 1000)  # Do not hold up exit when the server is down
+        self._socket.connect(self.address)
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def flush(self) -> None:
+        """Send the buffered records a batch at a time."""
+        socket = getattr(self, "_socket", None)
+        with self._send_lock:
+            while socket is not None:
+                with self._lock:
+                    batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+                if not batch:
+                    return
+                try:
+                    socket.send_multipart([frame for line in batch for frame in (b"INFO", line.encode())], flags=zmq.NOBLOCK)
+                except zmq.Again:
+                    self.dropped += len(batch)
+                else:
+                    self.sent += len(batch)
+
+    def stats(self) -> dict[str, int]:
+        """Span records sent, dropped and still buffered."""
+        return {"spans_sent": self.sent, "spans_dropped": self.dropped, "spans_buffered": len(self._buffer)}
+
+
+shipper = SpanShipper(LOG_SERVER_ADDRESS)
+
+
+def record_span(name: str, duration_ms: float, *, trace_id: str | None = None, **fields: object) -> None:
+    """Log one finished span of the current request (or of `trace_id`) with its duration."""
+    shipper.emit({
+        "time": datetime.now(UTC).isoformat(timespec="milliseconds"),
+        "level": "INFO",
+        "service": shipper.service,
+        "trace_id": _trace_id.get() if trace_id is None else trace_id,
+        "span": name,
+        "duration_ms": round(duration_ms, 3),
+        **fields,
+    })
+
+
+@contextmanager
+def span(name: str, **fields: object) -> Iterator[dict]:
+    """Time the block as a span; fields added to the yielded dict are logged with it."""
+    start = time.perf_counter()
+    try:
+        yield fields
+    finally:
+        record_span(name, (time.perf_counter() - start) * 1000, **fields)
+
+
+class TraceMiddleware:
+    """ASGI middleware that adopts or creates the request's trace id and logs a span per request."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        """Wrap the application."""
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Serve the request inside its trace, timing it until the response body is sent."""
+        # Prometheus scrapes are not part of any user action
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+        incoming = dict(scope["headers"]).get(TRACE_HEADER.lower().encode(), b"").decode("latin-1")
+        trace_id = incoming[:MAX_TRACE_ID_LENGTH] or new_trace_id()
+        token = _trace_id.set(trace_id)
+        status = 500
+
+        async def send_with_trace(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [*message.get("headers", []), (TRACE_HEADER.lower().encode(), trace_id.encode("latin-1"))]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_trace)
+        finally:
+            record_span("request", (time.perf_counter() - start) * 1000, method=scope["method"], path=scope["path"], status=status)
+            _trace_id.reset(token)
+
+
+def install_tracing(app: FastAPI, service: str) -> None:
+    """Trace every request of the app and name the service in its span records."""
+    shipper.service = service
+    app.add_middleware(TraceMiddleware)
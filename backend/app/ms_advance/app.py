@@ -1,28 +1,45 @@
 """Micro-skill evaluation FastAPI application."""
 
-from fastapi import FastAPI
+from typing import Annotated
+
+from common.deadline import install_deadline_handling, request_scope
+from common.metrics import install_metrics
+from common.ollama_client import generation_stats
+from common.tracing import install_tracing
+from fastapi import Depends, FastAPI, Header
 from prefect import flow
 from pydantic import BaseModel
 
-from ms_advance import evaluate_conversation
+from ms_advance import dispatcher, evaluate_conversation, telemetry
 
-app = FastAPI(title="Micro-Skill Evaluation", version="1.0")
+app = FastAPI(title="Micro-Skill Evaluation", version="1.0", dependencies=[Depends(request_scope)])
+install_deadline_handling(app)
+install_metrics(app)
+install_tracing(app, "ms_advance")
 
 
 class InputData(BaseModel):
     """Request body model for conversation input."""
 
     conversation: str
+    conversation_id: str | None = None
+    turns: list[str] | None = None
 
 
 @flow(name="MicroSkill Evaluation Flow")
-async def run_micro_skill_eval(convo: str) -> str:
+async def run_micro_skill_eval(convo: str, conversation_id: str | None = None, turns: list[str] | None = None) -> str:
     """Run micro-skill evaluation."""
-    return await evaluate_conversation.fn(convo)
+    return await evaluate_conversation.fn(convo, conversation_id, turns)
 
 
 @app.post("/ms-advance")
-async def micro_skill_endpoint(data: InputData) -> dict[str, str]:
+async def micro_skill_endpoint(data: InputData, x_batch_job: Annotated[bool, Header()] = False) -> dict[str, str]:  # noqa: FBT002
     """Evaluate micro-skills endpoint."""
-    result = await run_micro_skill_eval(data.conversation)
+    result = await dispatcher.run(run_micro_skill_eval, data.conversation, data.conversation_id, data.turns, batch=x_batch_job)
     return {"evaluation": result}
+
+
+@app.get("/telemetry")
+async def telemetry_stats() -> dict[str, float]:
+    """Report background MLflow logging and abandoned generation counters."""
+    return {**telemetry.stats(), **generation_stats.stats()}
@@ -3,9 +3,12 @@
 from datetime import UTC, datetime
 from pathlib import Path
 
-import httpx
-import mlflow
 import yaml
+from common.ollama_client import generate
+from common.ollama_context import OllamaContextCache, followup_prompt
+from common.orchestration import FlowDispatcher
+from common.routing import ModelRouter
+from common.telemetry import TelemetryQueue
 from prefect import task
 
 # Load configuration
@@ -15,34 +18,58 @@ with conf_path.open("r") as file:
 
 LLM_API_URL = config["llm"]["api_url"]
 MODEL_NAME = config["llm"]["model_name"]
+KEEP_ALIVE = config["llm"].get("keep_alive", "30m")
 BASE_PROMPT = config["llm"]["prompt"]
+context_cache = OllamaContextCache(**config.get("context_cache", {}))
+router = ModelRouter(MODEL_NAME, config.get("routing", {}).get("routes"))
 
-# Configure MLflow
-mlflow.set_experiment("micro-skill-evaluation-experiments")
+# Configure MLflow, flushed off the request path
+telemetry = TelemetryQueue("micro-skill-evaluation-experiments", **config.get("telemetry", {}))
+
+# Prefect flow runs are only recorded for batch jobs and a sample of interactive requests
+dispatcher = FlowDispatcher(**config.get("orchestration", {}))
 
 
 @task(name="Evaluate Micro Skills Conversation")
-async def evaluate_conversation(conversation: str) -> str:
+async def evaluate_conversation(conversation: str, conversation_id: str | None = None, turns: list[str] | None = None) -> str:
     """Evaluate a conversation and log metrics to MLflow."""
+    decision = router.select("micro_skill_evaluation", conversation)
     full_prompt = f"{BASE_PROMPT}\n\nConversation:\n{conversation}"
 
     payload = {
-        "model": MODEL_NAME,
+        "model": decision.model,
         "prompt": full_prompt,
         "stream": False,
+        "keep_alive": KEEP_ALIVE,
     }
 
-    async with httpx.AsyncClient(timeout=300) as client:
-        response = await client.post(LLM_API_URL, json=payload)
-        response.raise_for_status()
-        result = response.json()["response"]
+    # Reuse the KV context of earlier calls in this conversation and only send the new turns
+    cached = context_cache.lookup(conversation_id, "micro_skills", decision.model, BASE_PROMPT, turns)
+    if cached is not None and cached.turn_count == len(turns):
+        return cached.response
+    if cached is not None:
+        payload |= {"prompt": followup_prompt(turns[cached.turn_count:]), "context": cached.tokens()}
+
+    with router.track(decision) as timing:
+        body = await generate(LLM_API_URL, payload, timeout_seconds=300, telemetry=telemetry, task="micro_skill_evaluation")
+    result = body["response"]
+    context_cache.store(
+        conversation_id, "micro_skills", model=decision.model, template=BASE_PROMPT, turns=turns, context=body.get("context"), response=result,
+    )
 
-        run_name = f"ms_eval_{datetime.now(UTC).isoformat()}"
-        with mlflow.start_run(run_name=run_name):
-            mlflow.log_param("model", MODEL_NAME)
-            mlflow.log_param("input_length", len(conversation))
-            mlflow.log_param("output_length", len(result))
-            mlflow.set_tag("task", "micro_skill_evaluation")
-            mlflow.log_text(result, "ms_eval_output.txt")
+    telemetry.record(
+        task="micro_skill_evaluation",
+        run_name=f"ms_eval_{datetime.now(UTC).isoformat()}",
+        params={
+            "model": decision.model,
+            "input_length": len(conversation),
+            "context_reused": cached is not None,
+            "output_length": len(result),
+            **decision.params(),
+        },
+        metrics={"latency_ms": timing.elapsed_ms},
+        tags={"route": decision.route},
+        artifacts={"ms_eval_output.txt": result},
+    )
 
-        return result
+    return result
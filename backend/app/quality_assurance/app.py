@@ -1,33 +1,51 @@
 """FastAPI service to evaluate QA policy compliance using Prefect and an external LLM."""
 
 import traceback
+from typing import Annotated
 
-from fastapi import FastAPI, HTTPException
+from common.deadline import install_deadline_handling, request_scope
+from common.metrics import install_metrics
+from common.ollama_client import generation_stats
+from common.tracing import install_tracing
+from fastapi import Depends, FastAPI, Header, HTTPException
 from prefect import flow
 from pydantic import BaseModel
 
-from quality_assurance import evaluate_response
+from quality_assurance import dispatcher, evaluate_response, telemetry
 
-app = FastAPI(title="QA Policy Evaluation", version="1.0")
+app = FastAPI(title="QA Policy Evaluation", version="1.0", dependencies=[Depends(request_scope)])
+install_deadline_handling(app)
+install_metrics(app)
+install_tracing(app, "quality_assurance")
 
 class QARequest(BaseModel):
     """Request body model for agent response input."""
 
     agent_response: str
+    conversation_id: str | None = None
+    turns: list[str] | None = None
 
 
 @flow(name="QA Evaluation Flow")
-async def run_evaluation(text: str) -> str:
+async def run_evaluation(text: str, conversation_id: str | None = None, turns: list[str] | None = None) -> str:
     """Run the QA evaluation flow using Prefect."""
-    return await evaluate_response.fn(text)
+    return await evaluate_response.fn(text, conversation_id, turns)
 
 
 @app.post("/evaluate")
-async def evaluate_qa(request: QARequest) -> dict[str, str]:
+async def evaluate_qa(request: QARequest, x_batch_job: Annotated[bool, Header()] = False) -> dict[str, str]:  # noqa: FBT002
     """Evaluate an conversation and return policy compliance."""
     try:
-        result = await run_evaluation(request.agent_response)
+        result = await dispatcher.run(
+            run_evaluation, request.agent_response, request.conversation_id, request.turns, batch=x_batch_job,
+        )
     except HTTPException:
         traceback.print_exc()
     else:
         return {"evaluation": result}
+
+
+@app.get("/telemetry")
+async def telemetry_stats() -> dict[str, float]:
+    """Report background MLflow logging and abandoned generation counters."""
+    return {**telemetry.stats(), **generation_stats.stats()}
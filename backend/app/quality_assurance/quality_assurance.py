@@ -3,9 +3,12 @@
 from datetime import UTC, datetime
 from pathlib import Path
 
-import httpx
-import mlflow
 import yaml
+from common.ollama_client import generate
+from common.ollama_context import OllamaContextCache, followup_prompt
+from common.orchestration import FlowDispatcher
+from common.routing import ModelRouter
+from common.telemetry import TelemetryQueue
 from prefect import task
 
 # Load YAML config
@@ -16,33 +19,58 @@ with CONFIG_PATH.open() as f:
 # Config values
 OLLAMA_URL = config["ollama"]["base_url"]
 MODEL = config["ollama"]["model"]
+KEEP_ALIVE = config["ollama"].get("keep_alive", "30m")
 PROMPT_TEMPLATE = config["qa_policy"]["prompt"]
+context_cache = OllamaContextCache(**config.get("context_cache", {}))
+router = ModelRouter(MODEL, config.get("routing", {}).get("routes"))
 
-# Set MLflow Tracking
-mlflow.set_experiment("qa-evaluation-experiments")
+# MLflow tracking, flushed off the request path
+telemetry = TelemetryQueue("qa-evaluation-experiments", **config.get("telemetry", {}))
+
+# Prefect flow runs are only recorded for batch jobs and a sample of interactive requests
+dispatcher = FlowDispatcher(**config.get("orchestration", {}))
 
 
 @task(name="Evaluate QA Response")
-async def evaluate_response(agent_response: str) -> str:
+async def evaluate_response(agent_response: str, conversation_id: str | None = None, turns: list[str] | None = None) -> str:
     """Evaluate agent's response for QA policy compliance."""
+    decision = router.select("qa_evaluation", agent_response)
     prompt = PROMPT_TEMPLATE.replace("{agent_response}", agent_response)
     payload = {
-        "model": MODEL,
+        "model": decision.model,
         "prompt": prompt,
         "stream": False,
+        "keep_alive": KEEP_ALIVE,
     }
 
-    async with httpx.AsyncClient(timeout=300) as client:
-        response = await client.post(f"{OLLAMA_URL}/api/generate", json=payload)
-        response.raise_for_status()
-        result = response.json()["response"]
+    # Reuse the KV context of earlier calls in this conversation and only send the new turns
+    cached = context_cache.lookup(conversation_id, "qa_policy", decision.model, PROMPT_TEMPLATE, turns)
+    if cached is not None and cached.turn_count == len(turns):
+        return cached.response
+    if cached is not None:
+        payload |= {"prompt": followup_prompt(turns[cached.turn_count:]), "context": cached.tokens()}
+
+    with router.track(decision) as timing:
+        body = await generate(f"{OLLAMA_URL}/api/generate", payload, timeout_seconds=300, telemetry=telemetry, task="qa_evaluation")
+    result = body["response"]
+    context_cache.store(
+        conversation_id, "qa_policy", model=decision.model, template=PROMPT_TEMPLATE, turns=turns, context=body.get("context"), response=result,
+    )
 
-        # Log to MLflow
-        with mlflow.start_run(run_name=f"qa_eval_{datetime.now(tz=UTC).isoformat()}"):
-            mlflow.log_param("model", MODEL)
-            mlflow.log_param("input_length", len(agent_response))
-            mlflow.log_param("output_length", len(result))
-            mlflow.set_tag("task", "qa_evaluation")
-            mlflow.log_text(result, "evaluation.txt")
+    # Log to MLflow in the background
+    telemetry.record(
+        task="qa_evaluation",
+        run_name=f"qa_eval_{datetime.now(tz=UTC).isoformat()}",
+        params={
+            "model": decision.model,
+            "input_length": len(agent_response),
+            "context_reused": cached is not None,
+            "output_length": len(result),
+            **decision.params(),
+        },
+        metrics={"latency_ms": timing.elapsed_ms},
+        tags={"route": decision.route},
+        artifacts={"evaluation.txt": result},
+    )
 
-        return result
+    return result
@@ -1,13 +1,22 @@
 """FastAPI service for suggesting solutions using Prefect and external Suggester."""
 
+import time
 import traceback
+from typing import Annotated
 
-from fastapi import FastAPI, HTTPException
+from common.deadline import install_deadline_handling, request_scope
+from common.metrics import install_metrics
+from common.ollama_client import generation_stats
+from common.tracing import install_tracing
+from fastapi import Depends, FastAPI, Header, HTTPException
 from prefect import flow
 from pydantic import BaseModel
 from suggester import SolutionSuggester
 
-app = FastAPI(title="Solution Suggestion Service", version="1.0")
+app = FastAPI(title="Solution Suggestion Service", version="1.0", dependencies=[Depends(request_scope)])
+install_deadline_handling(app)
+install_metrics(app)
+install_tracing(app, "suggestions")
 suggester = SolutionSuggester()
 
 class SuggestionRequest(BaseModel):
@@ -19,16 +28,33 @@ class SuggestionRequest(BaseModel):
 
 @flow(name="Solution Suggestion Flow")
 async def run_solution_suggestion(message: str, top_k: int = 1, sug_type: int = 1) -> str:
-    """Run solution suggestion flow."""
-    transcripts = await suggester.get_similar_transcripts.fn(suggester, message, top_k, sug_type)
-    return await suggester.extract_solutions.fn(suggester, transcripts)
+    """Run solution suggestion flow, answering near-duplicate queries from the semantic cache."""
+    search = await suggester.get_similar_transcripts.fn(suggester, message, top_k, sug_type)
+    transcripts = search["matches"]
+    doc_ids = [transcript["file"] for transcript in transcripts]
+    embedding, index_version = search.get("embedding"), search.get("index_version")
+    cached = suggester.cache.lookup(sug_type, embedding, doc_ids, index_version)
+    if cached is not None:
+        return cached
+
+    start = time.perf_counter()
+    suggestion = await suggester.extract_solutions.fn(suggester, transcripts)
+    suggester.cache.store(
+        sug_type, embedding, doc_ids, index_version, suggestion=suggestion, latency_ms=(time.perf_counter() - start) * 1000,
+    )
+    return suggestion
 
 @app.post("/suggest_solution")
-async def suggest_solution(req: SuggestionRequest) -> dict:
+async def suggest_solution(req: SuggestionRequest, x_batch_job: Annotated[bool, Header()] = False) -> dict:  # noqa: FBT002
     """Endpoint to suggest a solution based on user message."""
     try:
-        result = await run_solution_suggestion(req.message, req.top_k, req.sug_type)
+        result = await suggester.dispatcher.run(run_solution_suggestion, req.message, req.top_k, req.sug_type, batch=x_batch_job)
     except HTTPException:
         traceback.print_exc()
     else:
         return {"suggested_solution": result}
+
+@app.get("/telemetry")
+async def telemetry_stats() -> dict[str, float]:
+    """Report background MLflow logging, abandoned generation and semantic cache counters."""
+    return {**suggester.telemetry.stats(), **generation_stats.stats(), **suggester.cache.stats.as_dict()}
@@ -0,0 +1,89 @@
+"""Pack retrieved transcripts into a token-budgeted prompt context."""
+
+from dataclasses import dataclass, field
+
+from common.tokens import count_tokens, truncate_to_tokens
+
+SEPARATOR = "\n\n---\n\n"
+SHINGLE_SIZE = 5
+
+
+@dataclass
+class PackedContext:
+    """Prompt context built from retrieved passages and what was left out."""
+
+    text: str
+    tokens: int
+    budget: int
+    kept: list[dict] = field(default_factory=list)
+    dropped: list[dict] = field(default_factory=list)
+    truncated: bool = False
+
+
+def normalize(content: str) -> str:
+    """Collapse whitespace and strip stray escape characters."""
+    return " ".join(content.replace("\\", "").split())
+
+
+def shingles(text: str) -> set[tuple[str, ...]]:
+    """Word shingles used to compare passages."""
+    words = text.lower().split()
+    if len(words) <= SHINGLE_SIZE:
+        return {tuple(words)}
+    return {tuple(words[i : i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def jaccard(a: set, b: set) -> float:
+    """Jaccard similarity of two shingle sets."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class ContextPacker:
+    """Keep the best scoring, non-duplicate passages within a per-model token budget."""
+
+    def __init__(self, config: dict) -> None:
+        """Initialize the packer from the context_packing config section."""
+        self.default_budget = config.get("default_budget", 1500)
+        self.model_budgets = config.get("model_budgets", {})
+        self.dedup_threshold = config.get("dedup_threshold", 0.9)
+        self.min_passage_tokens = config.get("min_passage_tokens", 50)
+
+    def budget_for(self, model: str) -> int:
+        """Token budget for the retrieved context of a model."""
+        return self.model_budgets.get(model, self.default_budget)
+
+    def pack(self, passages: list[dict], model: str) -> PackedContext:
+        """Pack passages, highest score first, into the model's token budget."""
+        budget = self.budget_for(model)
+        separator_tokens = count_tokens(SEPARATOR)
+        packed = PackedContext(text="", tokens=0, budget=budget)
+        parts, seen = [], []
+
+        for passage in sorted(passages, key=lambda p: p.get("score", 0.0), reverse=True):
+            text = f"Transcript:{normalize(passage['content'])}"
+            passage_shingles = shingles(text)
+            if any(jaccard(passage_shingles, other) >= self.dedup_threshold for other in seen):
+                packed.dropped.append({**passage, "reason": "duplicate"})
+                continue
+
+            remaining = budget - packed.tokens - (separator_tokens if parts else 0)
+            if remaining < self.min_passage_tokens:
+                packed.dropped.append({**passage, "reason": "budget"})
+                continue
+
+            tokens = count_tokens(text)
+            if tokens > remaining:
+                kept_text = truncate_to_tokens(text, remaining)
+                packed.dropped.append({**passage, "content": text[len(kept_text) :], "reason": "truncated"})
+                text, tokens = kept_text, remaining
+                packed.truncated = True
+
+            parts.append(text)
+            seen.append(passage_shingles)
+            packed.kept.append(passage)
+            packed.tokens += tokens + (separator_tokens if len(parts) > 1 else 0)
+
+        packed.text = SEPARATOR.join(parts)
+        return packed
@@ -0,0 +1,121 @@
+"""Answer near-identical suggestion queries from earlier generations."""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class CachedSuggestion:
+    """A generated suggestion and the query that produced it."""
+
+    sug_type: int
+    embedding: np.ndarray
+    doc_ids: tuple[str, ...]
+    suggestion: str
+    latency_ms: float
+
+
+@dataclass
+class CacheStats:
+    """Hit and eviction counters of the semantic cache."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+    saved_latency_ms: float = 0.0
+
+    def as_dict(self) -> dict[str, float]:
+        """Counters plus hit rate, prefixed for the telemetry endpoint."""
+        lookups = self.hits + self.misses
+        return {
+            "semantic_cache_hits": self.hits,
+            "semantic_cache_misses": self.misses,
+            "semantic_cache_hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "semantic_cache_evictions": self.evictions,
+            "semantic_cache_invalidations": self.invalidations,
+            "semantic_cache_saved_latency_ms": round(self.saved_latency_ms, 1),
+        }
+
+
+class SemanticCache:
+    """LRU cache of suggestions matched by query-embedding cosine similarity and retrieved documents."""
+
+    def __init__(self, config: dict) -> None:
+        """Initialize the cache from the semantic_cache config section."""
+        self.enabled = config.get("enabled", True)
+        self.threshold = config.get("threshold", 0.95)
+        self.max_entries = config.get("max_entries", 512)
+        self.stats = CacheStats()
+        self._entries: OrderedDict[int, CachedSuggestion] = OrderedDict()
+        self._index_versions: dict[int, str] = {}
+        self._next_key = 0
+
+    def _check_version(self, sug_type: int, index_version: str) -> None:
+        """Drop the entries of a suggestion type whose index has changed since they were cached."""
+        if self._index_versions.setdefault(sug_type, index_version) == index_version:
+            return
+        stale = [key for key, entry in self._entries.items() if entry.sug_type == sug_type]
+        for key in stale:
+            del self._entries[key]
+        if stale:
+            self.stats.invalidations += 1
+        self._index_versions[sug_type] = index_version
+
+    def lookup(
+        self, sug_type: int, embedding: list[float] | None, doc_ids: list[str], index_version: str | None,
+    ) -> str | None:
+        """Return a cached suggestion for a similar query that retrieved the same documents."""
+        if not self.enabled or embedding is None or index_version is None:
+            return None
+        self._check_version(sug_type, index_version)
+        query = _unit(embedding)
+        best_key, best_score = None, self.threshold
+        for key, entry in self._entries.items():
+            if entry.sug_type != sug_type or entry.doc_ids != tuple(doc_ids):
+                continue
+            score = float(query @ entry.embedding)
+            if score >= best_score:
+                best_key, best_score = key, score
+        if best_key is None:
+            self.stats.misses += 1
+            return None
+
+        self._entries.move_to_end(best_key)
+        entry = self._entries[best_key]
+        self.stats.hits += 1
+        self.stats.saved_latency_ms += entry.latency_ms
+        return entry.suggestion
+
+    def store(  # noqa: PLR0913
+        self,
+        sug_type: int,
+        embedding: list[float] | None,
+        doc_ids: list[str],
+        index_version: str | None,
+        *,
+        suggestion: str,
+        latency_ms: float,
+    ) -> None:
+        """Remember a generated suggestion, evicting the least recently used entries over the limit."""
+        if not self.enabled or embedding is None or index_version is None:
+            return
+        self._check_version(sug_type, index_version)
+        self._entries[self._next_key] = CachedSuggestion(sug_type, _unit(embedding), tuple(doc_ids), suggestion, latency_ms)
+        self._next_key += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def __len__(self) -> int:
+        """Return the number of cached suggestions."""
+        return len(self._entries)
+
+
+def _unit(embedding: list[float]) -> np.ndarray:
+    """Embedding scaled to unit length so a dot product is the cosine similarity."""
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
@@ -4,12 +4,17 @@ from datetime import UTC, datetime
 from pathlib import Path
 
 import httpx
-import mlflow
 import yaml
+from common.deadline import forward_headers
+from common.metrics import track_upstream
+from common.ollama_client import generate
+from common.orchestration import FlowDispatcher
+from common.routing import ModelRouter
+from common.telemetry import TelemetryQueue
+from context_packer import ContextPacker
 from prefect import task
+from semantic_cache import SemanticCache
 
-# Setup MLflow
-mlflow.set_experiment("solution-suggester-experiments")
 
 class SolutionSuggester:
     """Suggest solutions based on similar transcripts."""
@@ -22,41 +27,66 @@ class SolutionSuggester:
         self.transcript_url = config["transcript_search_url"]
         self.ollama_url = config["ollama_host"] + "/api/generate"
         self.llm_model = config["llm_model"]
+        self.keep_alive = config.get("keep_alive", "30m")
         self.prompt_template = config["prompt_template"]
+        self.packer = ContextPacker(config.get("context_packing", {}))
+        self.cache = SemanticCache(config.get("semantic_cache", {}))
+        self.telemetry = TelemetryQueue("solution-suggester-experiments", **config.get("telemetry", {}))
+        self.dispatcher = FlowDispatcher(**config.get("orchestration", {}))
+        self.router = ModelRouter(self.llm_model, config.get("routing", {}).get("routes"))
 
     @task(name="Get Similar Transcripts")
-    async def get_similar_transcripts(self, query: str, top_k: int = 1, sug_type: int = 1) -> list:
-        """Fetch similar transcripts based on the query."""
-        async with httpx.AsyncClient(timeout=1000) as client:
+    async def get_similar_transcripts(self, query: str, top_k: int = 1, sug_type: int = 1) -> dict:
+        """Fetch similar transcripts, the query embedding and the index version for the query."""
+        async with httpx.AsyncClient(timeout=1000) as client, track_upstream("doc_search", "search"):
             response = await client.post(
                 self.transcript_url,
-                json={"query": query, "top_k": top_k},
-                params={"type": sug_type},
+                json={"query": query, "top_k": top_k, "include_embedding": self.cache.enabled},
+                params={"sug_type": sug_type},
+                headers=forward_headers(),
             )
             response.raise_for_status()
-            return response.json()["matches"]
+            return response.json()
 
     @task(name="Extract Suggested Solutions")
     async def extract_solutions(self, transcripts: list) -> str:
         """Extract solutions from the given transcripts using an LLM model."""
-        joined = "\n\n---\n\n".join(f"Transcript:{t['content']}" for t in transcripts)
-        prompt = self.prompt_template.replace("{input}", joined.replace("\n", " ").replace("\\", ""))
-        async with httpx.AsyncClient(timeout=1000) as client:
-            payload = {
-                "model": self.llm_model,
-                "prompt": prompt,
-                "stream": False,
-            }
-            response = await client.post(self.ollama_url, json=payload)
-            response.raise_for_status()
-            summary = response.json()["response"]
+        decision = self.router.select("solution_suggestion", "\n".join(t["content"] for t in transcripts))
+        packed = self.packer.pack(transcripts, decision.model)
+        prompt = self.prompt_template.replace("{input}", packed.text)
+        payload = {
+            "model": decision.model,
+            "prompt": prompt,
+            "stream": False,
+            "keep_alive": self.keep_alive,
+        }
+        with self.router.track(decision) as timing:
+            body = await generate(self.ollama_url, payload, timeout_seconds=1000, telemetry=self.telemetry, task="solution_suggestion")
+        summary = body["response"]
 
-            with mlflow.start_run(run_name=f"suggest_solution_{datetime.now(UTC).isoformat()}"):
-                mlflow.log_param("model", self.llm_model)
-                mlflow.log_param("transcript_count", len(transcripts))
-                mlflow.log_param("input_chars", len(prompt))
-                mlflow.log_param("output_chars", len(summary))
-                mlflow.set_tag("task", "solution_suggestion")
-                mlflow.log_text(summary, "suggested_solution.txt")
+        artifacts = {"suggested_solution.txt": summary}
+        if packed.dropped:
+            artifacts["dropped_context.txt"] = "\n\n---\n\n".join(
+                f"[{d['reason']}] {d.get('file', '')}\n{d['content']}" for d in packed.dropped
+            )
+        self.telemetry.record(
+            task="solution_suggestion",
+            run_name=f"suggest_solution_{datetime.now(UTC).isoformat()}",
+            params={
+                "model": decision.model,
+                "transcript_count": len(transcripts),
+                "input_chars": len(prompt),
+                "context_budget": packed.budget,
+                "packed_tokens": packed.tokens,
+                "kept_passages": len(packed.kept),
+                "dropped_passages": sum(d["reason"] != "truncated" for d in packed.dropped),
+                "truncated": packed.truncated,
+                "output_chars": len(summary),
+                **decision.params(),
+            },
+            metrics={"latency_ms": timing.elapsed_ms},
+            tags={"route": decision.route},
+            artifacts=artifacts,
+        )
 
-            return summary
+        return summary
@@ -1,31 +1,69 @@
 """Summarization API."""
 
 import traceback
+from typing import Annotated
 
-from fastapi import FastAPI, HTTPException
+from common.deadline import install_deadline_handling, request_scope
+from common.metrics import install_metrics
+from common.ollama_client import generation_stats
+from common.tracing import install_tracing
+from fastapi import Depends, FastAPI, Header, HTTPException
 from prefect import flow
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 from summarizer import LLMClient
 
-app = FastAPI(title="LLaMA3 Summarization Service", version="1.0")
+app = FastAPI(title="LLaMA3 Summarization Service", version="1.0", dependencies=[Depends(request_scope)])
+install_deadline_handling(app)
+install_metrics(app)
+install_tracing(app, "summarizer")
 summarizer = LLMClient()
 
 class SummarizationRequest(BaseModel):
     """Request body for summarization."""
 
     text: str
+    conversation_id: str | None = None
+    turns: list[str] | None = None
 
 @flow(name="Summarization Flow")
 async def run_summarization(text: str) -> str:
     """Run the summarization flow."""
     return await summarizer.summarize.fn(summarizer, text)
 
+@flow(name="Rolling Summarization Flow")
+async def run_rolling_summarization(conversation_id: str, turns: list[str]) -> str:
+    """Run the incremental summarization flow."""
+    return await summarizer.summarize_incremental.fn(summarizer, conversation_id, turns)
+
 @app.post("/summarize")
-async def summarize_text(req: SummarizationRequest) -> dict:
-    """Handle the summarization request."""
+async def summarize_text(req: SummarizationRequest, x_batch_job: Annotated[bool, Header()] = False) -> dict:  # noqa: FBT002
+    """Handle the summarization request, incrementally when a conversation id and turns are given."""
     try:
-        result = await run_summarization(req.text)
+        if req.conversation_id and req.turns:
+            result = await summarizer.dispatcher.run(run_rolling_summarization, req.conversation_id, req.turns, batch=x_batch_job)
+        else:
+            result = await summarizer.dispatcher.run(run_summarization, req.text, batch=x_batch_job)
     except HTTPException:
         traceback.print_exc()
     else:
         return {"result": result}
+
+@flow(name="Combined Analysis Flow")
+async def run_combined_analysis(text: str) -> dict:
+    """Run the combined summary, QA and micro-skill flow."""
+    analysis = await summarizer.analyze.fn(summarizer, text)
+    return analysis.model_dump()
+
+@app.post("/analyze")
+async def analyze_text(req: SummarizationRequest, x_batch_job: Annotated[bool, Header()] = False) -> dict:  # noqa: FBT002
+    """Handle the combined analysis request."""
+    try:
+        result = await summarizer.dispatcher.run(run_combined_analysis, req.text, batch=x_batch_job)
+    except ValidationError as e:
+        raise HTTPException(status_code=502, detail=f"LLM output did not match the schema: {e}") from e
+    return {"result": result}
+
+@app.get("/telemetry")
+async def telemetry_stats() -> dict[str, float]:
+    """Report background MLflow logging and abandoned generation counters."""
+    return {**summarizer.telemetry.stats(), **generation_stats.stats()}
@@ -0,0 +1,45 @@
+"""Structured output schemas for the combined analysis pass."""
+
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+Category = Literal[
+    "Account Management",
+    "Loan and Credit Services",
+    "Fraud and Security",
+    "Card Services",
+    "Online and Mobile Banking",
+]
+
+
+class SummaryResult(BaseModel):
+    """Conversation summary and issue category."""
+
+    summary: str
+    category: Category
+
+
+class QAResult(BaseModel):
+    """Policy adherence of the agent."""
+
+    adherence: Literal["yes", "no"]
+    issues: str
+
+
+class MicroSkillScores(BaseModel):
+    """Agent micro-skill ratings on a scale of 1 to 5."""
+
+    clarity: int = Field(ge=1, le=5)
+    politeness: int = Field(ge=1, le=5)
+    empathy: int = Field(ge=1, le=5)
+    professionalism: int = Field(ge=1, le=5)
+    engagement: int = Field(ge=1, le=5)
+
+
+class CombinedAnalysis(BaseModel):
+    """Summary, QA adherence and micro-skill scores from a single generation."""
+
+    summary: SummaryResult
+    qa: QAResult
+    micro_skills: MicroSkillScores
@@ -3,12 +3,15 @@
 from datetime import UTC, datetime
 from pathlib import Path
 
-import httpx
-import mlflow
 import yaml
+from common.ollama_client import generate
+from common.orchestration import FlowDispatcher
+from common.routing import ModelRouter
+from common.telemetry import TelemetryQueue
 from prefect import task
+from schemas import CombinedAnalysis
+from summary_store import RollingSummaryStore
 
-mlflow.set_experiment("summarizer-experiments")
 
 class LLMClient:
     """Client for interacting with LLM summarization API."""
@@ -20,28 +23,91 @@ class LLMClient:
             config = yaml.safe_load(f)
         self.api_url = config["ollama_host"] + "/api/generate"
         self.model = config["model_name"]
+        self.keep_alive = config.get("keep_alive", "30m")
         self.prompt_template = config["prompt_template"]
+        self.rolling_prompt_template = config["rolling_prompt_template"]
+        self.combined_prompt_template = config["combined_prompt_template"]
+        self.rolling_store = RollingSummaryStore(config.get("rolling_max_conversations", 1000))
+        self.telemetry = TelemetryQueue("summarizer-experiments", **config.get("telemetry", {}))
+        self.dispatcher = FlowDispatcher(**config.get("orchestration", {}))
+        self.router = ModelRouter(self.model, config.get("routing", {}).get("routes"))
+
+    async def _generate(self, prompt: str, text: str) -> str:
+        """Run a summarization prompt through the routed LLM and log it."""
+        decision = self.router.select("summarization", text)
+        payload = {
+            "model": decision.model,
+            "prompt": prompt,
+            "stream": False,
+            "keep_alive": self.keep_alive,
+        }
+        with self.router.track(decision) as timing:
+            body = await generate(self.api_url, payload, timeout_seconds=300.0, telemetry=self.telemetry, task="summarization")
+        summary = body["response"]
+
+        # Log to MLflow in the background
+        self.telemetry.record(
+            task="summarization",
+            run_name=f"suggest_solution_{datetime.now(UTC).isoformat()}",
+            params={"model": decision.model, "input_length": len(text), "output_length": len(summary), **decision.params()},
+            metrics={"latency_ms": timing.elapsed_ms},
+            tags={"route": decision.route},
+            artifacts={"output.txt": summary},
+        )
+
+        return summary
 
     @task(name="Summarize Text")
     async def summarize(self, text: str) -> str:
         """Summarize the provided text using the LLM API."""
         prompt = self.prompt_template.replace("{input}", text)
+        return await self._generate(prompt, text)
+
+    @task(name="Summarize Conversation Incrementally")
+    async def summarize_incremental(self, conversation_id: str, turns: list[str]) -> str:
+        """Fold only the turns added since the last call into the stored summary."""
+        state = self.rolling_store.get(conversation_id)
+        if state is not None and state.turn_count == len(turns):
+            return state.summary
+
+        if state is None or state.turn_count > len(turns):
+            # Unknown or reset conversation: summarize everything once
+            text = "\n\n".join(turns)
+            prompt = self.prompt_template.replace("{input}", text)
+        else:
+            text = "\n\n".join(turns[state.turn_count:])
+            prompt = self.rolling_prompt_template.replace("{summary}", state.summary).replace("{input}", text)
+
+        summary = await self._generate(prompt, text)
+        self.rolling_store.put(conversation_id, summary, len(turns))
+        return summary
+
+    @task(name="Combined Analysis")
+    async def analyze(self, text: str) -> CombinedAnalysis:
+        """Produce summary, QA adherence and micro-skill scores in one schema-constrained generation."""
+        decision = self.router.select("combined_analysis", text)
+        prompt = self.combined_prompt_template.replace("{input}", text)
         payload = {
-            "model": self.model,
+            "model": decision.model,
             "prompt": prompt,
             "stream": False,
+            "keep_alive": self.keep_alive,
+            "format": CombinedAnalysis.model_json_schema(),
+            "options": {"temperature": 0},
         }
-        async with httpx.AsyncClient(timeout=300.0) as client:
-            response = await client.post(self.api_url, json=payload)
-            response.raise_for_status()
-            summary = response.json()["response"]
-
-            # Log to MLflow
-            with mlflow.start_run(run_name=f"suggest_solution_{datetime.now(UTC).isoformat()}"):
-                mlflow.log_param("model", self.model)
-                mlflow.log_param("input_length", len(text))
-                mlflow.log_param("output_length", len(summary))
-                mlflow.set_tag("task", "summarization")
-                mlflow.log_text(summary, "output.txt")
-
-            return summary
+        with self.router.track(decision) as timing:
+            body = await generate(self.api_url, payload, timeout_seconds=300.0, telemetry=self.telemetry, task="combined_analysis")
+        raw = body["response"]
+        analysis = CombinedAnalysis.model_validate_json(raw)
+
+        # Log to MLflow in the background
+        self.telemetry.record(
+            task="combined_analysis",
+            run_name=f"combined_analysis_{datetime.now(UTC).isoformat()}",
+            params={"model": decision.model, "input_length": len(text), "output_length": len(raw), **decision.params()},
+            metrics={"latency_ms": timing.elapsed_ms},
+            tags={"route": decision.route},
+            artifacts={"output.txt": raw},
+        )
+
+        return analysis
@@ -0,0 +1,35 @@
+"""In-memory store of rolling summaries per conversation."""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+
+
+@dataclass
+class RollingSummary:
+    """Latest summary of a conversation and how many turns it covers."""
+
+    summary: str
+    turn_count: int
+
+
+class RollingSummaryStore:
+    """Bounded store that evicts the least recently updated conversation."""
+
+    def __init__(self, max_conversations: int = 1000) -> None:
+        """Initialize the store with a maximum number of conversations."""
+        self.max_conversations = max_conversations
+        self._entries: OrderedDict[str, RollingSummary] = OrderedDict()
+
+    def get(self, conversation_id: str) -> RollingSummary | None:
+        """Return the stored summary for a conversation, if any."""
+        entry = self._entries.get(conversation_id)
+        if entry is not None:
+            self._entries.move_to_end(conversation_id)
+        return entry
+
+    def put(self, conversation_id: str, summary: str, turn_count: int) -> None:
+        """Store the latest summary for a conversation."""
+        self._entries[conversation_id] = RollingSummary(summary, turn_count)
+        self._entries.move_to_end(conversation_id)
+        while len(self._entries) > self.max_conversations:
+            self._entries.popitem(last=False)
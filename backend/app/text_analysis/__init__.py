@@ -0,0 +1 @@
+"""Text Analysis Service."""
@@ -0,0 +1,119 @@
+"""Worker processes that each keep a loaded ConversationAnalyzer."""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from pathlib import Path
+
+from loguru import logger
+from text_analyzer import ConversationAnalyzer
+
+_analyzer: ConversationAnalyzer | None = None
+_patterns_version: int | None = None
+
+
+def _init_worker(patterns_path: str, sentiment_backend: str) -> None:
+    """Load the patterns and sentiment lexicon once per worker process."""
+    global _analyzer  # noqa: PLW0603
+    _analyzer = ConversationAnalyzer(patterns_path, sentiment_backend)
+
+
+def _ping() -> int:
+    """Answer once the worker's analyzer is loaded."""
+    return os.getpid()
+
+
+def _analyze_chunk(lines: list[str], patterns_version: int) -> list[dict]:
+    """Analyze lines in a worker, picking up pattern changes the parent has already seen."""
+    global _patterns_version  # noqa: PLW0603
+    _analyzer.reload_if_changed(force=patterns_version != _patterns_version)
+    _patterns_version = patterns_version
+    return _analyzer.analyze_lines(lines)
+
+
+class AnalyzerPool:
+    """Runs ConversationAnalyzer.analyze_lines in warm worker processes, a chunk of lines per task.
+
+    Offers the analyzer methods IncrementalAnalysis uses, so its memo and running totals
+    stay in this process while the CPU-bound work happens in the workers.
+    """
+
+    def __init__(self, patterns_path: Path, sentiment_backend: str, workers: int | None = None, chunk_size: int = 64) -> None:
+        """Initialize the pool; workers start on the first task or on `warm`."""
+        self.patterns_path = patterns_path
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_init_worker, initargs=(str(patterns_path), sentiment_backend),
+        )
+        # The file's mtime identifies the patterns, so memoized results of older patterns are not reused
+        self.patterns_version = patterns_path.stat().st_mtime_ns
+        self.lines_analyzed = 0
+        self.chunks = 0
+        self.busy_seconds = 0.0
+        # analyze_lines runs on several threads at once (asyncio.to_thread)
+        self._lock = threading.Lock()
+
+    def warm(self) -> set[int]:
+        """Start every worker and wait until each has loaded its analyzer; returns their pids."""
+        return {future.result() for future in [self.pool.submit(_ping) for _ in range(self.workers)]}
+
+    def reload_if_changed(self) -> bool:
+        """Notice edits to the pattern file; workers reload before their next chunk."""
+        try:
+            version = self.patterns_path.stat().st_mtime_ns
+        except OSError as e:
+            # An editor's atomic save briefly removes the file; check again on the next call
+            logger.warning("Cannot check {} for changes: {}", self.patterns_path, e)
+            return False
+        changed, self.patterns_version = version != self.patterns_version, version
+        return changed
+
+    def _chunks(self, lines: list[str]) -> list[list[str]]:
+        """Split lines into work items."""
+        return [lines[start:start + self.chunk_size] for start in range(0, len(lines), self.chunk_size)]
+
+    def _count(self, lines: int, chunks: int, started: float) -> None:
+        """Update the throughput counters."""
+        with self._lock:
+            self.lines_analyzed += lines
+            self.chunks += chunks
+            self.busy_seconds += time.perf_counter() - started
+
+    def analyze_lines(self, lines: list[str]) -> list[dict]:
+        """Analyze lines in the workers, blocking the calling thread until all chunks are done."""
+        started = time.perf_counter()
+        chunks = self._chunks(lines)
+        futures = [self.pool.submit(_analyze_chunk, chunk, self.patterns_version) for chunk in chunks]
+        results = list(chain.from_iterable(future.result() for future in futures))
+        self._count(len(lines), len(chunks), started)
+        return results
+
+    async def analyze(self, lines: list[str]) -> list[dict]:
+        """Analyze lines in the workers without blocking the event loop."""
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        chunks = self._chunks(lines)
+        results = await asyncio.gather(
+            *(loop.run_in_executor(self.pool, _analyze_chunk, chunk, self.patterns_version) for chunk in chunks),
+        )
+        self._count(len(lines), len(chunks), started)
+        return list(chain.from_iterable(results))
+
+    def stats(self) -> dict[str, int | float]:
+        """Pool size and throughput counters."""
+        with self._lock:
+            lines, chunks, busy = self.lines_analyzed, self.chunks, self.busy_seconds
+        return {
+            "workers": self.workers,
+            "lines_analyzed": lines,
+            "chunks": chunks,
+            "lines_per_busy_second": round(lines / busy, 1) if busy else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        """Stop the workers."""
+        self.pool.shutdown(cancel_futures=True)
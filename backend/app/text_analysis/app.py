@@ -0,0 +1,96 @@
+"""FastAPI service running rule-compliance text analysis in a pool of worker processes."""
+
+import asyncio
+import sys
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import yaml
+from fastapi import FastAPI
+from pydantic import BaseModel
+
+APP_DIR = Path(__file__).resolve().parent
+# In a checkout the analyzer modules live in frontend/ and common/ in backend/app; the image copies them next to this file
+sys.path.extend([str(APP_DIR.parent.parent.parent / "frontend"), str(APP_DIR.parent)])
+
+from analysis_pool import AnalyzerPool  # noqa: E402
+from common.metrics import install_metrics  # noqa: E402
+from common.tracing import install_tracing, span  # noqa: E402
+from text_to_json import IncrementalAnalysis  # noqa: E402
+
+CONFIG_PATH = Path("config.yaml")
+with CONFIG_PATH.open() as f:
+    config = yaml.safe_load(f)
+
+PATTERNS_PATH = next(
+    (path for path in [APP_DIR / config["patterns"], APP_DIR.parent.parent.parent / config["patterns"]] if path.exists()),
+    APP_DIR / config["patterns"],
+)
+analyzers = AnalyzerPool(PATTERNS_PATH, config.get("sentiment_backend", "textblob"), **config.get("pool", {}))
+# Running totals and per-message memo of every conversation, kept in this process
+incremental = IncrementalAnalysis()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:  # noqa: ARG001
+    """Load an analyzer in every worker before serving, and stop the workers on shutdown."""
+    await asyncio.to_thread(analyzers.warm)
+    yield
+    analyzers.shutdown()
+
+
+app = FastAPI(title="Text Analysis", version="1.0", lifespan=lifespan)
+install_metrics(app)
+install_tracing(app, "text_analysis")
+
+
+class LinesRequest(BaseModel):
+    """Request body model for a batch of lines."""
+
+    lines: list[str]
+
+
+class ReportRequest(BaseModel):
+    """Request body model for the rule compliance report of a conversation."""
+
+    messages: list[dict[str, str]]
+    conversation_id: str | None = None
+
+
+class ReportsRequest(BaseModel):
+    """Request body model for the reports of many conversations."""
+
+    conversations: list[ReportRequest]
+
+
+async def build_report(request: ReportRequest) -> dict:
+    """Report of one conversation, analyzing only the messages added since its last report."""
+    messages = [(message.get("sender"), message.get("message", "")) for message in request.messages]
+    with span("rule_analysis", messages=len(messages)):
+        return await asyncio.to_thread(incremental.run, analyzers, messages, request.conversation_id)
+
+
+@app.post("/analyze")
+async def analyze(request: LinesRequest) -> dict[str, list[dict]]:
+    """Analyze a batch of lines (plain or diarized) across the worker pool."""
+    with span("rule_analysis", lines=len(request.lines)):
+        return {"results": await analyzers.analyze(request.lines)}
+
+
+@app.post("/report")
+async def report(request: ReportRequest) -> dict:
+    """Rule compliance totals of a conversation, as shown in the Transcript Analysis tab."""
+    return await build_report(request)
+
+
+@app.post("/reports")
+async def reports(request: ReportsRequest) -> dict[str, list[dict]]:
+    """Return the reports of many conversations, computed concurrently."""
+    return {"reports": await asyncio.gather(*(build_report(conversation) for conversation in request.conversations))}
+
+
+@app.get("/telemetry")
+async def telemetry_stats() -> dict[str, int | float]:
+    """Report worker pool throughput and the size of the conversation state."""
+    return {**analyzers.stats(), "conversations": len(incremental.conversations), "memoized_lines": len(incremental.memo)}
@@ -1,5 +1,6 @@
 """Index Docs."""
 
+import hashlib
 import time
 from pathlib import Path
 
@@ -8,6 +9,8 @@ import mlflow
 import numpy as np
 import yaml
 
+from backend.app.common.metrics import INDEX_BUILD_SECONDS, INDEX_DOCUMENTS, SEARCH_STAGE_SECONDS
+from backend.app.common.tracing import span
 from backend.doc_search.embedder import Embedder
 
 mlflow.set_experiment("indexing-experiments")
@@ -23,6 +26,8 @@ def mlflow_log_indexing(func): # noqa: ANN001,ANN201
             result = func(self, *args, **kwargs)
             mlflow.log_metric("num_documents", len(self.docs))
             mlflow.log_metric("indexing_time_sec", time.time() - start_time)
+            INDEX_BUILD_SECONDS.labels(self.folder.name).set(time.time() - start_time)
+            INDEX_DOCUMENTS.labels(self.folder.name).set(len(self.docs))
             return result
     return wrapper
 
@@ -40,24 +45,39 @@ class TranscriptIndex:
         self.dim = 384
         self.index = hnswlib.Index(space="cosine", dim=self.dim)
         self.docs: list[dict[str, str]] = []
+        # Changes whenever the indexed documents change, so callers can drop cached results
+        self.version = ""
 
     @mlflow_log_indexing
     def load(self) -> None:
         """Load documents and build the HNSW index."""
         all_embeddings = []
-        for file_path in self.folder.glob("*.md"):
+        digest = hashlib.sha1(usedforsecurity=False)
+        for file_path in sorted(self.folder.glob("*.md")):
             content = file_path.read_text()
             vec = self.embedder.embed(content)[0]
             all_embeddings.append(vec)
             self.docs.append({"content": content, "file": file_path.name})
+            digest.update(file_path.name.encode() + b"\0" + content.encode())
+        self.version = f"{self.folder.name}-{digest.hexdigest()[:12]}"
 
         num_elements = len(all_embeddings)
         self.index.init_index(max_elements=num_elements, ef_construction=200, M=16)
         self.index.add_items(np.array(all_embeddings), ids=list(range(num_elements)))
         self.index.set_ef(50)
 
-    def search(self, query: str, top_k: int = 1) -> list[dict[str, str]]:
-        """Search for top_k most similar documents to the query."""
-        q_vec = self.embedder.embed(query)[0]
-        labels, _ = self.index.knn_query(q_vec, k=top_k)
-        return [self.docs[i] for i in labels[0]]
+    def search(self, query: str, top_k: int = 1) -> list[dict[str, str | float]]:
+        """Search for top_k most similar documents to the query, with their cosine similarity."""
+        return self.search_with_embedding(query, top_k)[0]
+
+    def search_with_embedding(self, query: str, top_k: int = 1) -> tuple[list[dict[str, str | float]], np.ndarray]:
+        """Search for top_k most similar documents and also return the query embedding."""
+        with span("embed", index=self.folder.name, chars=len(query)), SEARCH_STAGE_SECONDS.labels(self.folder.name, "embed").time():
+            q_vec = self.embedder.embed(query)[0]
+        with span("knn", index=self.folder.name, top_k=top_k), SEARCH_STAGE_SECONDS.labels(self.folder.name, "knn").time():
+            labels, distances = self.index.knn_query(q_vec, k=top_k)
+        matches = [
+            {**self.docs[i], "score": float(1 - distance)}
+            for i, distance in zip(labels[0], distances[0], strict=True)
+        ]
+        return matches, q_vec
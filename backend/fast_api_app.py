@@ -1,23 +1,39 @@
 """Fast API doc search."""
+import json
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
+from typing import Annotated
 
 import uvicorn
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
+from backend.app.common.deadline import RequestScope, request_scope
+from backend.app.common.metrics import install_metrics
+from backend.app.common.tracing import install_tracing
 from backend.doc_search import index_docs, index_trans
+from backend.insights.aggregator import InsightsAggregator
+from backend.insights.precompute import InsightPrecomputer
+from backend.warm_pool.manager import ModelWarmPool
 from backend.workflows.pipeline import indexing_flow
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]: # noqa: ARG001
-    """Run Prefect flow at app startup."""
+    """Run Prefect flow and start warming the Ollama models at app startup."""
+    warm_pool.start()
     indexing_flow()
     yield
+    await warm_pool.stop()
 
 
 app = FastAPI(lifespan=lifespan)
+install_metrics(app)
+install_tracing(app, "doc_search")
+aggregator = InsightsAggregator()
+precomputer = InsightPrecomputer(aggregator, aggregator.precompute)
+warm_pool = ModelWarmPool()
 
 
 class SearchQuery(BaseModel):
@@ -25,17 +41,87 @@ class SearchQuery(BaseModel):
 
     query: str
     top_k: int = 1
+    # Also return the query embedding and index version, used by the suggestion cache
+    include_embedding: bool = False
 
 
 @app.post("/search")
-def search_similar(query: SearchQuery, sug_type: int = 1) -> dict[str, list[dict[str, str]]]:
+def search_similar(query: SearchQuery, sug_type: int = 1) -> dict[str, list | str]:
     """Search for similar documents or transcripts."""
-    matches = (
-        index_trans.search(query.query, top_k=query.top_k)
-        if sug_type == 1
-        else index_docs.search(query.query, top_k=query.top_k)
-    )
-    return {"matches": matches}
+    index = index_trans if sug_type == 1 else index_docs
+    if not query.include_embedding:
+        return {"matches": index.search(query.query, top_k=query.top_k)}
+    matches, embedding = index.search_with_embedding(query.query, top_k=query.top_k)
+    return {"matches": matches, "embedding": embedding.tolist(), "index_version": index.version}
+
+
+class ChatMessage(BaseModel):
+    """Model for a single chat message."""
+
+    sender: str
+    message: str
+
+
+class InsightsRequest(BaseModel):
+    """Model for an aggregated insights request."""
+
+    messages: list[ChatMessage]
+    conversation_id: str | None = None
+
+
+@app.post("/insights", response_model=None)
+async def get_insights(
+    req: InsightsRequest, scope: Annotated[RequestScope, Depends(request_scope)], stream: bool = True,  # noqa: FBT001, FBT002
+) -> StreamingResponse | dict[str, dict]:
+    """Run every insight section concurrently, streaming each one as NDJSON when it finishes.
+
+    Insights precomputed for exactly this conversation are returned right away.
+    """
+    messages = [message.model_dump() for message in req.messages]
+    precomputed = await precomputer.ready(req.conversation_id, messages)
+    if precomputed is None:
+        precomputer.cancel(req.conversation_id)
+
+    async def sections() -> AsyncGenerator[dict, None]:
+        if precomputed is not None:
+            for section in precomputed.sections.values():
+                yield {**section, "precomputed": True}
+            return
+        results = {}
+        with precomputer.interactive():
+            async for section in aggregator.stream(messages, req.conversation_id, scope.deadline):
+                results[section["section"]] = section
+                yield section
+        precomputer.store(req.conversation_id, messages, results)
+
+    if not stream:
+        return {section["section"]: section async for section in sections()}
+
+    async def ndjson() -> AsyncGenerator[str, None]:
+        async for section in sections():
+            yield json.dumps(section) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
+@app.post("/insights/prefetch")
+async def prefetch_insights(req: InsightsRequest) -> dict[str, str]:
+    """Start computing insights in the background for the latest version of a conversation."""
+    if not req.conversation_id:
+        return {"status": "skipped"}
+    return {"status": precomputer.schedule(req.conversation_id, [message.model_dump() for message in req.messages])}
+
+
+@app.get("/insights/status")
+def insights_status(conversation_id: str | None = None) -> dict:
+    """Report stored insight versions of a conversation, or background run counters."""
+    return precomputer.status(conversation_id) if conversation_id else precomputer.stats()
+
+
+@app.get("/warm_pool")
+def warm_pool_status() -> dict:
+    """Report which models are warm, load events and cold-start latency."""
+    return warm_pool.status()
 
 
 if __name__ == "__main__":
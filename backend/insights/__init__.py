@@ -0,0 +1 @@
+"""Aggregated insights across the backend services."""
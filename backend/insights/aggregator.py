@@ -0,0 +1,157 @@
+"""Fan a conversation out to every insight service concurrently."""
+
+import asyncio
+import json
+import time
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from pathlib import Path
+
+import httpx
+import yaml
+
+from backend.app.common.deadline import forward_headers
+from backend.app.common.metrics import track_upstream
+from backend.app.common.tracing import record_span
+
+SENDER_MAP = {
+    "customer": "Customer",
+    "agent": "Agent",
+}
+
+# Insight section -> key of the combined analysis response it is read from
+COMBINED_SECTIONS = {
+    "summary": "summary",
+    "qa": "qa",
+    "ms_adv": "micro_skills",
+}
+
+
+def format_turn(message: dict[str, str]) -> str:
+    """Format a single chat message the way the LLM prompts expect it."""
+    sender = SENDER_MAP.get(message["sender"], message["sender"].capitalize())
+    return f"**{sender}:** {message['message']}"
+
+
+def format_conversation(messages: list[dict[str, str]]) -> str:
+    """Convert chat messages into a single transcript string."""
+    return "\n\n".join(format_turn(message) for message in messages).strip()
+
+
+class InsightsAggregator:
+    """Run all insight sections for one conversation in parallel."""
+
+    def __init__(self, config_path: str = "backend/config.yaml") -> None:
+        """Initialize the aggregator with service URLs from a YAML file."""
+        config_path = Path(config_path)
+        with config_path.open() as f:
+            config = yaml.safe_load(f)["insights"]
+        self.urls = config["services"]
+        self.timeout = config["timeout"]
+        self.combined_mode = config.get("combined_mode", False)
+        self.precompute = config.get("precompute", {})
+
+    async def _post(self, client: httpx.AsyncClient, url: str, payload: dict, key: str) -> str | dict:
+        """Call one service and extract its result field."""
+        response = await client.post(url, json=payload)
+        response.raise_for_status()
+        return response.json()[key]
+
+    def _sections(
+        self, client: httpx.AsyncClient, messages: list[dict[str, str]], conversation_id: str | None,
+    ) -> dict[str, Callable[[], Awaitable[str | dict]]]:
+        """Build the calls for every insight section."""
+        conversation = format_conversation(messages)
+        # Lets the services reuse per-conversation state and only process new turns
+        history = {"conversation_id": conversation_id, "turns": [format_turn(message) for message in messages]} if conversation_id else {}
+        if self.combined_mode:
+            sections = {
+                "combined": lambda: self._post(client, self.urls["combined"], {"text": conversation}, "result"),
+            }
+        else:
+            sections = {
+                "summary": lambda: self._post(client, self.urls["summary"], {"text": conversation, **history}, "result"),
+                "qa": lambda: self._post(client, self.urls["qa"], {"agent_response": conversation, **history}, "evaluation"),
+                "ms_adv": lambda: self._post(client, self.urls["ms_adv"], {"conversation": conversation, **history}, "evaluation"),
+            }
+        return {
+            **sections,
+            "solution": lambda: self._post(
+                client, self.urls["suggestions"], {"message": conversation, "sug_type": 1}, "suggested_solution",
+            ),
+            "kb": lambda: self._post(
+                client, self.urls["suggestions"], {"message": conversation, "sug_type": 0}, "suggested_solution",
+            ),
+        }
+
+    def _split_combined(self, section: dict) -> list[dict]:
+        """Split a combined analysis result into the sections it replaces, each as schema-validated JSON text."""
+        if section["status"] != "ok":
+            return [{**section, "section": name} for name in COMBINED_SECTIONS]
+        return [
+            {**section, "section": name, "result": json.dumps(section["result"][key])}
+            for name, key in COMBINED_SECTIONS.items()
+        ]
+
+    async def _run_section(self, name: str, call: Callable[[], Awaitable[str | dict]], deadline: float | None) -> dict:
+        """Run one section and report its status and timing, also logged as a span."""
+        section = await self._timed_section(name, call, deadline)
+        record_span("section", section["elapsed_ms"], section=name, status=section["status"])
+        return section
+
+    async def _timed_section(self, name: str, call: Callable[[], Awaitable[str | dict]], deadline: float | None) -> dict:
+        """Run one section and report its status and timing."""
+        start = time.perf_counter()
+        try:
+            async with asyncio.timeout(None if deadline is None else max(deadline - time.time(), 0)):
+                with track_upstream(name, "insights"):
+                    result = await call()
+        except TimeoutError:
+            return {
+                "section": name,
+                "status": "error",
+                "error": "Request deadline exceeded",
+                "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+            }
+        # Any failure must still fill the section's slot, or stream() waits for it until the deadline
+        except Exception as e:  # noqa: BLE001
+            return {
+                "section": name,
+                "status": "error",
+                "error": str(e) or e.__class__.__name__,
+                "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+            }
+        return {
+            "section": name,
+            "status": "ok",
+            "result": result,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+        }
+
+    async def stream(
+        self, messages: list[dict[str, str]], conversation_id: str | None = None, deadline: float | None = None,
+    ) -> AsyncGenerator[dict, None]:
+        """Yield each section as soon as it finishes, giving up on sections still running at the deadline."""
+        queue: asyncio.Queue[dict] = asyncio.Queue()
+
+        async def run(name: str, call: Callable[[], Awaitable[str | dict]]) -> None:
+            section = await self._run_section(name, call, deadline)
+            for part in self._split_combined(section) if name == "combined" else [section]:
+                await queue.put(part)
+
+        # The deadline header lets every service cancel its Ollama generation once nobody is waiting
+        async with httpx.AsyncClient(timeout=self.timeout, headers=forward_headers(deadline)) as client:
+            sections = self._sections(client, messages, conversation_id)
+            expected = sum(len(COMBINED_SECTIONS) if name == "combined" else 1 for name in sections)
+            gathered = asyncio.gather(*(run(name, call) for name, call in sections.items()))
+            try:
+                for _ in range(expected):
+                    yield await queue.get()
+                await gathered
+            finally:
+                gathered.cancel()
+
+    async def collect(
+        self, messages: list[dict[str, str]], conversation_id: str | None = None, deadline: float | None = None,
+    ) -> dict[str, dict]:
+        """Run every section and return all results keyed by section name."""
+        return {section["section"]: section async for section in self.stream(messages, conversation_id, deadline)}
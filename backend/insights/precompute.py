@@ -0,0 +1,148 @@
+"""Compute insights in the background while a conversation is still going."""
+
+import asyncio
+import hashlib
+import json
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import UTC, datetime
+
+from backend.insights.aggregator import InsightsAggregator
+
+
+def conversation_version(messages: list[dict[str, str]]) -> str:
+    """Identify the exact state of a conversation: turn count plus a content digest."""
+    digest = hashlib.sha1(json.dumps(messages, sort_keys=True).encode(), usedforsecurity=False).hexdigest()[:16]
+    return f"{len(messages)}-{digest}"
+
+
+@dataclass
+class PrecomputedInsights:
+    """All insight sections computed for one version of a conversation."""
+
+    version: str
+    sections: dict[str, dict]
+    computed_at: str
+
+
+class InsightPrecomputer:
+    """Debounced, cancellable background insight runs that yield to interactive requests."""
+
+    def __init__(self, aggregator: InsightsAggregator, config: dict) -> None:
+        """Initialize the precomputer from the insights.precompute config section."""
+        self.aggregator = aggregator
+        self.enabled = config.get("enabled", True)
+        self.debounce_seconds = config.get("debounce_seconds", 2.0)
+        self.max_conversations = config.get("max_conversations", 500)
+        self._slots = asyncio.Semaphore(config.get("max_concurrent", 1))
+        self._results: OrderedDict[str, PrecomputedInsights] = OrderedDict()
+        self._pending: dict[str, tuple[str, asyncio.Task]] = {}
+        self._interactive = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self.completed = 0
+        self.cancelled = 0
+        self.served = 0
+
+    def lookup(self, conversation_id: str | None, messages: list[dict[str, str]]) -> PrecomputedInsights | None:
+        """Return the stored insights for exactly this version of the conversation, if every section succeeded."""
+        if not conversation_id:
+            return None
+        stored = self._results.get(conversation_id)
+        if stored is None or stored.version != conversation_version(messages):
+            return None
+        if any(section["status"] != "ok" for section in stored.sections.values()):
+            return None
+        self._results.move_to_end(conversation_id)
+        self.served += 1
+        return stored
+
+    async def ready(self, conversation_id: str | None, messages: list[dict[str, str]]) -> PrecomputedInsights | None:
+        """Return the stored insights for this version, first waiting for a background run of the same version."""
+        pending = self._pending.get(conversation_id)
+        if pending is not None and pending[0] == conversation_version(messages):
+            await asyncio.wait({pending[1]})
+        return self.lookup(conversation_id, messages)
+
+    def store(self, conversation_id: str | None, messages: list[dict[str, str]], sections: dict[str, dict]) -> None:
+        """Remember the sections computed for a conversation version, dropping the oldest conversations."""
+        if not conversation_id:
+            return
+        self._results[conversation_id] = PrecomputedInsights(
+            conversation_version(messages), sections, datetime.now(UTC).isoformat(),
+        )
+        self._results.move_to_end(conversation_id)
+        while len(self._results) > self.max_conversations:
+            self._results.popitem(last=False)
+
+    def schedule(self, conversation_id: str, messages: list[dict[str, str]]) -> str:
+        """Start (or restart) the debounced background run for the latest version of a conversation."""
+        version = conversation_version(messages)
+        stored = self._results.get(conversation_id)
+        if not self.enabled:
+            return "disabled"
+        if stored is not None and stored.version == version:
+            return "ready"
+        pending = self._pending.get(conversation_id)
+        if pending is not None:
+            if pending[0] == version:
+                return "scheduled"
+            pending[1].cancel()
+        task = asyncio.create_task(self._run(conversation_id, version, messages))
+        self._pending[conversation_id] = (version, task)
+        return "scheduled"
+
+    def cancel(self, conversation_id: str | None) -> None:
+        """Drop the background run of a conversation, e.g. because an interactive request replaces it."""
+        pending = self._pending.get(conversation_id)
+        if pending is not None:
+            pending[1].cancel()
+
+    def status(self, conversation_id: str) -> dict:
+        """Version and time of the stored insights of a conversation and whether a run is pending."""
+        stored = self._results.get(conversation_id)
+        return {
+            "version": stored.version if stored else None,
+            "computed_at": stored.computed_at if stored else None,
+            "pending": conversation_id in self._pending,
+        }
+
+    def stats(self) -> dict[str, int]:
+        """Counters of background runs and instantly served requests."""
+        return {
+            "pending": len(self._pending),
+            "stored": len(self._results),
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+            "served": self.served,
+        }
+
+    @contextmanager
+    def interactive(self) -> Iterator[None]:
+        """Hold background runs back while an interactive request is being served."""
+        self._interactive += 1
+        self._idle.clear()
+        try:
+            yield
+        finally:
+            self._interactive -= 1
+            if self._interactive == 0:
+                self._idle.set()
+
+    async def _run(self, conversation_id: str, version: str, messages: list[dict[str, str]]) -> None:
+        """Wait out the debounce window and any interactive requests, then compute every section."""
+        try:
+            await asyncio.sleep(self.debounce_seconds)
+            async with self._slots:
+                await self._idle.wait()
+                sections = await self.aggregator.collect(messages, conversation_id)
+            self.store(conversation_id, messages, sections)
+            self.completed += 1
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            if self._pending.get(conversation_id, (None,))[0] == version:
+                del self._pending[conversation_id]
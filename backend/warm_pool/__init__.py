@@ -0,0 +1 @@
+"""Keep the Ollama models used by the services loaded."""
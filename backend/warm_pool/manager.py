@@ -0,0 +1,154 @@
+"""Warm the configured Ollama models at startup and keep them resident."""
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+
+import httpx
+import yaml
+
+# Keys that name an Ollama model in the service configs
+MODEL_KEYS = {"model", "model_name", "llm_model"}
+NS_PER_MS = 1_000_000
+
+
+def configured_models(config: dict | list) -> set[str]:
+    """Collect every model named anywhere in a service config, including routing rules."""
+    if isinstance(config, list):
+        return set().union(*(configured_models(item) for item in config))
+    if not isinstance(config, dict):
+        return set()
+    models = {value for key, value in config.items() if key in MODEL_KEYS and isinstance(value, str)}
+    return models.union(*(configured_models(value) for value in config.values() if isinstance(value, dict | list)))
+
+
+@dataclass
+class LoadEvent:
+    """One warm-up call and how long Ollama took to load the model for it."""
+
+    model: str
+    at: str
+    load_ms: float
+    total_ms: float
+    cold: bool
+    error: str | None = None
+
+
+@dataclass
+class ModelState:
+    """What the pool knows about one model."""
+
+    warmed_at: str | None = None
+    last_load_ms: float | None = None
+    cold_loads: int = 0
+    cold_load_ms_total: float = 0.0
+    failures: int = 0
+    resident_until: str | None = None
+
+
+class ModelWarmPool:
+    """Preload the services' models and refresh their keep-alive before Ollama unloads them."""
+
+    def __init__(self, config_path: str = "backend/config.yaml") -> None:
+        """Initialize the pool from the warm_pool section of a YAML file."""
+        config_path = Path(config_path)
+        with config_path.open() as f:
+            config = yaml.safe_load(f)["warm_pool"]
+        self.ollama_host = config["ollama_host"]
+        self.keep_alive = config.get("keep_alive", "30m")
+        self.refresh_interval = config.get("refresh_interval", 600)
+        self.cold_load_ms = config.get("cold_load_ms", 1000)
+        self.timeout = config.get("timeout", 300)
+        self.models = sorted(self._read_models(config["service_configs"]) | set(config.get("extra_models", [])))
+        self.states = {model: ModelState() for model in self.models}
+        self.events: deque[LoadEvent] = deque(maxlen=config.get("max_events", 100))
+        self._task: asyncio.Task | None = None
+
+    def _read_models(self, paths: list[str]) -> set[str]:
+        """Read the models named in each service config, skipping missing files."""
+        models = set()
+        for path in map(Path, paths):
+            if path.exists():
+                with path.open() as f:
+                    models |= configured_models(yaml.safe_load(f))
+        return models
+
+    async def warm(self, client: httpx.AsyncClient, model: str) -> LoadEvent:
+        """Load one model (or extend its keep-alive) with an empty generate call."""
+        state = self.states[model]
+        start = time.perf_counter()
+        try:
+            response = await client.post(
+                f"{self.ollama_host}/api/generate", json={"model": model, "keep_alive": self.keep_alive},
+            )
+            response.raise_for_status()
+            body = response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            state.failures += 1
+            event = LoadEvent(
+                model, datetime.now(UTC).isoformat(), 0.0, (time.perf_counter() - start) * 1000, cold=False,
+                error=str(e) or e.__class__.__name__,
+            )
+            self.events.append(event)
+            return event
+
+        load_ms = body.get("load_duration", 0) / NS_PER_MS
+        event = LoadEvent(
+            model, datetime.now(UTC).isoformat(), round(load_ms, 1), round((time.perf_counter() - start) * 1000, 1),
+            cold=load_ms >= self.cold_load_ms,
+        )
+        state.warmed_at = event.at
+        state.last_load_ms = event.load_ms
+        if event.cold:
+            state.cold_loads += 1
+            state.cold_load_ms_total += load_ms
+        self.events.append(event)
+        return event
+
+    async def refresh_residency(self, client: httpx.AsyncClient) -> None:
+        """Record when Ollama plans to unload each model."""
+        try:
+            response = await client.get(f"{self.ollama_host}/api/ps")
+            response.raise_for_status()
+            running = {entry["name"]: entry.get("expires_at") for entry in response.json().get("models", [])}
+        except (httpx.HTTPError, ValueError, KeyError):
+            return
+        for model, state in self.states.items():
+            state.resident_until = running.get(model) or running.get(f"{model}:latest")
+
+    async def warm_all(self) -> list[LoadEvent]:
+        """Warm every model one after another so loads do not compete for memory."""
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            events = [await self.warm(client, model) for model in self.models]
+            await self.refresh_residency(client)
+        return events
+
+    async def _run(self) -> None:
+        """Warm at startup, then refresh before the keep-alive window runs out."""
+        while True:
+            await self.warm_all()
+            await asyncio.sleep(self.refresh_interval)
+
+    def start(self) -> None:
+        """Start warming in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the refresh loop."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def status(self) -> dict:
+        """Per-model state and the most recent load events."""
+        return {
+            "keep_alive": self.keep_alive,
+            "refresh_interval": self.refresh_interval,
+            "models": {model: asdict(state) for model, state in self.states.items()},
+            "events": [asdict(event) for event in self.events],
+        }
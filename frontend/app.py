@@ -1,18 +1,23 @@
 """Render UI for Agent and Customer. Use the radio button to view the chat."""
 import ast
 import json
+import re
 import secrets
 import shutil
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime
 from pathlib import Path
 from typing import Literal
 
 import httpx
 import streamlit as st
+from chat_store import ChatStore
+from event_bus import EventPublisher, SubscriberPool, start_proxy_thread
 from loguru import logger
-from streamlit_autorefresh import st_autorefresh
 from text_to_json import textual_analysis
+from ticket_store import TicketStore
 
 sys.path.append(str(Path(__file__).parent.resolve().parent))
 from unified_logging.config_types import LoggingConfigs
@@ -23,42 +28,126 @@ st.set_page_config(page_title="Customer Service Assistant", layout="wide")
 
 CONFIG_FILE_PATH = Path.cwd() / "unified_logging" / "configs.toml"
 logging_configs = LoggingConfigs.load_from_path(CONFIG_FILE_PATH)
-setup_network_logger_client(logging_configs, logger)
+setup_network_logger_client(logging_configs, logger, service="frontend")
+
+# Session setup: customer and agent open the same ?session=<id> URL to share a chat.
+# The id names a directory under chat_cache, so anything but the secrets.token_hex(4)
+# format (such as ".." or an absolute path) is replaced with a fresh id.
+SESSION_ID_PATTERN = re.compile(r"[0-9a-f]{8}")
+if not SESSION_ID_PATTERN.fullmatch(st.query_params.get("session", "")):
+    st.query_params["session"] = secrets.token_hex(4)
+SESSION_ID = st.query_params["session"]
 
 # Dir setup
 CACHE_DIR = Path("chat_cache")
 TKT_DIR = Path("ticket_log")
 CHAT_LOG = Path("chat_log")
-CHAT_FILE = CACHE_DIR / "chat.json"
-SUMMARY_FILE = CACHE_DIR / "summary.txt"
-HIST_SUMMARY = CACHE_DIR / "hist_sum.txt"
-KB_ANALYSIS = CACHE_DIR / "kb.txt"
-SOLUTION = CACHE_DIR / "solution.txt"
-QA_FILE = CACHE_DIR / "qa.txt"
-SKILL_ADV = CACHE_DIR / "ms_adv.txt"
-RULE_ANALYSIS = CACHE_DIR / "rules.txt"
+CHAT_DB = CACHE_DIR / "chat.db"
+TICKET_DB = TKT_DIR / "tickets.db"
+SESSION_DIR = CACHE_DIR / SESSION_ID
+SUMMARY_FILE = SESSION_DIR / "summary.txt"
+HIST_SUMMARY = SESSION_DIR / "hist_sum.txt"
+KB_ANALYSIS = SESSION_DIR / "kb.txt"
+SOLUTION = SESSION_DIR / "solution.txt"
+QA_FILE = SESSION_DIR / "qa.txt"
+SKILL_ADV = SESSION_DIR / "ms_adv.txt"
+RULE_ANALYSIS = SESSION_DIR / "rules.txt"
+INSIGHTS_TURNS = SESSION_DIR / "insights_turns.txt"
+INSIGHTS_URL = "http://127.0.0.1:8000/insights"
+PREFETCH_URL = "http://127.0.0.1:8000/insights/prefetch"
+TEXT_ANALYSIS_URL = "http://127.0.0.1:8010/report"
+# Seconds the UI waits for LLM insights before the backend stops generating them
+INSIGHTS_DEADLINE_SECONDS = 300
+# How often the chat checks the event bus for pushed updates
+EVENT_POLL_SECONDS = 0.5
+# Subscribers of sessions that stopped polling (closed tabs) are closed after this long
+EVENT_SUBSCRIBER_IDLE_SECONDS = 60
 TKT_DIR.mkdir(exist_ok=True)
+SESSION_DIR.mkdir(parents=True, exist_ok=True)
+
+@st.cache_resource
+def get_chat_store() -> ChatStore:
+    """Open the chat store once per Streamlit process."""
+    return ChatStore(CHAT_DB)
+
+chat_store = get_chat_store()
+
+@st.cache_resource
+def get_ticket_store() -> TicketStore:
+    """Open the ticket store once per Streamlit process, importing old per-ticket JSON files."""
+    store = TicketStore(TICKET_DB)
+    store.migrate_json_dir(TKT_DIR)
+    return store
+
+ticket_store = get_ticket_store()
+
+@st.cache_resource
+def get_event_publisher() -> EventPublisher:
+    """Start the event bus proxy unless it already runs, and connect this process to it."""
+    start_proxy_thread()
+    return EventPublisher()
+
+@st.cache_resource
+def get_subscribers() -> SubscriberPool:
+    """Share one pool of event subscribers between the sessions of this process."""
+    return SubscriberPool(idle_seconds=EVENT_SUBSCRIBER_IDLE_SECONDS)
+
+publisher = get_event_publisher()
+subscribers = get_subscribers()
+# Identifies this browser session's subscriber; several tabs may share the ?session= topic
+if "subscriber_key" not in st.session_state:
+    st.session_state["subscriber_key"] = secrets.token_hex(8)
+
+def deadline_headers(trace_id: str | None = None) -> dict[str, str]:
+    """Headers telling the backend when the UI stops waiting for a response, and which trace the request belongs to."""
+    return {"X-Request-Deadline": f"{time.time() + INSIGHTS_DEADLINE_SECONDS:.3f}", **trace_headers(trace_id)}
+
+def trace_headers(trace_id: str | None) -> dict[str, str]:
+    """Header that lets the backend services log their spans under the UI action's trace id."""
+    return {"X-Trace-Id": trace_id} if trace_id else {}
+
+def get_conversation_id() -> str:
+    """Id of the live conversation of this session, creating one for a fresh chat."""
+    return chat_store.conversation_id(SESSION_ID)
 
 def load_chat()-> list:
-    """Read chat history from cache file."""
+    """Read chat history, fetching only the messages added since the last rerun."""
     logger.info("Frontend started.")
-    if CHAT_FILE.exists():
-        with CHAT_FILE.open() as f:  #open(CHAT_FILE) as f:
-            return json.load(f)
-    return []
-
-def save_chat(messages: list) -> None:
-    """Write chat updates to cache file."""
-    with CHAT_FILE.open("w") as f: #open(CHAT_FILE, "w") as f:
-        json.dump(messages, f, indent=2)
+    conversation_id = get_conversation_id()
+    chat = st.session_state.get("chat")
+    if chat is None or chat["conversation_id"] != conversation_id:
+        chat = st.session_state["chat"] = {"conversation_id": conversation_id, "messages": [], "offset": 0}
+    new_messages, chat["offset"] = chat_store.read_since(conversation_id, chat["offset"])
+    chat["messages"].extend(new_messages)
+    return chat["messages"]
+
+def save_chat(sender: str, message: str) -> None:
+    """Append one message to the live conversation."""
+    chat_store.append(get_conversation_id(), sender, message)
+
+def prefetch_insights(chat_messages: list) -> None:
+    """Ask the backend to start computing insights for the conversation so far."""
+    try:
+        with httpx.Client(timeout=2.0) as client:
+            client.post(PREFETCH_URL, json={"messages": chat_messages, "conversation_id": get_conversation_id()})
+    except httpx.HTTPError as e:
+        logger.warning(f"Insight prefetch failed: {e}")
+
+def rule_analysis(chat_messages: list, conversation_id: str, trace_id: str | None = None) -> dict:
+    """Rule compliance totals from the text analysis service, computed in this process if it is down."""
+    try:
+        with httpx.Client(timeout=30.0, headers=trace_headers(trace_id)) as client:
+            response = client.post(TEXT_ANALYSIS_URL, json={"messages": chat_messages, "conversation_id": conversation_id})
+            response.raise_for_status()
+            return response.json()
+    except httpx.HTTPError as e:
+        logger.bind(trace_id=trace_id).warning(f"Text analysis service unavailable, analyzing locally: {e}")
+        return textual_analysis(chat_messages, conversation_id)
 
 def dump_ticket(ticket: dict) -> None:
-    """Write chat updates to cache file."""
+    """Save a ticket to the ticket store."""
     logger.info("Ticket Saved.")
-    file_nm = f"{ticket['ticket_id']}.json"
-    tkt_file = TKT_DIR / file_nm
-    with tkt_file.open("w") as f:
-        json.dump(ticket, f, indent=2, default=str)
+    ticket_store.add(ticket)
 
 
 def print_bullet_points(d: dict, indent: int = 0) -> None:
@@ -72,7 +161,6 @@ def print_bullet_points(d: dict, indent: int = 0) -> None:
         else:
             st.markdown("  " * indent + f"- :violet[**{key}**:] {value}")
 
-st_autorefresh(interval=30000, key="auto-refresh")
 # Sidebar: Role selection
 role = st.sidebar.radio("Select Role", ["Customer", "Agent"])
 st.sidebar.markdown("---")
@@ -86,63 +174,73 @@ if st.button("Close Chat"):
     # create timestamped log directory
     logger.info("Closing and archiving chat.")
     timestamp = datetime.now(tz=UTC).strftime("%Y%m%d_%H%M%S")
-    archive_dir = CHAT_LOG / f"chat_{timestamp}"
+    archive_dir = CHAT_LOG / f"chat_{timestamp}_{SESSION_ID}"
     archive_dir.mkdir(parents=True, exist_ok=True)
 
-    # move files from chat_cache to archive directory
-    for file in CACHE_DIR.glob("*"):
+    # move this session's insight files and a copy of the conversation to the archive directory
+    for file in SESSION_DIR.glob("*"):
         shutil.move(str(file), archive_dir / file.name)
+    closed_messages, _ = chat_store.read_since(get_conversation_id())
+    (archive_dir / "chat.json").write_text(json.dumps(closed_messages, indent=2))
+    chat_store.close(SESSION_ID)
 
     # restore default files
-    default_files = {
-        "chat.json": [],
-        "kb.txt": "",
-        "ms_adv.txt": "",
-        "qa.txt": "",
-        "solution.txt": "",
-        "summary.txt": "",
-    }
-
-    for filename, content in default_files.items():
-        path = CACHE_DIR / filename
-        if isinstance(content, list):  # for chat.json
-            path.write_text(json.dumps(content, indent=2))
-        else:  # for .txt files
-            path.write_text(content)
+    for filename in ["kb.txt", "ms_adv.txt", "qa.txt", "solution.txt", "summary.txt"]:
+        (SESSION_DIR / filename).write_text("")
+    publisher.publish(SESSION_ID, {"type": "closed"})
 
     st.success("Chat history archived and reset.")
 
 # Load current chat
 messages = load_chat()
 
-# Show messages
-with chat_placeholder:
-    for msg in messages:
+@st.fragment(run_every=EVENT_POLL_SECONDS)
+def chat_feed() -> None:
+    """Show messages, reading the store only when the event bus reports an update."""
+    events = subscribers.drain(st.session_state["subscriber_key"], SESSION_ID)
+    for event in events:
+        if event["type"] == "live_alert":
+            # Pushed by live_analysis.py while a call is being transcribed
+            st.toast(event["message"], icon="⚠️")
+    if any(event["type"] not in {"message", "live_alert"} for event in events):
+        # Insights and closed chats change the rest of the page too
+        st.rerun()
+    chat_messages = load_chat() if any(event["type"] == "message" for event in events) else st.session_state["chat"]["messages"]
+    for msg in chat_messages:
         if msg["sender"] == "customer":
             st.chat_message("user").write(msg["message"])
         else:
             st.chat_message("assistant").write(msg["message"])
 
-def convert_chat_json_to_string(chat_json: list) -> str:
-    """Convert chat type from json to string for backend APIs."""
+# Show messages
+with chat_placeholder:
+    chat_feed()
+
+def convert_chat_json_to_turns(chat_json: list) -> list[str]:
+    """Convert chat type from json to one formatted string per turn."""
     sender_map = {
         "customer": "Customer",
         "agent": "Agent",
     }
 
-    result = ""
+    turns = []
     for item in chat_json:
         sender = sender_map.get(item["sender"], item["sender"].capitalize())
         message = item["message"]
-        result += f"**{sender}:** {message}\n\n"
+        turns.append(f"**{sender}:** {message}")
+
+    return turns
 
-    return result.strip()
+def convert_chat_json_to_string(chat_json: list) -> str:
+    """Convert chat type from json to string for backend APIs."""
+    return "\n\n".join(convert_chat_json_to_turns(chat_json)).strip()
 
 # Message Input
 user_input = st.text_input("Type your message:", key="input")
 if st.button("Send") and user_input:
-    messages.append({"sender": "customer" if role == "Customer" else "agent", "message": user_input})
-    save_chat(messages)
+    save_chat("customer" if role == "Customer" else "agent", user_input)
+    publisher.publish(SESSION_ID, {"type": "message"})
+    prefetch_insights(load_chat())
     st.rerun()
 
 def load_file_content(file_type: Literal["summary", "history", "kb", "solution","qa","ms_adv","rules"]) -> str:
@@ -162,52 +260,68 @@ def load_file_content(file_type: Literal["summary", "history", "kb", "solution",
     st.write(":red[Not loaded yet]")
     return ""
 
+def parse_insight(text: str, *, repair: bool = False) -> dict:
+    """Read a saved insight as a dict, raising ValueError or SyntaxError if it is not one.
+
+    Combined-mode sections and rule reports are JSON and are read as is. The separate LLM
+    services answer in free text styled as a Python dict; `repair` drops the stray double
+    quotes and restores the closing brace the QA and micro-skill prompts tend to produce.
+    """
+    try:
+        result = json.loads(text)
+    except json.JSONDecodeError:
+        if repair:
+            text = text.replace('"', "")
+            text = text if text.endswith("}") else text + "}"
+        result = ast.literal_eval(text)
+    if not isinstance(result, dict):
+        error_msg = f"Expected a dict, got {type(result).__name__}"
+        raise ValueError(error_msg)  # noqa: TRY004
+    return result
+
 # Agent-only tools
 if role == "Agent":
     st.subheader("📑 Contextual Insights")
     if st.button("Get insights"):
-        logger.info("Fetching insights from backend.")
-        # Fetch summary
-        with httpx.Client(timeout=1000.0) as client:
-            response = client.post("http://127.0.0.1:8002/summarize",
-                            json={"text": convert_chat_json_to_string(messages)}).json()
-            SUMMARY_FILE.write_text(response.get("result"))
-        # Fetch QA report
-        with httpx.Client(timeout=1000.0) as client:
-            response_1 = client.post("http://127.0.0.1:8004/evaluate",
-                            json={"agent_response": convert_chat_json_to_string(messages)}).json()
-
-            QA_FILE.write_text(response_1.get("evaluation"))
-
-        with httpx.Client(timeout=1000.0) as client:
-            response_2 = client.post("http://127.0.0.1:8008/ms-advance",
-                            json={"conversation": convert_chat_json_to_string(messages)}).json()
-
-            SKILL_ADV.write_text(response_2.get("evaluation"))
-
-
-        payload = {
-            "message": f"{convert_chat_json_to_string(messages)}",
+        # One trace id follows this click through every backend service it reaches
+        trace_id = secrets.token_hex(8)
+        started = time.perf_counter()
+        logger.bind(trace_id=trace_id).info("Fetching insights from backend.")
+        insight_files = {
+            "summary": SUMMARY_FILE,
+            "qa": QA_FILE,
+            "ms_adv": SKILL_ADV,
+            "solution": SOLUTION,
+            "kb": KB_ANALYSIS,
         }
-        # Optional query parameter
-        params_1 = {"sug_type": 1}
-        params_2 = {"sug_type": 0}
-
-        # KB analysis
-        with httpx.Client(timeout=1000.0) as client:
-            response_3 = client.post("http://127.0.0.1:8006/suggest_solution", json=payload, params=params_1).json()
-            KB_ANALYSIS.write_text(f"{response_3.get("suggested_solution")}")
-
-        # Proposed Solution
-        with httpx.Client(timeout=1000.0) as client:
-            response_4 = client.post("http://127.0.0.1:8006/suggest_solution", json=payload, params=params_2).json()
-            SOLUTION.write_text(f"{response_4.get("suggested_solution")}")
-
-        attr_params = textual_analysis(messages)
-        RULE_ANALYSIS.write_text(f"{attr_params}")
-
-
-
+        # Rule compliance comes from the text analysis service while the backend sections stream in
+        with logger.contextualize(trace_id=trace_id), ThreadPoolExecutor(max_workers=1) as pool, st.status("Fetching insights...") as status:
+            rules_future = pool.submit(rule_analysis, messages, get_conversation_id(), trace_id)
+            with httpx.Client(timeout=INSIGHTS_DEADLINE_SECONDS) as client, client.stream(
+                "POST", INSIGHTS_URL, json={"messages": messages, "conversation_id": get_conversation_id()},
+                headers=deadline_headers(trace_id),
+            ) as response:
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    section = json.loads(line)
+                    if section["status"] == "ok":
+                        insight_files[section["section"]].write_text(f"{section['result']}")
+                        publisher.publish(SESSION_ID, {"type": "insight", "section": section["section"]})
+                    else:
+                        logger.warning(f"Insight section {section['section']} failed: {section['error']}")
+                    source = "precomputed" if section.get("precomputed") else f"{section['elapsed_ms']} ms"
+                    status.write(f"{section['section']}: {section['status']} ({source})")
+            RULE_ANALYSIS.write_text(json.dumps(rules_future.result()))
+            INSIGHTS_TURNS.write_text(str(len(messages)))
+            publisher.publish(SESSION_ID, {"type": "insight", "section": "rules"})
+            status.update(label="Insights updated.", state="complete")
+        duration_ms = round((time.perf_counter() - started) * 1000, 3)
+        logger.bind(trace_id=trace_id, span="get_insights", duration_ms=duration_ms).info("Insights updated.")
+
+    insight_turns = int(INSIGHTS_TURNS.read_text() or 0) if INSIGHTS_TURNS.exists() else 0
+    if insight_turns and insight_turns < len(messages):
+        st.warning(f"Insights are based on {insight_turns} of {len(messages)} messages. Click 'Get insights' to refresh them.")
 
     col1, col2, col3, col4, col5 = st.tabs([
     "📈 Transcript Analysis",
@@ -220,7 +334,7 @@ if role == "Agent":
         st.markdown("**📈 Transcript Analysis**")
         summary_text = load_file_content("summary")
         try:
-            result_dict = ast.literal_eval(summary_text)
+            result_dict = parse_insight(summary_text)
             category = str(result_dict.get("category", ""))
         except (ValueError, SyntaxError,IndexError):
             st.write(":orange[*Insufficient chat information to perform analysis.]")
@@ -229,18 +343,16 @@ if role == "Agent":
         st.markdown(f"- :violet[**Issue Category:**] {category}")
         try:
             attr_txt = load_file_content("rules")
-            attr_json = ast.literal_eval(attr_txt)
+            attr_json = parse_insight(attr_txt)
             print_bullet_points(attr_json)
         except (ValueError, SyntaxError,IndexError):
             st.write("file not found")
 
     with col2:
         st.markdown("**🛠️ Quality Assurance**")
-        current_qa_op = load_file_content("qa").replace('"', "")
+        current_qa_op = load_file_content("qa")
         try:
-            if current_qa_op[-1]!="}":
-                current_qa_op+="}"
-            qa_dict = ast.literal_eval(current_qa_op)
+            qa_dict = parse_insight(current_qa_op, repair=True)
             adherence = str(qa_dict.get("adherence", ""))
             issues = qa_dict.get("issues", "")
             st.markdown(f"- :violet[Adherance:] {adherence}")
@@ -258,7 +370,7 @@ if role == "Agent":
         st.markdown("**💡 Top solution given by agents in the past. You can use this as reference.**")
         sol_text = load_file_content("solution")
         try:
-            r_dict = ast.literal_eval(sol_text)
+            r_dict = parse_insight(sol_text)
             soln = str(r_dict.get("solution", ""))
             st.markdown(f" - {soln}")
         except (ValueError, SyntaxError,IndexError):
@@ -270,7 +382,7 @@ if role == "Agent":
         st.markdown("**🔍 Insights from company's Knowledge Base**")
         kb_text = load_file_content("kb")
         try:
-            kb_dict = ast.literal_eval(kb_text)
+            kb_dict = parse_insight(kb_text)
             kb_soln = str(kb_dict.get("solution", ""))
             st.markdown(f" - {kb_soln}")
         except (ValueError, SyntaxError,IndexError):
@@ -285,9 +397,7 @@ if role == "Agent":
         st.markdown("**🚀 Your current micro-skill scores on a scale of 5**")
         current_ms_op = load_file_content("ms_adv")
         try:
-            if current_ms_op[-1]!="}":
-                current_ms_op+="}"
-            ms_op = ast.literal_eval(current_ms_op)
+            ms_op = parse_insight(current_ms_op, repair=True)
             for key, value in ms_op.items():
                 st.markdown(f"- :violet[{key.capitalize()}:] {value}")
         except (ValueError, SyntaxError,IndexError):
@@ -299,14 +409,21 @@ if role == "Agent":
     col_6, col_7 = st.columns(2)
     with col_6:
         if st.button("Get Current Summary"):
-            logger.info("Fetching summary.")
-            with httpx.Client(timeout=1000.0) as client:
+            trace_id = secrets.token_hex(8)
+            logger.bind(trace_id=trace_id).info("Fetching summary.")
+            with httpx.Client(timeout=INSIGHTS_DEADLINE_SECONDS) as client:
                 response = client.post("http://127.0.0.1:8002/summarize",
-                                json={"text": convert_chat_json_to_string(messages)}).json()
-            SUMMARY_FILE.write_text(response.get("result"))
+                                json={
+                                    "text": convert_chat_json_to_string(messages),
+                                    "conversation_id": get_conversation_id(),
+                                    "turns": convert_chat_json_to_turns(messages),
+                                },
+                                headers=deadline_headers(trace_id)).json()
+            SUMMARY_FILE.write_text(response.get("result") or response.get("detail", ""))
+            publisher.publish(SESSION_ID, {"type": "insight", "section": "summary"})
         summary_text = load_file_content("summary")
         try:
-            result_dict = ast.literal_eval(summary_text)
+            result_dict = parse_insight(summary_text)
             summary = str(result_dict.get("summary", ""))
             category = str(result_dict.get("category", ""))
         except (ValueError, SyntaxError,IndexError):
@@ -321,7 +438,7 @@ if role == "Agent":
         categ_priority = {"Account Management":"2", "Loan and Credit Services":"2", "Fraud and Security":"1", "Card Services":"2", "Online and Mobile Banking":"3"}
         summary_text = load_file_content("summary")
         try:
-            result_dict = ast.literal_eval(summary_text)
+            result_dict = parse_insight(summary_text)
             tkt_category = str(result_dict.get("category", ""))
             priority = str(categ_priority[tkt_category])
         except (ValueError, SyntaxError,IndexError):
@@ -332,7 +449,7 @@ if role == "Agent":
         if st.button("Submit"):
             summary_text = load_file_content("summary")
             try:
-                result_dict = ast.literal_eval(summary_text)
+                result_dict = parse_insight(summary_text)
                 tkt_summary = str(result_dict.get("summary", ""))
                 tkt_category = str(result_dict.get("category", ""))
             except (ValueError, SyntaxError,IndexError):
@@ -348,3 +465,8 @@ if role == "Agent":
             }
             dump_ticket(ticket_data)
             st.success(f"Ticket with id {ticket_id} created successfully!")
+
+        with st.expander("📋 Ticket log"):
+            st.markdown(f":violet[**Tickets by category:**] {ticket_store.counts_by_category()}")
+            for ticket in ticket_store.query(page_size=10):
+                st.markdown(f"- `{ticket['ticket_id']}` P{ticket['priority']} {ticket['Category']}: {ticket['ticket_title']}")
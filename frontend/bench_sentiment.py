@@ -0,0 +1,88 @@
+"""Compare the speed and labels of the sentiment backends on the bundled transcripts."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+from bulk_analysis import iter_conversations
+from sentiment import BACKENDS, get_backend
+from text_analyzer import ConversationAnalyzer
+
+REFERENCE = "textblob"
+
+
+def load_lines(transcript_dir: Path, chat_log_dir: Path) -> list[str]:
+    """Every message of the transcripts and archived chats."""
+    return [message["message"] for _, messages in iter_conversations(transcript_dir, chat_log_dir) for message in messages]
+
+
+def time_backend(name: str, lines: list[str], repeat: int) -> tuple[np.ndarray, dict[str, float]]:
+    """Polarities of the lines and the backend's throughput over `repeat` passes."""
+    backend = get_backend(name)
+    polarities = backend.polarities(lines)  # Warm-up, and the result to compare
+    start = time.perf_counter()
+    for _ in range(repeat):
+        backend.polarities(lines)
+    elapsed = time.perf_counter() - start
+    return polarities, {
+        "seconds": round(elapsed, 4),
+        "lines_per_second": round(len(lines) * repeat / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def agreement(lines: list[str], labels: dict[str, list[str]], polarities: dict[str, np.ndarray], name: str) -> dict:
+    """Label agreement, polarity difference and confusion matrix of a backend against TextBlob."""
+    reference, candidate = labels[REFERENCE], labels[name]
+    difference = np.abs(polarities[REFERENCE] - polarities[name])
+    confusion = Counter(zip(reference, candidate, strict=True))
+    return {
+        "label_agreement": round(sum(a == b for a, b in zip(reference, candidate, strict=True)) / len(lines), 4),
+        "polarity_mean_abs_diff": round(float(difference.mean()), 4),
+        "polarity_max_abs_diff": round(float(difference.max()), 4),
+        "confusion": {f"{REFERENCE}={a} {name}={b}": count for (a, b), count in sorted(confusion.items())},
+        "disagreements": [
+            {"text": text, REFERENCE: a, name: b}
+            for text, a, b in zip(lines, reference, candidate, strict=True) if a != b
+        ][:10],
+    }
+
+
+def run(args: argparse.Namespace) -> dict:
+    """Benchmark every backend and compare its labels with TextBlob's."""
+    lines = load_lines(Path(args.transcripts), Path(args.chat_log))
+    if not lines:
+        error_msg = f"No messages found in {args.transcripts} or {args.chat_log}"
+        raise SystemExit(error_msg)
+    analyzer = ConversationAnalyzer(args.patterns)
+    hits = [analyzer.engine.scan(line) for line in lines]
+
+    report: dict = {"lines": len(lines), "repeat": args.repeat, "backends": {}, "agreement": {}}
+    polarities, labels = {}, {}
+    for name in BACKENDS:
+        polarities[name], report["backends"][name] = time_backend(name, lines, args.repeat)
+        # Same booster rules and thresholds as the analyzer, so labels match what the UI would show
+        labels[name] = [
+            analyzer.analyze_sentiment(line, line_hits, polarity)["label"]
+            for line, line_hits, polarity in zip(lines, hits, polarities[name], strict=True)
+        ]
+    reference_speed = report["backends"][REFERENCE]["lines_per_second"]
+    for name in BACKENDS:
+        if reference_speed:
+            report["backends"][name]["speedup"] = round(report["backends"][name]["lines_per_second"] / reference_speed, 1)
+        if name != REFERENCE:
+            report["agreement"][name] = agreement(lines, labels, polarities, name)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark sentiment backends against TextBlob.")
+    parser.add_argument("--transcripts", default="transcripts", help="Directory of markdown transcripts")
+    parser.add_argument("--chat-log", default="chat_log", help="Directory of archived chat sessions")
+    parser.add_argument("--patterns", default="patterns.yml", help="Pattern configuration file")
+    parser.add_argument("--repeat", type=int, default=50, help="Timed passes over all lines per backend")
+    print(json.dumps(run(parser.parse_args()), indent=2))  # noqa: T201
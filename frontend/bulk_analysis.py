@@ -0,0 +1,176 @@
+"""Run ConversationAnalyzer over historical transcripts and archived chats in parallel."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from sentiment import BACKENDS
+from text_analyzer import ConversationAnalyzer
+from text_to_json import RunningTotals
+from tqdm import tqdm
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
+TRANSCRIPT_TURN = re.compile(r"^\*\*(?P<sender>[^*:]+):\*\*\s*(?P<message>.*)$")
+CHECKPOINT_FILE = "checkpoint.jsonl"
+LINES_FILE = "lines.jsonl"
+CONVERSATIONS_FILE = "conversations.jsonl"
+
+_analyzer: ConversationAnalyzer | None = None
+
+
+def parse_transcript(path: Path) -> list[dict[str, str]]:
+    """Read a `**Customer:** ...` / `**Agent:** ...` markdown transcript as chat messages."""
+    matches = (TRANSCRIPT_TURN.match(line.strip()) for line in path.read_text(encoding="utf-8").splitlines())
+    return [{"sender": match["sender"].strip().lower(), "message": match["message"]} for match in matches if match]
+
+
+def iter_conversations(transcript_dir: Path, chat_log_dir: Path) -> Iterator[tuple[str, list[dict[str, str]]]]:
+    """Yield (conversation id, messages) for every transcript and archived chat, lazily."""
+    for path in sorted(transcript_dir.glob("*.md")):
+        yield f"transcript:{path.name}", parse_transcript(path)
+    for path in sorted(chat_log_dir.glob("*/chat.json")):
+        yield f"chat_log:{path.parent.name}", json.loads(path.read_text(encoding="utf-8"))
+
+
+def chunked(items: Iterable, size: int) -> Iterator[list]:
+    """Split an iterable into lists of at most `size` items."""
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def bounded_map(pool: Executor, fn: Callable, items: Iterable, max_pending: int) -> Iterator:
+    """Like pool.map, in order, but only reads ahead `max_pending` items so input is streamed."""
+    pending = deque()
+    for item in items:
+        pending.append(pool.submit(fn, item))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _init_worker(config_path: str, sentiment_backend: str) -> None:
+    """Build one analyzer per worker process."""
+    global _analyzer  # noqa: PLW0603
+    _analyzer = ConversationAnalyzer(config_path, sentiment_backend)
+
+
+def analyze_chunk(chunk: list[tuple[str, list[dict[str, str]]]]) -> list[tuple[str, list[dict], dict]]:
+    """Analyze a chunk of conversations; returns per-line rows and a summary for each."""
+    results = []
+    for conversation_id, messages in chunk:
+        analyses = _analyzer.analyze_lines([message["message"] for message in messages])
+        totals = RunningTotals()
+        rows = []
+        for line_no, (message, analysis) in enumerate(zip(messages, analyses, strict=True)):
+            totals.add(message["sender"], analysis)
+            rows.append({
+                "conversation_id": conversation_id,
+                "line_no": line_no,
+                "speaker": message["sender"],
+                "text": analysis["text"],
+                "sentiment": analysis["sentiment"]["label"],
+                "sentiment_score": analysis["sentiment"]["score"],
+                "intents": [intent["intent"] for intent in analysis["intents"]],
+                "issues": [issue["issue"] for issue in analysis["issues"]],
+                "required_phrases": analysis["required_phrases"]["categories"],
+                "personal_info": analysis["personal_info"]["categories"],
+                "prohibited_phrases": analysis["prohibited_phrases"]["phrases"],
+            })
+        summary = {"conversation_id": conversation_id, "lines": len(messages), **totals.report()}
+        results.append((conversation_id, rows, summary))
+    return results
+
+
+def load_checkpoint(out_dir: Path) -> set[str]:
+    """Conversation ids finished by earlier runs."""
+    checkpoint = out_dir / CHECKPOINT_FILE
+    if not checkpoint.exists():
+        return set()
+    return {json.loads(line)["conversation_id"] for line in checkpoint.read_text().splitlines() if line}
+
+
+def write_parquet(out_dir: Path) -> None:
+    """Convert the JSONL outputs to Parquet for columnar analytics."""
+    import pandas as pd  # noqa: PLC0415
+
+    for name in [LINES_FILE, CONVERSATIONS_FILE]:
+        path = out_dir / name
+        if path.exists() and path.stat().st_size:
+            pd.read_json(path, lines=True).to_parquet(path.with_suffix(".parquet"), index=False)
+
+
+def run(args: argparse.Namespace) -> dict[str, float]:
+    """Analyze every pending conversation and append the results; returns throughput figures."""
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    done = load_checkpoint(out_dir) if args.resume else set()
+    if not args.resume:
+        for name in [CHECKPOINT_FILE, LINES_FILE, CONVERSATIONS_FILE]:
+            (out_dir / name).unlink(missing_ok=True)
+
+    pending = (
+        conversation for conversation in iter_conversations(Path(args.transcripts), Path(args.chat_log))
+        if conversation[0] not in done
+    )
+    conversations, lines = 0, 0
+    start = time.perf_counter()
+    with (
+        ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(args.patterns, args.sentiment)) as pool,
+        (out_dir / LINES_FILE).open("a", encoding="utf-8") as lines_out,
+        (out_dir / CONVERSATIONS_FILE).open("a", encoding="utf-8") as conversations_out,
+        (out_dir / CHECKPOINT_FILE).open("a", encoding="utf-8") as checkpoint,
+        tqdm(desc="conversations", unit="conv") as progress,
+    ):
+        max_pending = 2 * (args.workers or os.cpu_count() or 1)
+        for chunk_results in bounded_map(pool, analyze_chunk, chunked(pending, args.chunk_size), max_pending):
+            for _, rows, summary in chunk_results:
+                lines_out.writelines(json.dumps(row) + "\n" for row in rows)
+                conversations_out.write(json.dumps(summary) + "\n")
+                lines += len(rows)
+            lines_out.flush()
+            conversations_out.flush()
+            # Checkpoint only after the chunk's results are on disk
+            checkpoint.writelines(json.dumps({"conversation_id": conversation_id}) + "\n" for conversation_id, _, _ in chunk_results)
+            checkpoint.flush()
+            conversations += len(chunk_results)
+            progress.update(len(chunk_results))
+
+    if args.format == "parquet":
+        write_parquet(out_dir)
+    elapsed = time.perf_counter() - start
+    return {
+        "conversations": conversations,
+        "lines": lines,
+        "skipped": len(done),
+        "seconds": round(elapsed, 2),
+        "conversations_per_second": round(conversations / elapsed, 2) if elapsed else 0.0,
+        "lines_per_second": round(lines / elapsed, 2) if elapsed else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analyze historical transcripts and archived chats in bulk.")
+    parser.add_argument("--transcripts", default="transcripts", help="Directory of markdown transcripts")
+    parser.add_argument("--chat-log", default="chat_log", help="Directory of archived chat sessions")
+    parser.add_argument("--patterns", default="patterns.yml", help="Pattern configuration file")
+    parser.add_argument("--out", default="analysis_output", help="Output directory")
+    parser.add_argument("--format", choices=["jsonl", "parquet"], default="jsonl", help="Output format")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=50, help="Conversations per work item")
+    parser.add_argument("--sentiment", choices=list(BACKENDS), default="lexicon", help="Sentiment backend")
+    parser.add_argument("--resume", action="store_true", help="Skip conversations finished by an earlier run")
+    report = run(parser.parse_args())
+    print(json.dumps(report, indent=2))  # noqa: T201
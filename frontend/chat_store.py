@@ -0,0 +1,84 @@
+"""Append-only SQLite store for live chats, keyed by session."""
+
+import secrets
+import sqlite3
+from datetime import UTC, datetime
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversations (
+    conversation_id TEXT PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    closed_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_conversations_session ON conversations (session_id, closed_at);
+-- Stores created before the unique index below may hold several open conversations of a session; keep the newest
+UPDATE conversations SET closed_at = started_at
+WHERE closed_at IS NULL
+  AND rowid NOT IN (SELECT MAX(rowid) FROM conversations WHERE closed_at IS NULL GROUP BY session_id);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_conversations_open_session ON conversations (session_id) WHERE closed_at IS NULL;
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    conversation_id TEXT NOT NULL,
+    sender TEXT NOT NULL,
+    message TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_messages_conversation ON messages (conversation_id, id);
+"""
+
+
+class ChatStore:
+    """Chats stored as appended rows, so saving and loading only touch new messages."""
+
+    def __init__(self, db_path: Path) -> None:
+        """Open (or create) the store in WAL mode so several sessions can read and write at once."""
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=10, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def conversation_id(self, session_id: str) -> str:
+        """Return the id of the open conversation of a session, starting one if there is none."""
+        row = self._open_conversation(session_id)
+        if row is not None:
+            return row[0]
+        # The customer and agent pages may both get here; the unique index lets only one insert win
+        self.conn.execute(
+            "INSERT OR IGNORE INTO conversations (conversation_id, session_id, started_at) VALUES (?, ?, ?)",
+            (secrets.token_hex(8), session_id, datetime.now(tz=UTC).isoformat()),
+        )
+        return self._open_conversation(session_id)[0]
+
+    def _open_conversation(self, session_id: str) -> tuple[str] | None:
+        """Return the row of the open conversation of a session, if any."""
+        return self.conn.execute(
+            "SELECT conversation_id FROM conversations WHERE session_id = ? AND closed_at IS NULL",
+            (session_id,),
+        ).fetchone()
+
+    def append(self, conversation_id: str, sender: str, message: str) -> int:
+        """Add one message and return its offset."""
+        cursor = self.conn.execute(
+            "INSERT INTO messages (conversation_id, sender, message, created_at) VALUES (?, ?, ?, ?)",
+            (conversation_id, sender, message, datetime.now(tz=UTC).isoformat()),
+        )
+        return cursor.lastrowid
+
+    def read_since(self, conversation_id: str, offset: int = 0) -> tuple[list[dict], int]:
+        """Messages added after an offset, and the offset to pass next time."""
+        rows = self.conn.execute(
+            "SELECT id, sender, message FROM messages WHERE conversation_id = ? AND id > ? ORDER BY id",
+            (conversation_id, offset),
+        ).fetchall()
+        messages = [{"sender": sender, "message": message} for _, sender, message in rows]
+        return messages, rows[-1][0] if rows else offset
+
+    def close(self, session_id: str) -> None:
+        """Close the open conversation of a session; the next call to conversation_id starts a new one."""
+        self.conn.execute(
+            "UPDATE conversations SET closed_at = ? WHERE session_id = ? AND closed_at IS NULL",
+            (datetime.now(tz=UTC).isoformat(), session_id),
+        )
@@ -0,0 +1,122 @@
+"""Local ZeroMQ pub/sub bus that pushes chat and insight updates to open sessions."""
+
+import contextlib
+import json
+import threading
+import time
+
+import zmq
+
+# Publishers connect to the XSUB side of the proxy, subscribers to the XPUB side
+PUBLISH_ADDRESS = "tcp://127.0.0.1:9997"
+SUBSCRIBE_ADDRESS = "tcp://127.0.0.1:9998"
+
+
+def _topic(topic: str) -> bytes:
+    """Topic frame, terminated so that ZeroMQ prefix matching does not mix up "ab" and "abc"."""
+    return f"{topic}|".encode()
+
+
+def bind_proxy(context: zmq.Context | None = None) -> tuple[zmq.Socket, zmq.Socket]:
+    """Bind both proxy sockets, raising zmq.ZMQError if another process already holds the addresses."""
+    context = context or zmq.Context.instance()
+    frontend = context.socket(zmq.XSUB)
+    backend = context.socket(zmq.XPUB)
+    try:
+        frontend.bind(PUBLISH_ADDRESS)
+        backend.bind(SUBSCRIBE_ADDRESS)
+    except zmq.ZMQError:
+        frontend.close(linger=0)
+        backend.close(linger=0)
+        raise
+    return frontend, backend
+
+
+def run_proxy(context: zmq.Context | None = None) -> None:
+    """Forward every published event to every subscriber; blocks forever."""
+    zmq.proxy(*bind_proxy(context))
+
+
+def start_proxy_thread() -> bool:
+    """Run the proxy in a daemon thread unless another process already does; returns whether it was started."""
+    # Bound here rather than in the thread, so a failure is reported instead of killing the thread silently
+    try:
+        sockets = bind_proxy()
+    except zmq.ZMQError:
+        return False
+    threading.Thread(target=zmq.proxy, args=sockets, name="event-bus-proxy", daemon=True).start()
+    return True
+
+
+class EventPublisher:
+    """Thread-safe publisher shared by all sessions of a Streamlit process."""
+
+    def __init__(self) -> None:
+        """Connect to the proxy once so later events are not lost while the connection is set up."""
+        self.socket = zmq.Context.instance().socket(zmq.PUB)
+        self.socket.connect(PUBLISH_ADDRESS)
+        self._lock = threading.Lock()
+
+    def publish(self, topic: str, event: dict) -> None:
+        """Send an event to every subscriber of a topic without blocking."""
+        with self._lock, contextlib.suppress(zmq.Again):
+            self.socket.send_multipart([_topic(topic), json.dumps(event).encode()], flags=zmq.NOBLOCK)
+
+
+class EventSubscriber:
+    """Subscription of one browser session to its own topic."""
+
+    def __init__(self, topic: str) -> None:
+        """Subscribe to the events of one topic."""
+        self.socket = zmq.Context.instance().socket(zmq.SUB)
+        self.socket.connect(SUBSCRIBE_ADDRESS)
+        self.socket.subscribe(_topic(topic))
+
+    def drain(self) -> list[dict]:
+        """Return every event received since the last call without waiting."""
+        events = []
+        while True:
+            try:
+                _, payload = self.socket.recv_multipart(flags=zmq.NOBLOCK)
+            except zmq.Again:
+                return events
+            events.append(json.loads(payload))
+
+    def close(self) -> None:
+        """Drop the subscription."""
+        self.socket.close(linger=0)
+
+
+class SubscriberPool:
+    """Subscribers of the open browser sessions of a Streamlit process.
+
+    Streamlit does not report closed sessions, so a subscriber nobody drained for
+    `idle_seconds` is closed; the session gets a new one if it polls again later.
+    """
+
+    def __init__(self, idle_seconds: float = 60.0) -> None:
+        """Initialize an empty pool."""
+        self.idle_seconds = idle_seconds
+        self._subscribers: dict[tuple[str, str], tuple[EventSubscriber, float]] = {}
+        self._lock = threading.Lock()
+
+    def drain(self, session_key: str, topic: str) -> list[dict]:
+        """Return the new events of a browser session's topic, subscribing on first use."""
+        now = time.monotonic()
+        # Sockets are not thread safe, so every use happens under the lock
+        with self._lock:
+            for key, (subscriber, last_used) in list(self._subscribers.items()):
+                if now - last_used > self.idle_seconds:
+                    subscriber.close()
+                    del self._subscribers[key]
+            subscriber, _ = self._subscribers.get((session_key, topic)) or (EventSubscriber(topic), now)
+            self._subscribers[session_key, topic] = (subscriber, now)
+            return subscriber.drain()
+
+    def __len__(self) -> int:
+        """Return the number of open subscribers."""
+        return len(self._subscribers)
+
+
+if __name__ == "__main__":
+    run_proxy()
@@ -0,0 +1,277 @@
+"""Analyze diarized call transcripts line by line while the call is happening."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import sys
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, TextIO
+
+from event_bus import EventPublisher
+from sentiment import BACKENDS
+from text_analyzer import ConversationAnalyzer
+from text_to_json import RunningTotals
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+READ_BYTES = 64 * 1024  # Largest read from a file or socket at a time
+MAX_LINE_BYTES = 16 * 1024  # Longer lines are cut so a missing newline cannot grow memory
+TOTALS_EVERY = 10  # Lines between running-totals events
+
+
+class LineSplitter:
+    """Split a byte stream into complete lines, keeping at most one partial line."""
+
+    def __init__(self) -> None:
+        """Start with no partial line."""
+        self.partial = b""
+
+    def feed(self, data: bytes) -> list[str]:
+        """Return the complete lines contained in the data received so far."""
+        *lines, self.partial = (self.partial + data).split(b"\n")
+        self.partial = self.partial[:MAX_LINE_BYTES]
+        return [line[:MAX_LINE_BYTES].decode(errors="replace").rstrip("\r") for line in lines]
+
+    def flush(self) -> list[str]:
+        """Return the last line, if the stream ended without a newline."""
+        rest, self.partial = self.partial, b""
+        return [rest.decode(errors="replace").rstrip("\r")] if rest else []
+
+
+def _open_file(path: Path) -> tuple[BinaryIO | None, int | None]:
+    """Open the file and note its inode, or return (None, None) while it does not exist."""
+    try:
+        handle = path.open("rb")
+    except FileNotFoundError:
+        return None, None
+    return handle, os.fstat(handle.fileno()).st_ino
+
+
+def _replaced(path: Path, handle: BinaryIO, inode: int | None) -> bool:
+    """Tell whether the file at `path` was rotated (a new inode) or truncated below the read position."""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return False
+    return stat.st_ino != inode or stat.st_size < handle.tell()
+
+
+def follow_file(path: Path, poll_seconds: float = 0.2, idle_exit: float | None = None) -> Iterator[list[str]]:
+    """Yield batches of lines appended to a file, reopening it when it is truncated or rotated.
+
+    Ends after `idle_exit` seconds without new lines, or never if it is None.
+    """
+    splitter = LineSplitter()
+    handle, inode = None, None
+    last_data = time.monotonic()
+    try:
+        while True:
+            if handle is None:
+                handle, inode = _open_file(path)
+            data = handle.read(READ_BYTES) if handle else b""
+            if data:
+                last_data = time.monotonic()
+                if lines := splitter.feed(data):
+                    yield lines
+                continue
+            if handle and _replaced(path, handle, inode):
+                # Finish the old file and start over on the new one
+                if lines := splitter.flush():
+                    yield lines
+                handle.close()
+                handle = None
+                continue
+            if idle_exit is not None and time.monotonic() - last_data > idle_exit:
+                break
+            time.sleep(poll_seconds)
+        if lines := splitter.flush():
+            yield lines
+    finally:
+        if handle:
+            handle.close()
+
+
+def socket_calls(host: str, port: int) -> Iterator[tuple[str, Iterator[list[str]]]]:
+    """Accept one connection per call and yield (call id, batches of lines) for each, in turn."""
+    with socket.create_server((host, port)) as server:
+        while True:
+            connection, (peer_host, peer_port) = server.accept()
+            yield f"{peer_host}:{peer_port}@{int(time.time())}", _receive_lines(connection)
+
+
+def _receive_lines(connection: socket.socket) -> Iterator[list[str]]:
+    """Batches of lines received on a connection until the sender closes it."""
+    splitter = LineSplitter()
+    with connection:
+        while data := connection.recv(READ_BYTES):
+            if lines := splitter.feed(data):
+                yield lines
+    if lines := splitter.flush():
+        yield lines
+
+
+@dataclass
+class AlertRules:
+    """When a live call raises alerts."""
+
+    agent_speaker: str = "SPEAKER_00"  # Diarization label of the agent; every other speaker is the customer
+    greeting_deadline: float = 30.0  # Seconds into the call by which the agent should have greeted
+    sentiment_window: int = 6  # Recent customer lines considered for the mood alert
+    negative_share: float = 0.5  # Share of negative lines in the window that raises it
+
+
+class LiveCall:
+    """Running compliance, PII and sentiment state of one call, independent of its length."""
+
+    def __init__(self, analyzer: ConversationAnalyzer, call_id: str, rules: AlertRules) -> None:
+        """Start an empty call."""
+        self.analyzer = analyzer
+        self.call_id = call_id
+        self.rules = rules
+        self.totals = RunningTotals()
+        self.recent_customer = deque(maxlen=rules.sentiment_window)
+        self.lines = 0
+        self.skipped = 0
+        self.elapsed = 0.0
+        self.customer_upset = False
+        self.greeting_alerted = False
+
+    def _event(self, event_type: str, **fields: object) -> dict:
+        """Event of this call at the current point in the call."""
+        return {"type": event_type, "call_id": self.call_id, "line_no": self.lines, "at": self.elapsed, **fields}
+
+    def _alert(self, alert: str, message: str, **fields: object) -> dict:
+        """Alert event meant for the agent."""
+        return self._event("alert", alert=alert, message=message, **fields)
+
+    def feed(self, raw_lines: list[str]) -> list[dict]:
+        """Analyze a batch of diarized lines and return the events they cause."""
+        parsed = [self.analyzer.parse_structured_line(line) for line in raw_lines if line.strip()]
+        self.skipped += sum(line is None for line in parsed)
+        parsed = [line for line in parsed if line is not None]
+        if not parsed:
+            return []
+        events = []
+        analyses = self.analyzer.analyze_lines([line["text"] for line in parsed])
+        for line, analysis in zip(parsed, analyses, strict=True):
+            events.extend(self._observe(line, analysis))
+        return events
+
+    def _observe(self, line: dict, analysis: dict) -> list[dict]:
+        """Update the running state with one analyzed line."""
+        self.lines += 1
+        self.elapsed = line["end"]
+        role = "agent" if line["speaker"] == self.rules.agent_speaker else "customer"
+        self.totals.add(role, analysis)
+        events = [self._event(
+            "line",
+            start=line["start"],
+            speaker=line["speaker"],
+            role=role,
+            sentiment=analysis["sentiment"]["label"],
+            intents=[intent["intent"] for intent in analysis["intents"]],
+            issues=[issue["issue"] for issue in analysis["issues"]],
+            required_phrases=analysis["required_phrases"]["categories"],
+        )]
+
+        if role == "agent":
+            if analysis["personal_info"]["count"]:
+                categories = analysis["personal_info"]["categories"]
+                events.append(self._alert("pii", f"Agent shared personal information: {', '.join(categories)}", categories=categories))
+            if analysis["prohibited_phrases"]["count"]:
+                phrases = analysis["prohibited_phrases"]["phrases"]
+                events.append(self._alert("prohibited", f"Agent used prohibited language: {', '.join(phrases)}", phrases=phrases))
+        else:
+            self.recent_customer.append(analysis["sentiment"]["label"])
+            negative = self.recent_customer.count("negative")
+            upset = len(self.recent_customer) >= min(3, self.rules.sentiment_window) and (
+                negative / len(self.recent_customer) >= self.rules.negative_share
+            )
+            if upset and not self.customer_upset:
+                events.append(self._alert(
+                    "customer_negative", f"Customer was negative in {negative} of the last {len(self.recent_customer)} lines",
+                ))
+            self.customer_upset = upset
+
+        if not self.totals.greets["agent"] and not self.greeting_alerted and self.elapsed > self.rules.greeting_deadline:
+            self.greeting_alerted = True
+            events.append(self._alert("missing_greeting", f"No greeting from the agent in the first {self.rules.greeting_deadline:.0f}s"))
+        if self.lines % TOTALS_EVERY == 0:
+            events.append(self._event("totals", **self.totals.report()))
+        return events
+
+    def finish(self) -> list[dict]:
+        """Events for the end of the call: missing disclaimers or closings and the final totals."""
+        events = []
+        if not self.totals.disclaims["agent"]:
+            events.append(self._alert("missing_disclaimer", "The agent gave no disclaimer during the call"))
+        if not self.totals.closures["agent"]:
+            events.append(self._alert("missing_closing", "The agent did not close the call"))
+        events.append(self._event("end", skipped_lines=self.skipped, **self.totals.report()))
+        return events
+
+
+def jsonl_sink(out: TextIO = sys.stdout) -> Callable[[dict], None]:
+    """Write events as JSON lines."""
+    def emit(event: dict) -> None:
+        out.write(json.dumps(event) + "\n")
+        out.flush()
+    return emit
+
+
+def session_sink(session_id: str) -> Callable[[dict], None]:
+    """Push alerts to the Streamlit session opened with ?session=<id>."""
+    publisher = EventPublisher()
+
+    def emit(event: dict) -> None:
+        if event["type"] == "alert":
+            publisher.publish(session_id, {"type": "live_alert", "alert": event["alert"], "message": event["message"]})
+    return emit
+
+
+def run(args: argparse.Namespace) -> None:
+    """Analyze calls from a followed file or a socket and emit their events."""
+    analyzer = ConversationAnalyzer(args.patterns, args.sentiment)
+    rules = AlertRules(args.agent_speaker, args.greeting_deadline, args.sentiment_window, args.negative_share)
+    sinks = [jsonl_sink()]
+    if args.session:
+        sinks.append(session_sink(args.session))
+
+    calls = (
+        iter([(Path(args.file).name, follow_file(Path(args.file), idle_exit=args.idle_exit))])
+        if args.file
+        else socket_calls(args.host, args.port)
+    )
+    for call_id, batches in calls:
+        call = LiveCall(analyzer, call_id, rules)
+        for batch in batches:
+            for event in call.feed(batch):
+                for emit in sinks:
+                    emit(event)
+        for event in call.finish():
+            for emit in sinks:
+                emit(event)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream diarized call lines through the analyzer and emit live events.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--file", help="Transcript file to follow as it grows")
+    source.add_argument("--port", type=int, help="TCP port to accept calls on, one connection per call")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on with --port")
+    parser.add_argument("--idle-exit", type=float, default=None, help="End a followed file after this many idle seconds")
+    parser.add_argument("--patterns", default="patterns.yml", help="Pattern configuration file")
+    parser.add_argument("--sentiment", choices=list(BACKENDS), default="lexicon", help="Sentiment backend")
+    parser.add_argument("--session", help="Also push alerts to this UI session id")
+    parser.add_argument("--agent-speaker", default=AlertRules.agent_speaker, help="Diarization label of the agent")
+    parser.add_argument("--greeting-deadline", type=float, default=AlertRules.greeting_deadline)
+    parser.add_argument("--sentiment-window", type=int, default=AlertRules.sentiment_window)
+    parser.add_argument("--negative-share", type=float, default=AlertRules.negative_share)
+    run(parser.parse_args())
@@ -0,0 +1,101 @@
+"""Compiled keyword and PII matching built once from patterns.yml."""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+import ahocorasick
+
+if TYPE_CHECKING:
+    from patterns_config import PatternsConfigSchema
+
+STRUCTURED_LINE = re.compile(r"(\d+\.\d+)\s+(\d+\.\d+)\s+(SPEAKER_\d+)\s+(.*?)(?:\s+SENTIMENT:(\w+))?$")
+
+
+@dataclass
+class KeywordHits:
+    """Keyword groups found in one line, in config order."""
+
+    intents: list[str] = field(default_factory=list)
+    issues: list[str] = field(default_factory=list)
+    positive: bool = False
+    negative: bool = False
+    prohibited: list[str] = field(default_factory=list)
+
+
+class PatternEngine:
+    """One Aho-Corasick pass for every keyword group and a combined regex prefilter for PII."""
+
+    def __init__(self, config: PatternsConfigSchema) -> None:
+        """Build the automaton and compile the PII patterns."""
+        self.intent_order = list(config.IntentPatterns)
+        self.issue_order = list(config.IssuePatterns)
+        self.prohibited_order = list(dict.fromkeys(config.ProhibitedPhrases))
+
+        self.automaton = ahocorasick.Automaton()
+        keywords: dict[str, set[tuple[str, str]]] = {}
+        groups = [
+            *(("intent", name, words) for name, words in config.IntentPatterns.items()),
+            *(("issue", name, words) for name, words in config.IssuePatterns.items()),
+            *(("booster", name, words) for name, words in config.SentimentBoosters.items()),
+            ("prohibited", "", config.ProhibitedPhrases),
+        ]
+        for group, name, words in groups:
+            for word in words:
+                keywords.setdefault(word.lower(), set()).add((group, name))
+        for word, labels in keywords.items():
+            self.automaton.add_word(word, (word, frozenset(labels)))
+        if keywords:
+            self.automaton.make_automaton()
+
+        self.sensitive = {key: re.compile(pattern) for key, pattern in config.SensitiveInformationPatterns.items()}
+        self.personal = {key: re.compile(pattern) for key, pattern in config.PersonalInformationPatterns.items()}
+        # Lines that match none of the patterns (most of them) are rejected with a single search
+        self.pii_prefilter = re.compile("|".join(f"(?:{regex.pattern})" for regex in [*self.sensitive.values(), *self.personal.values()]))
+
+    def scan(self, text: str) -> KeywordHits:
+        """Find every keyword group in a line with one pass over its lowercased text."""
+        intents, issues, boosters, prohibited = set(), set(), set(), set()
+        text_lower = text.lower()
+        if len(self.automaton):
+            for _, (word, labels) in self.automaton.iter(text_lower):
+                for group, name in labels:
+                    if group == "intent":
+                        intents.add(name)
+                    elif group == "issue":
+                        issues.add(name)
+                    elif group == "booster":
+                        boosters.add(name)
+                    else:
+                        prohibited.add(word)
+        if prohibited:
+            # Prohibited phrases only count as whole words
+            words = set(text_lower.split())
+            prohibited &= words
+        return KeywordHits(
+            intents=[name for name in self.intent_order if name in intents],
+            issues=[name for name in self.issue_order if name in issues],
+            positive="positive" in boosters,
+            negative="negative" in boosters,
+            prohibited=[phrase for phrase in self.prohibited_order if phrase.lower() in prohibited],
+        )
+
+    def personal_info(self, text: str) -> list[str]:
+        """Categories of personal and sensitive information found in a line."""
+        if not self.pii_prefilter.search(text):
+            return []
+        categories = []
+        for key, regex in self.sensitive.items():
+            if (key != "atm_pin" and regex.search(text)) or (key == "atm_pin" and self._has_atm_pin(text)):
+                categories.append(key)
+        categories.extend(key for key, regex in self.personal.items() if regex.search(text))
+        return categories
+
+    def _has_atm_pin(self, text: str) -> bool:
+        """Whether a PIN-like number appears that is not part of other personal info patterns."""
+        return any(
+            not any(regex.search(pin) for regex in self.personal.values())
+            for pin in self.sensitive["atm_pin"].findall(text)
+        )
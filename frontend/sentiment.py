@@ -0,0 +1,164 @@
+"""Pluggable sentiment polarity backends for ConversationAnalyzer."""
+
+from __future__ import annotations
+
+import re
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+from pathlib import Path
+from string import ascii_lowercase
+from typing import Protocol
+
+import numpy as np
+import textblob
+from textblob import TextBlob
+
+LEXICON_PATH = Path(textblob.__file__).parent / "en" / "en-sentiment.xml"
+NEGATIONS = frozenset({"no", "not", "n't", "never"})
+NEGATION_FACTOR = -0.5  # "not good" is slightly bad, "not bad" slightly good
+EXCLAMATION_BOOST = 1.25
+# Words, with "n't" split off as its own token the way TextBlob's tokenizer does, and exclamation marks
+TOKEN = re.compile(r"[a-z]+(?=n't\b)|n't|[a-z][a-z'-]*|!")
+
+
+class SentimentBackend(Protocol):
+    """Scores the polarity (-1.0 to 1.0) of many lines at once."""
+
+    name: str
+
+    def polarities(self, texts: list[str]) -> np.ndarray:
+        """Polarity of every text, in order."""
+        ...
+
+
+class TextBlobBackend:
+    """TextBlob's pattern analyzer, one blob per line."""
+
+    name = "textblob"
+
+    def polarities(self, texts: list[str]) -> np.ndarray:
+        """Polarity of every text, in order."""
+        return np.array([TextBlob(text).sentiment.polarity for text in texts], dtype=float)
+
+
+class LexiconBackend:
+    """TextBlob's sentiment lexicon scored for a whole batch of lines with array operations.
+
+    Follows TextBlob's rules for plain text: known words are averaged, an adverb scales the
+    word after it, a negation up to one small word earlier flips and halves it, and "!"
+    boosts it. Emoticons are not scored. Only tokenizing and the word -> id lookup run per
+    token in Python.
+    """
+
+    name = "lexicon"
+
+    def __init__(self, path: Path = LEXICON_PATH) -> None:
+        """Build the token -> polarity/intensity lookup arrays from the lexicon XML."""
+        senses: dict[str, dict[str | None, list[tuple[float, float]]]] = defaultdict(lambda: defaultdict(list))
+        for word in ET.parse(path).getroot().iter("word"):  # noqa: S314
+            if form := word.get("form"):
+                senses[form][word.get("pos")].append((float(word.get("polarity", 0.0)), float(word.get("intensity", 1.0))))
+
+        # Average the senses of each part of speech, then the parts of speech
+        lexicon = {
+            form: (*np.mean([np.mean(scores, axis=0) for scores in by_pos.values()], axis=0), "RB" in by_pos)
+            for form, by_pos in senses.items()
+        }
+        # Like TextBlob, derive adverbs from adjectives: "terrible" -> "terribly", "happy" -> "happily"
+        for form, by_pos in senses.items():
+            if "JJ" in by_pos:
+                stem = form[:-1] + "i" if form.endswith("y") else form
+                stem = stem.removesuffix("le")
+                lexicon[stem + "ly"] = (*np.mean(by_pos["JJ"], axis=0), True)
+
+        # Id 0 is "unknown word"; known words, negations, single letters ("not a good") and "!" get their own ids
+        vocabulary = [*sorted({*lexicon, *NEGATIONS, *ascii_lowercase}), "!"]
+        self.ids = {word: index for index, word in enumerate(vocabulary, start=1)}
+        size = len(vocabulary) + 1
+        self.polarity = np.zeros(size)
+        self.intensity = np.ones(size)
+        self.known = np.zeros(size, dtype=bool)
+        self.modifier = np.zeros(size, dtype=bool)
+        self.negation = np.zeros(size, dtype=bool)
+        self.small = np.zeros(size, dtype=bool)
+        for word, (polarity, intensity, modifier) in lexicon.items():
+            index = self.ids[word]
+            self.polarity[index], self.intensity[index] = polarity, intensity
+            self.known[index] = True
+            self.modifier[index] = modifier
+        for word, index in self.ids.items():
+            self.negation[index] = word in NEGATIONS
+            self.small[index] = len(word.strip("'")) <= 1
+        self.exclamation = self.ids["!"]
+
+    def token_ids(self, texts: list[str]) -> tuple[np.ndarray, np.ndarray]:
+        """Token ids of all texts concatenated, and the line number of every token."""
+        ids = self.ids
+        tokens = [[ids.get(token, 0) for token in TOKEN.findall(text.lower())] for text in texts]
+        lengths = np.fromiter((len(line) for line in tokens), dtype=np.int64, count=len(tokens))
+        flat = np.fromiter((token for line in tokens for token in line), dtype=np.int64, count=int(lengths.sum()))
+        return flat, np.repeat(np.arange(len(texts)), lengths)
+
+    def polarities(self, texts: list[str]) -> np.ndarray:
+        """Polarity of every text, in order."""
+        if not texts:
+            return np.zeros(0)
+        flat, line = self.token_ids(texts)
+        if not flat.size:
+            return np.zeros(len(texts))
+
+        def shift(values: np.ndarray, steps: int, *, fill: float) -> np.ndarray:
+            """values[t - steps] (or values[t + |steps|] if negative) within the same line, else `fill`."""
+            shifted = np.full_like(values, fill)
+            same_line = np.zeros(len(line), dtype=bool)
+            if steps > 0:
+                shifted[steps:] = values[:-steps]
+                same_line[steps:] = line[steps:] == line[:-steps]
+            else:
+                shifted[:steps] = values[-steps:]
+                same_line[:steps] = line[:steps] == line[-steps:]
+            return np.where(same_line, shifted, fill)
+
+        known = self.known[flat]
+        negation = self.negation[flat]
+        modifier = self.modifier[flat] & known
+        intensity = self.intensity[flat]
+        # "not good", "not a good", "not very good"
+        negated = shift(negation, 1, fill=False) | (shift(negation, 2, fill=False) & shift(self.small[flat] | modifier, 1, fill=False))
+        # A known adverb scales the word after it ("very good", and "really not good")
+        # and the two count once; a negated adverb divides instead ("not very good")
+        after_modifier = known & shift(modifier, 1, fill=False)
+        across_negation = known & ~after_modifier & shift(modifier, 2, fill=False) & shift(negation & ~known, 1, fill=False)
+        modifier_intensity = np.where(negated, 1.0 / intensity, intensity)
+        scale = np.where(after_modifier, shift(modifier_intensity, 1, fill=1.0), np.where(across_negation, shift(intensity, 2, fill=1.0), 1.0))
+        score = np.clip(self.polarity[flat] * scale, -1.0, 1.0)
+        negated = (negated & ~after_modifier) | (after_modifier & shift(negated, 1, fill=False)) | across_negation
+        counted = known & ~shift(after_modifier, -1, fill=False) & ~shift(across_negation, -2, fill=False)
+
+        # "!" boosts the last scored word before it on the line
+        positions = np.arange(len(flat))
+        last_known = np.maximum.accumulate(np.where(counted, positions, -1))
+        exclaimed = (flat == self.exclamation) & (last_known >= 0)
+        targets = last_known[exclaimed]
+        targets = targets[line[targets] == line[exclaimed]]
+        boosts = np.bincount(targets, minlength=len(flat))
+        score = np.clip(score * EXCLAMATION_BOOST**boosts, -1.0, 1.0)
+        score = np.where(negated, score * NEGATION_FACTOR, score)
+
+        totals = np.bincount(line, weights=np.where(counted, score, 0.0), minlength=len(texts))
+        counts = np.bincount(line, weights=counted.astype(float), minlength=len(texts))
+        return np.divide(totals, counts, out=np.zeros(len(texts)), where=counts > 0)
+
+
+BACKENDS: dict[str, type[SentimentBackend]] = {
+    TextBlobBackend.name: TextBlobBackend,
+    LexiconBackend.name: LexiconBackend,
+}
+
+
+def get_backend(name: str) -> SentimentBackend:
+    """Instantiate the sentiment backend registered under a name."""
+    if name not in BACKENDS:
+        error_msg = f"Unknown sentiment backend {name!r}; choose from {', '.join(BACKENDS)}"
+        raise ValueError(error_msg)
+    return BACKENDS[name]()
@@ -3,26 +3,50 @@
 from __future__ import annotations
 
 import re
-
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+import yaml
+from loguru import logger
+from pattern_engine import STRUCTURED_LINE, KeywordHits, PatternEngine
 from patterns_config import load_patterns_config
-from rapidfuzz import fuzz
-from textblob import TextBlob
+from rapidfuzz import fuzz, process
+from sentiment import get_backend
+
+if TYPE_CHECKING:
+    from patterns_config import PatternsConfigSchema
 
 config_path =  "patterns.yml"
 
 FUZZ_THRESHOLD = 55  # Fuzzy matching threshold for required phrases
 POSITIVE_THRESHOLD = 0.1
 NEGATIVE_THRESHOLD = -0.1
+RELOAD_CHECK_SECONDS = 2.0  # How often patterns.yml is checked for changes
+REQUIRED_CATEGORIES = {"greetings": "Greetings", "disclaimers": "Disclaimers", "closing_statements": "Closing_Statements"}
 
 
 
 class ConversationAnalyzer:
     """Analyze customer service conversations."""
 
-    def __init__(self, config_path: str = config_path) -> None:
+    def __init__(self, config_path: str = config_path, sentiment_backend: str = "textblob") -> None:
         """Initialize with config and load NLP models."""
-        # Load configuration
-        self.config = load_patterns_config(config_path)
+        self.sentiment = get_backend(sentiment_backend)
+        self.config_path = Path(config_path)
+        self._config_mtime = self.config_path.stat().st_mtime
+        self._next_reload_check = time.monotonic() + RELOAD_CHECK_SECONDS
+        # Bumped on every (re)load so results cached under older patterns are not reused
+        self.patterns_version = 0
+        self._load(load_patterns_config(self.config_path))
+
+    def _load(self, config: PatternsConfigSchema) -> None:
+        """Take patterns from a config and build the matching engine from them."""
+        # Built first: an invalid regex raises before any of the current patterns are replaced
+        engine = PatternEngine(config)
+        self.config = config
+        self.patterns_version += 1
         self.prohibited_phrases = self.config.ProhibitedPhrases
         self.greetings = self.config.Greetings
         self.disclaimers = self.config.Disclaimers
@@ -32,21 +56,68 @@ class ConversationAnalyzer:
         self.intent_patterns = self.config.IntentPatterns
         self.issue_patterns = self.config.IssuePatterns
         self.sentiment_boosters = self.config.SentimentBoosters
+        self.engine = engine
+        # Required phrases of all categories side by side, for batch scoring
+        self.required_phrases = [*self.greetings, *self.disclaimers, *self.closing_statements]
+        bounds = np.cumsum([0, len(self.greetings), len(self.disclaimers), len(self.closing_statements)])
+        self.required_slices = {
+            "greetings": slice(bounds[0], bounds[1]),
+            "disclaimers": slice(bounds[1], bounds[2]),
+            "closing_statements": slice(bounds[2], bounds[3]),
+        }
+
+    def reload_if_changed(self, *, force: bool = False) -> bool:
+        """Rebuild the matching engine if patterns.yml changed; checked at most every few seconds unless forced."""
+        now = time.monotonic()
+        if now < self._next_reload_check and not force:
+            return False
+        self._next_reload_check = now + RELOAD_CHECK_SECONDS
+        try:
+            mtime = self.config_path.stat().st_mtime
+        except OSError as e:
+            # e.g. an editor replacing the file; the next check sees the new one
+            logger.warning("Cannot check {} for changes: {}", self.config_path, e)
+            return False
+        if mtime == self._config_mtime:
+            return False
+        # Recorded before loading, so an invalid file is only read again once it changes
+        self._config_mtime = mtime
+        try:
+            config = load_patterns_config(self.config_path)
+            if isinstance(config, Exception):
+                raise config
+            self._load(config)
+        except (ValueError, yaml.YAMLError, KeyError, TypeError, re.error, OSError) as e:
+            logger.warning("Keeping the current patterns, {} is invalid: {}", self.config_path, e)
+            return False
+        return True
 
     def analyze_line(self, line: str) -> dict:
         """Analyze a single line of conversation (structured or plain text)."""
-        # Parse structured line if it matches the pattern
-        parsed = self.parse_structured_line(line)
-        speaker = parsed["speaker"] if parsed else None
-        text = parsed["text"] if parsed else line
-
-        # Perform all analyses
-        sentiment = self.analyze_sentiment(text)
-        intents = self.detect_intents(text)
-        issues = self.detect_issues(text)
-        req_phrases = self.detect_required_phrases(text)
+        return self.analyze_lines([line])[0]
+
+    def analyze_lines(self, lines: list[str]) -> list[dict]:
+        """Analyze many lines, scoring required phrases and sentiment for all of them in one batch."""
+        self.reload_if_changed()
+        # Parse structured lines if they match the pattern
+        parsed_lines = [self.parse_structured_line(line) for line in lines]
+        texts = [parsed["text"] if parsed else line for parsed, line in zip(parsed_lines, lines, strict=True)]
+        req_phrases = self.detect_required_phrases_batch(texts)
+        polarities = self.sentiment.polarities(texts)
+        return [
+            self._analyze_text(text, parsed["speaker"] if parsed else None, phrases, polarity)
+            for parsed, text, phrases, polarity in zip(parsed_lines, texts, req_phrases, polarities, strict=True)
+        ]
+
+    def _analyze_text(self, text: str, speaker: str | None, req_phrases: dict, polarity: float) -> dict:
+        """Run the per-line analyses on the text of one line."""
+        # Perform all analyses, scanning for every keyword group once
+        hits = self.engine.scan(text)
+        sentiment = self.analyze_sentiment(text, hits, polarity)
+        intents = self.detect_intents(text, hits)
+        issues = self.detect_issues(text, hits)
         pil_info = self.detect_personal_info(text)
-        prohibited = self.detect_prohibited_phrases(text)
+        prohibited = self.detect_prohibited_phrases(text, hits)
 
         return {
             "text": text,
@@ -61,10 +132,7 @@ class ConversationAnalyzer:
 
     def parse_structured_line(self, line: str) -> dict | None:
         """Parse structured transcript line."""
-        pattern = (
-            r"(\d+\.\d+)\s+(\d+\.\d+)\s+(SPEAKER_\d+)\s+(.*?)(?:\s+SENTIMENT:(\w+))?$"
-        )
-        if match := re.match(pattern, line.strip()):
+        if match := STRUCTURED_LINE.match(line.strip()):
             return {
                 "start": float(match.group(1)),
                 "end": float(match.group(2)),
@@ -74,63 +142,54 @@ class ConversationAnalyzer:
             }
         return None
 
-    def analyze_sentiment(self, text: str) -> dict:
+    def analyze_sentiment(self, text: str, hits: KeywordHits | None = None, polarity: float | None = None) -> dict:
         """Hybrid sentiment analysis."""
-        # TextBlob analysis
-        analysis = TextBlob(text)
-        polarity = analysis.sentiment.polarity
+        # Lexicon polarity from the configured backend, unless already scored in a batch
+        if polarity is None:
+            polarity = self.sentiment.polarities([text])[0]
+        polarity = float(polarity)
+        method = self.sentiment.name
 
         # Apply keyword boosts
-        text_lower = text.lower()
-        pos_boost = any(
-            word in text_lower for word in self.sentiment_boosters["positive"]
-        )
-        neg_boost = any(
-            word in text_lower for word in self.sentiment_boosters["negative"]
-        )
+        hits = hits or self.engine.scan(text)
+        pos_boost, neg_boost = hits.positive, hits.negative
 
         if pos_boost:
             return {
                 "label": "positive",
                 "score": min(1.0, polarity + 0.3),
-                "method": "textblob+keywords",
+                "method": f"{method}+keywords",
             }
         if neg_boost:
             return {
                 "label": "negative",
                 "score": min(1.0, abs(polarity) + 0.3),
-                "method": "textblob+keywords",
+                "method": f"{method}+keywords",
             }
         if polarity > POSITIVE_THRESHOLD:
-            return {"label": "positive", "score": polarity, "method": "textblob"}
+            return {"label": "positive", "score": polarity, "method": method}
         if polarity < NEGATIVE_THRESHOLD:
-            return {"label": "negative", "score": abs(polarity), "method": "textblob"}
-        return {"label": "neutral", "score": 0.5, "method": "textblob"}
+            return {"label": "negative", "score": abs(polarity), "method": method}
+        return {"label": "neutral", "score": 0.5, "method": method}
 
-    def detect_intents(self, text: str) -> list[dict]:
+    def detect_intents(self, text: str, hits: KeywordHits | None = None) -> list[dict]:
         """Hybrid intent detection."""
-        text_lower = text.lower()
-        intents = []
+        hits = hits or self.engine.scan(text)
 
         # Keyword matching
-        for intent, keywords in self.intent_patterns.items():
-            if any(keyword in text_lower for keyword in keywords):
-                intents.append({"intent": intent, "score": 0.8, "method": "keywords"})
+        intents = [{"intent": intent, "score": 0.8, "method": "keywords"} for intent in hits.intents]
 
         if intents:
             return intents
 
         return [{"intent": "general", "score": 0.5, "method": "fallback"}]
 
-    def detect_issues(self, text: str) -> list[dict]:
+    def detect_issues(self, text: str, hits: KeywordHits | None = None) -> list[dict]:
         """Hybrid issue detection."""
-        text_lower = text.lower()
-        issues = []
+        hits = hits or self.engine.scan(text)
 
         # Keyword matching
-        for issue, phrases in self.issue_patterns.items():
-            if any(phrase in text_lower for phrase in phrases):
-                issues.append({"issue": issue, "score": 0.8, "method": "keywords"})
+        issues = [{"issue": issue, "score": 0.8, "method": "keywords"} for issue in hits.issues]
 
         if issues:
             return issues
@@ -140,76 +199,33 @@ class ConversationAnalyzer:
 
     def detect_required_phrases(self, text: str) -> dict:
         """Detect required phrases (greetings, disclaimers, closings)."""
-        greets, disclaims, closures, phrase_cat = 0, 0, 0, []
-
-        for greet in self.greetings:
-            if fuzz.token_sort_ratio(text, greet) > FUZZ_THRESHOLD:
-                greets = 1
-                phrase_cat.append("Greetings")
-                break
-
-        for disclaim in self.disclaimers:
-            if fuzz.token_sort_ratio(text, disclaim) > FUZZ_THRESHOLD:
-                disclaims = 1
-                phrase_cat.append("Disclaimers")
-                break
-
-        for closure in self.closing_statements:
-            if fuzz.token_sort_ratio(text, closure) > FUZZ_THRESHOLD:
-                closures = 1
-                phrase_cat.append("Closing_Statements")
-                break
-
-        return {
-            "greetings": greets,
-            "disclaimers": disclaims,
-            "closing_statements": closures,
-            "categories": phrase_cat,
-        }
+        return self.detect_required_phrases_batch([text])[0]
+
+    def detect_required_phrases_batch(self, texts: list[str]) -> list[dict]:
+        """Detect required phrases for many lines with one multi-threaded score matrix."""
+        if not texts:
+            return []
+        scores = process.cdist(
+            texts,
+            self.required_phrases,
+            scorer=fuzz.token_sort_ratio,
+            score_cutoff=FUZZ_THRESHOLD,
+            workers=-1 if len(texts) > 1 else 1,
+        )
+        hits = {name: (scores[:, cols] > FUZZ_THRESHOLD).any(axis=1) for name, cols in self.required_slices.items()}
+        results = []
+        for row in range(len(texts)):
+            result = {name: int(hits[name][row]) for name in REQUIRED_CATEGORIES}
+            result["categories"] = [label for name, label in REQUIRED_CATEGORIES.items() if result[name]]
+            results.append(result)
+        return results
 
     def detect_personal_info(self, text: str) -> dict:
         """Detect personal/sensitive information."""
-        pil_present, pil_cat = 0, []
-
-        # Check sensitive info patterns
-        for key, pattern in self.sensitive_info_patterns.items():
-            if (key != "atm_pin" and re.search(pattern, text)) or (
-                key == "atm_pin" and self._is_valid_atm_pin(text)
-            ):
-                pil_present += 1
-                pil_cat.append(key)
-
-        # Check personal info patterns
-        for key, pattern in self.personal_info_patterns.items():
-            if re.search(pattern, text):
-                pil_present += 1
-                pil_cat.append(key)
-
-        return {"count": pil_present, "categories": pil_cat}
-
-    def _is_valid_atm_pin(self, text: str) -> bool:
-        """Check if text contains a valid ATM PIN that's not part of other patterns."""
-        potential_pins = re.findall(self.sensitive_info_patterns["atm_pin"], text)
-
-        for pin in potential_pins:
-            # Check if this isn't part of other personal info patterns
-            is_personal = any(
-                re.search(pattern, pin)
-                for pattern in self.personal_info_patterns.values()
-            )
-            if not is_personal:
-                return True
-        return False
-
-    def detect_prohibited_phrases(self, text: str) -> dict:
-        """Detect prohibited phrases/profanity."""
-        words_count, prohibited_words = 0, []
-        text_lower = text.lower()
-        text_words = text_lower.split()
-
-        for phrase in self.prohibited_phrases:
-            if phrase in text_lower and phrase in text_words:
-                words_count += 1
-                prohibited_words.append(phrase)
+        pil_cat = self.engine.personal_info(text)
+        return {"count": len(pil_cat), "categories": pil_cat}
 
-        return {"count": words_count, "phrases": prohibited_words}
+    def detect_prohibited_phrases(self, text: str, hits: KeywordHits | None = None) -> dict:
+        """Detect prohibited phrases/profanity."""
+        prohibited_words = (hits or self.engine.scan(text)).prohibited
+        return {"count": len(prohibited_words), "phrases": prohibited_words}
@@ -2,8 +2,17 @@
 
 from __future__ import annotations
 
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
 from text_analyzer import ConversationAnalyzer
 
+MAX_CONVERSATIONS = 256  # Conversations whose running totals are kept
+MAX_MEMO_LINES = 10_000  # Per-message analyses kept by content hash
+
 
 class AnalyzerSingleton:
     """Singleton to manage the shared analyzer instance."""
@@ -23,110 +32,152 @@ def init_analyzer() -> None:
     AnalyzerSingleton.get_analyzer()
 
 
-def textual_analysis(text: list) -> dict:
-    """Perform text analysis using the pre-initialized analyzer."""
+def _sentiment_buckets() -> dict[str, int]:
+    """Zeroed sentiment counters."""
+    return {"positive": 0, "neutral": 0, "negative": 0}
+
+
+def _digest(text: str) -> str:
+    """Content hash used to recognize messages already analyzed."""
+    return hashlib.sha1(text.encode(), usedforsecurity=False).hexdigest()
+
+
+@dataclass
+class RunningTotals:
+    """Rule-compliance counters of the messages analyzed so far."""
+
+    greets: dict[str, int] = field(default_factory=lambda: {"customer": 0, "agent": 0})
+    disclaims: dict[str, int] = field(default_factory=lambda: {"customer": 0, "agent": 0})
+    closures: dict[str, int] = field(default_factory=lambda: {"customer": 0, "agent": 0})
+    pil: dict[str, int] = field(default_factory=lambda: {"customer": 0, "agent": 0})
+    prohibited_words: dict[str, int] = field(default_factory=lambda: {"customer": 0, "agent": 0})
+    sentiment_counts: dict[str, dict[str, int]] = field(
+        default_factory=lambda: {"Net": _sentiment_buckets(), "Customer": _sentiment_buckets(), "Agent": _sentiment_buckets()},
+    )
+
+    def add(self, speaker: str | None, text_analysis: dict) -> None:
+        """Count one analyzed message."""
+        side = "customer" if speaker == "customer" else "agent"
+        self.greets[side] += text_analysis["required_phrases"]["greetings"]
+        self.disclaims[side] += text_analysis["required_phrases"]["disclaimers"]
+        self.closures[side] += text_analysis["required_phrases"]["closing_statements"]
+        self.pil[side] += text_analysis["personal_info"]["count"]
+        self.prohibited_words[side] += text_analysis["prohibited_phrases"]["count"]
+
+        # Net count of sentiments
+        sentiment = text_analysis["sentiment"]["label"]
+        if sentiment in self.sentiment_counts["Net"]:
+            self.sentiment_counts["Net"][sentiment] += 1
+            if speaker == "customer":
+                self.sentiment_counts["Customer"][sentiment] += 1
+            elif speaker == "agent":
+                self.sentiment_counts["Agent"][sentiment] += 1
+
+    def report(self) -> dict:
+        """Totals in the layout shown in the Transcript Analysis tab."""
+        return {
+            "Total Sentiment" : dict(self.sentiment_counts["Net"]),
+            "Customer Sentiment" : dict(self.sentiment_counts["Customer"]),
+            "Agent Sentiment" : dict(self.sentiment_counts["Agent"]),
+            "Total Greeting made by Agent": self.greets["agent"],
+            "Total Disclaimer made by Agent": self.disclaims["agent"],
+            "Total Closures made by Agent": self.closures["agent"],
+            "Total PII violations made by Agent": self.pil["agent"],
+            "Total prohibited word used by Agent": self.prohibited_words["agent"],
+        }
+
+
+@dataclass
+class ConversationState:
+    """What has been analyzed of one conversation."""
+
+    patterns_version: int
+    message_hashes: list[str] = field(default_factory=list)
+    totals: RunningTotals = field(default_factory=RunningTotals)
+
+
+class IncrementalAnalysis:
+    """Analyze only the messages appended since the last call for a conversation."""
+
+    def __init__(self) -> None:
+        """Initialize empty conversation states and message memo."""
+        self.conversations: OrderedDict[str, ConversationState] = OrderedDict()
+        self.memo: OrderedDict[tuple[int, str], dict] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _analyze(self, analyzer: ConversationAnalyzer, version: int, texts: list[str]) -> list[dict]:
+        """Analyze messages, reusing results for texts seen before.
+
+        The lock is only held to read and update the memo, so conversations are analyzed concurrently.
+        """
+        keys = [(version, _digest(text)) for text in texts]
+        with self.lock:
+            known = {key: self.memo[key] for key in keys if key in self.memo}
+        missing = dict(zip(keys, texts, strict=True))
+        for key in known:
+            del missing[key]
+        if missing:
+            known.update(zip(missing, analyzer.analyze_lines(list(missing.values())), strict=True))
+        with self.lock:
+            for key in keys:
+                self.memo[key] = known[key]
+                self.memo.move_to_end(key)
+            while len(self.memo) > MAX_MEMO_LINES:
+                self.memo.popitem(last=False)
+        return [known[key] for key in keys]
+
+    def run(self, analyzer: ConversationAnalyzer, messages: list[tuple[str | None, str]], conversation_id: str | None) -> dict:
+        """Update the running totals of a conversation with its new messages and report them."""
+        with self.lock:
+            analyzer.reload_if_changed()
+            version = analyzer.patterns_version
+            hashes = [_digest(f"{speaker}\0{text}") for speaker, text in messages]
+            state = self.conversations.get(conversation_id) if conversation_id else None
+            if (
+                state is None
+                or state.patterns_version != version
+                or hashes[: len(state.message_hashes)] != state.message_hashes
+            ):
+                # New conversation, changed patterns, or edited history: start over
+                state = ConversationState(version)
+
+        new_messages = messages[len(state.message_hashes):]
+        # Build on a copy so a concurrent call for the same conversation never sees half-added totals
+        totals = copy.deepcopy(state.totals)
+        for (speaker, _), text_analysis in zip(new_messages, self._analyze(analyzer, version, [text for _, text in new_messages]), strict=True):
+            totals.add(speaker, text_analysis)
+
+        with self.lock:
+            if conversation_id:
+                self.conversations[conversation_id] = ConversationState(version, hashes, totals)
+                self.conversations.move_to_end(conversation_id)
+                while len(self.conversations) > MAX_CONVERSATIONS:
+                    self.conversations.popitem(last=False)
+        return totals.report()
+
+
+incremental_analysis = IncrementalAnalysis()
+
+
+def textual_analysis(text: list, conversation_id: str | None = None) -> dict:
+    """Perform text analysis using the pre-initialized analyzer.
+
+    With a conversation id, only messages added since the previous call are analyzed.
+    """
     init_analyzer()
     analyzer = AnalyzerSingleton.get_analyzer()
     if analyzer is None:
         error_msg = "Analyzer not initialized. Call init_analyzer() first."
         raise RuntimeError(error_msg)
 
-    conversation = []
-    (
-        total_greets_c,
-        total_disclaims_c,
-        total_closures_c,
-        total_pil_c,
-        total_prohibited_words_c,
-    ) = 0, 0, 0, 0, 0
-    (
-        total_greets_a,
-        total_disclaims_a,
-        total_closures_a,
-        total_pil_a,
-        total_prohibited_words_a,
-    ) = 0, 0, 0, 0, 0
-    speaker, main_text, text_analysis = None, None, None
-    intent_cat_score, issue_cat_score = None, None
-    sentiment_counts = {
-        "speakers": {
-            "Net": {"positive": 0, "neutral": 0, "negative": 0},
-            "Handler": {"positive": 0, "neutral": 0, "negative": 0},
-            "Client": {"positive": 0, "neutral": 0, "negative": 0},
-        },
-    }
-
+    messages = []
+    speaker, main_text = None, None
     for key_val in text:
         for key, val in key_val.items():
             if key == "sender":
                 speaker = val
             else:
                 main_text = val
-                text_analysis = analyzer.analyze_line(main_text)
+        messages.append((speaker, main_text))
 
-        sentiment = text_analysis["sentiment"]["label"]
-        new_pil, pil_cat = (
-            text_analysis["personal_info"]["count"],
-            text_analysis["personal_info"]["categories"],
-        )
-        prohibited_words_count, prohibited_words = (
-            text_analysis["prohibited_phrases"]["count"],
-            text_analysis["prohibited_phrases"]["phrases"],
-        )
-        new_greets, new_disclaims, new_closures = (
-            text_analysis["required_phrases"]["greetings"],
-            text_analysis["required_phrases"]["disclaimers"],
-            text_analysis["required_phrases"]["closing_statements"],
-        )
-        req_phrase_cat = text_analysis["required_phrases"]["categories"]
-        intent_cat_score = [(i["intent"], i["score"]) for i in text_analysis["intents"]]
-        issue_cat_score = [(i["issue"], i["score"]) for i in text_analysis["issues"]]
-
-        if speaker == "customer":
-            total_greets_c, total_disclaims_c, total_closures_c = (
-                total_greets_c + new_greets,
-                total_disclaims_c + new_disclaims,
-                total_closures_c + new_closures,
-            )
-            total_pil_c = total_pil_c + new_pil
-            total_prohibited_words_c += prohibited_words_count
-        else:
-            total_greets_a, total_disclaims_a, total_closures_a = (
-                total_greets_a + new_greets,
-                total_disclaims_a + new_disclaims,
-                total_closures_a + new_closures,
-            )
-            total_pil_a = total_pil_a + new_pil
-            total_prohibited_words_a += prohibited_words_count
-
-        # Net count of sentiments
-        if sentiment in sentiment_counts["speakers"]["Net"]:
-            sentiment_counts["speakers"]["Net"][sentiment] += 1
-            if speaker == "customer":
-                sentiment_counts["speakers"]["Handler"][sentiment] += 1
-            elif speaker == "agent":
-                sentiment_counts["speakers"]["Client"][sentiment] += 1
-
-        conversation.append(
-            {
-                "speaker": speaker,
-                "text": main_text,
-                "sentiment": sentiment,
-                "req_phrase_cat": req_phrase_cat,
-                "pil_category": pil_cat,
-                "prohibited_words": prohibited_words,
-                "Intent_cat_score": intent_cat_score,
-                "Issue_cat_score": issue_cat_score,
-            },
-        )
-
-    return {
-        "Total Sentiment" : sentiment_counts["speakers"]["Net"],
-        "Customer Sentiment" : sentiment_counts["speakers"]["Client"],
-        "Agent Sentiment" : sentiment_counts["speakers"]["Handler"],
-        "Total Greeting made by Agent": total_greets_a,
-        "Total Disclaimer made by Agent": total_disclaims_a,
-        "Total Closures made by Agent": total_closures_a,
-        "Total PII violations made by Agent": total_pil_a,
-        "Total prohibited word used by Agent": total_prohibited_words_a,
-    }
+    return incremental_analysis.run(analyzer, messages, conversation_id)
@@ -0,0 +1,168 @@
+"""Indexed SQLite store for support tickets."""
+
+import argparse
+import json
+import sqlite3
+import sys
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import TextIO
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tickets (
+    ticket_id TEXT PRIMARY KEY,
+    priority INTEGER NOT NULL,
+    ticket_title TEXT NOT NULL DEFAULT '',
+    summary TEXT NOT NULL DEFAULT '',
+    category TEXT NOT NULL DEFAULT '',
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tickets_category ON tickets (category, created_at);
+CREATE INDEX IF NOT EXISTS idx_tickets_priority ON tickets (priority, created_at);
+CREATE INDEX IF NOT EXISTS idx_tickets_created ON tickets (created_at);
+CREATE TABLE IF NOT EXISTS migrations (
+    name TEXT PRIMARY KEY
+);
+"""
+
+# Ticket JSON keys (as written by the UI) -> table columns
+FIELDS = {
+    "ticket_id": "ticket_id",
+    "priority": "priority",
+    "ticket_title": "ticket_title",
+    "Summary": "summary",
+    "Category": "category",
+    "Creation Datetime": "created_at",
+}
+COLUMNS = ", ".join(FIELDS.values())
+EXPORT_CHUNK = 500
+
+
+def to_row(ticket: dict) -> tuple:
+    """Table row for a ticket dict."""
+    return tuple(int(ticket[key]) if key == "priority" else str(ticket.get(key, "")) for key in FIELDS)
+
+
+def to_ticket(row: tuple) -> dict:
+    """Ticket dict, in the UI's JSON layout, for a table row."""
+    return {key: str(value) if key == "priority" else value for key, value in zip(FIELDS, row, strict=True)}
+
+
+class TicketStore:
+    """Tickets in one SQLite file with indexes on category, priority and creation time."""
+
+    def __init__(self, db_path: Path) -> None:
+        """Open (or create) the store."""
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=10)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def add(self, ticket: dict) -> None:
+        """Insert or replace one ticket."""
+        self.add_many([ticket])
+
+    def add_many(self, tickets: Iterable[dict]) -> int:
+        """Insert or replace many tickets in one transaction; returns how many were written."""
+        with self.conn:
+            cursor = self.conn.executemany(
+                f"INSERT OR REPLACE INTO tickets ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",  # noqa: S608
+                (to_row(ticket) for ticket in tickets),
+            )
+        return cursor.rowcount
+
+    def _where(self, category: str | None, priority: int | None, since: str | None, until: str | None) -> tuple[str, list]:
+        """WHERE clause and parameters for the given filters."""
+        conditions, params = [], []
+        for column, operator, value in [
+            ("category", "=", category), ("priority", "=", priority), ("created_at", ">=", since), ("created_at", "<", until),
+        ]:
+            if value is not None:
+                conditions.append(f"{column} {operator} ?")
+                params.append(value)
+        return (" WHERE " + " AND ".join(conditions)) if conditions else "", params
+
+    def query(  # noqa: PLR0913
+        self,
+        *,
+        category: str | None = None,
+        priority: int | None = None,
+        since: str | None = None,
+        until: str | None = None,
+        page: int = 1,
+        page_size: int = 50,
+    ) -> list[dict]:
+        """One page of tickets, newest first."""
+        where, params = self._where(category, priority, since, until)
+        rows = self.conn.execute(
+            f"SELECT {COLUMNS} FROM tickets{where} ORDER BY created_at DESC, ticket_id LIMIT ? OFFSET ?",  # noqa: S608
+            [*params, page_size, (page - 1) * page_size],
+        ).fetchall()
+        return [to_ticket(row) for row in rows]
+
+    def count(self, *, category: str | None = None, priority: int | None = None, since: str | None = None, until: str | None = None) -> int:
+        """Return the number of tickets matching the filters."""
+        where, params = self._where(category, priority, since, until)
+        return self.conn.execute(f"SELECT COUNT(*) FROM tickets{where}", params).fetchone()[0]  # noqa: S608
+
+    def counts_by_category(self) -> dict[str, int]:
+        """Ticket count per category."""
+        rows = self.conn.execute("SELECT category, COUNT(*) FROM tickets GROUP BY category ORDER BY COUNT(*) DESC").fetchall()
+        return dict(rows)
+
+    def iter_all(self) -> Iterator[dict]:
+        """Every ticket, oldest first, read in chunks so memory stays flat."""
+        cursor = self.conn.execute(f"SELECT {COLUMNS} FROM tickets ORDER BY created_at, ticket_id")  # noqa: S608
+        while rows := cursor.fetchmany(EXPORT_CHUNK):
+            yield from (to_ticket(row) for row in rows)
+
+    def export(self, out: TextIO) -> int:
+        """Write every ticket as one JSON line; returns how many were written."""
+        written = 0
+        for ticket in self.iter_all():
+            out.write(json.dumps(ticket) + "\n")
+            written += 1
+        return written
+
+    def migrate_json_dir(self, ticket_dir: Path) -> int:
+        """Import the per-ticket JSON files of a directory once; later calls do nothing."""
+        name = f"json:{ticket_dir.resolve()}"
+        if self.conn.execute("SELECT 1 FROM migrations WHERE name = ?", (name,)).fetchone():
+            return 0
+        tickets = (json.loads(path.read_text()) for path in sorted(ticket_dir.glob("*.json")))
+        imported = self.add_many(tickets)
+        with self.conn:
+            self.conn.execute("INSERT INTO migrations (name) VALUES (?)", (name,))
+        return imported
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query and maintain the ticket store.")
+    parser.add_argument("--db", default="ticket_log/tickets.db", help="Path to the ticket database")
+    commands = parser.add_subparsers(dest="command", required=True)
+    migrate = commands.add_parser("migrate", help="Import ticket_log/*.json files")
+    migrate.add_argument("--dir", default="ticket_log", help="Directory of ticket JSON files")
+    listing = commands.add_parser("list", help="Print one page of tickets")
+    listing.add_argument("--category")
+    listing.add_argument("--priority", type=int)
+    listing.add_argument("--since", help="Earliest creation datetime, e.g. 20250418_000000")
+    listing.add_argument("--until", help="Latest creation datetime (exclusive)")
+    listing.add_argument("--page", type=int, default=1)
+    listing.add_argument("--page-size", type=int, default=50)
+    commands.add_parser("counts", help="Print ticket counts per category")
+    commands.add_parser("export", help="Write all tickets as JSON lines to stdout")
+    args = parser.parse_args()
+
+    store = TicketStore(Path(args.db))
+    if args.command == "migrate":
+        print(f"Imported {store.migrate_json_dir(Path(args.dir))} tickets")  # noqa: T201
+    elif args.command == "list":
+        tickets = store.query(
+            category=args.category, priority=args.priority, since=args.since, until=args.until, page=args.page, page_size=args.page_size,
+        )
+        for ticket in tickets:
+            print(json.dumps(ticket))  # noqa: T201
+    elif args.command == "counts":
+        print(json.dumps(store.counts_by_category(), indent=2))  # noqa: T201
+    else:
+        store.export(sys.stdout)
@@ -0,0 +1 @@
+"""Tests for the frontend analysis modules."""
@@ -0,0 +1,37 @@
+"""Check that uv.lock is in step with the dependencies declared in pyproject.toml."""
+
+import re
+import tomllib
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+REQUIREMENT = re.compile(r"(?P<name>[A-Za-z0-9._-]+)(?:\[(?P<extras>[^\]]*)\])?(?P<specifier>.*)")
+
+
+def _declared(requirements: list[str]) -> set[tuple[str, tuple[str, ...], str]]:
+    """Name, extras and version specifier of each pyproject.toml requirement."""
+    declared = set()
+    for requirement in requirements:
+        match = REQUIREMENT.fullmatch(requirement.replace(" ", ""))
+        extras = tuple(sorted(filter(None, (match["extras"] or "").split(","))))
+        declared.add((match["name"].lower().replace("_", "-"), extras, match["specifier"]))
+    return declared
+
+
+def _locked(requirements: list[dict]) -> set[tuple[str, tuple[str, ...], str]]:
+    """Name, extras and version specifier of each requirement recorded in uv.lock."""
+    return {(item["name"], tuple(sorted(item.get("extras", []))), item.get("specifier", "")) for item in requirements}
+
+
+def test_lock_matches_pyproject() -> None:
+    """A dependency change must come with `uv lock`, or `uv sync --locked` fails for everyone else."""
+    pyproject = tomllib.loads((ROOT / "pyproject.toml").read_text(encoding="utf-8"))
+    lock = tomllib.loads((ROOT / "uv.lock").read_text(encoding="utf-8"))
+    project = next(package for package in lock["package"] if package["name"] == pyproject["project"]["name"])
+    metadata = project["metadata"]
+
+    assert _locked(metadata["requires-dist"]) == _declared(pyproject["project"]["dependencies"])
+    groups = pyproject.get("dependency-groups", {})
+    assert {name: _locked(items) for name, items in metadata.get("requires-dev", {}).items()} == {
+        name: _declared(items) for name, items in groups.items()
+    }
@@ -0,0 +1,65 @@
+"""Tests for reloading patterns.yml in ConversationAnalyzer."""
+
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+from text_analyzer import ConversationAnalyzer
+
+PATTERNS = Path(__file__).resolve().parent.parent / "patterns.yml"
+
+
+def _save(analyzer: ConversationAnalyzer, content: str) -> None:
+    """Rewrite the analyzer's patterns file with a later mtime, even within the same clock tick."""
+    analyzer.config_path.write_text(content, encoding="utf-8")
+    mtime_ns = int((analyzer._config_mtime + 1) * 1_000_000_000)  # noqa: SLF001
+    os.utime(analyzer.config_path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def analyzer(tmp_path: Path) -> ConversationAnalyzer:
+    """Analyzer reading a private copy of the bundled patterns."""
+    config = tmp_path / "patterns.yml"
+    shutil.copy(PATTERNS, config)
+    return ConversationAnalyzer(str(config))
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        PATTERNS.read_text(encoding="utf-8") + "\nbad: [unclosed\n",  # YAML syntax error
+        "other: {}\n",  # missing patterns key
+        "- just\n- a list\n",  # not a mapping
+        PATTERNS.read_text(encoding="utf-8").replace("personal_info_patterns:\n", "personal_info_patterns:\n    broken: '(unclosed'\n", 1),
+    ],
+    ids=["yaml-error", "missing-key", "not-a-mapping", "bad-regex"],
+)
+def test_invalid_patterns_keep_current_ones(analyzer: ConversationAnalyzer, content: str) -> None:
+    """A bad edit is logged and skipped; analysis keeps working with the previous patterns."""
+    version, engine = analyzer.patterns_version, analyzer.engine
+    _save(analyzer, content)
+
+    assert analyzer.reload_if_changed(force=True) is False
+    assert analyzer.analyze_line("hello")["text"] == "hello"
+    assert (analyzer.patterns_version, analyzer.engine) == (version, engine)
+    # The failed file is not read again until it changes
+    assert analyzer.reload_if_changed(force=True) is False
+
+
+def test_missing_file_keeps_current_patterns(analyzer: ConversationAnalyzer) -> None:
+    """The file briefly missing during an atomic save does not break analysis."""
+    analyzer.config_path.unlink()
+    assert analyzer.reload_if_changed(force=True) is False
+    assert analyzer.analyze_line("hello")["text"] == "hello"
+
+
+def test_fixed_file_is_loaded(analyzer: ConversationAnalyzer) -> None:
+    """Once the file is valid again the new patterns are used."""
+    _save(analyzer, "bad: [unclosed\n")
+    analyzer.reload_if_changed(force=True)
+
+    _save(analyzer, PATTERNS.read_text(encoding="utf-8"))
+    version = analyzer.patterns_version
+    assert analyzer.reload_if_changed(force=True) is True
+    assert analyzer.patterns_version == version + 1
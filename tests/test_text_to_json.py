@@ -0,0 +1,25 @@
+"""Tests for the running rule-compliance totals."""
+
+from text_to_json import RunningTotals
+
+
+def _analysis(label: str) -> dict:
+    """Analysis of a line with the given sentiment and no rule hits."""
+    return {
+        "required_phrases": {"greetings": 0, "disclaimers": 0, "closing_statements": 0},
+        "personal_info": {"count": 0},
+        "prohibited_phrases": {"count": 0},
+        "sentiment": {"label": label},
+    }
+
+
+def test_sentiment_is_reported_for_the_speaker() -> None:
+    """Customer lines count towards customer sentiment and agent lines towards agent sentiment."""
+    totals = RunningTotals()
+    totals.add("agent", _analysis("positive"))
+    totals.add("customer", _analysis("negative"))
+
+    report = totals.report()
+    assert report["Customer Sentiment"] == {"positive": 0, "neutral": 0, "negative": 1}
+    assert report["Agent Sentiment"] == {"positive": 1, "neutral": 0, "negative": 0}
+    assert report["Total Sentiment"] == {"positive": 1, "neutral": 0, "negative": 1}
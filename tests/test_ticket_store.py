@@ -0,0 +1,57 @@
+"""Tests for the ticket store and its command line."""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from ticket_store import TicketStore
+
+TICKET_STORE = Path(__file__).resolve().parent.parent / "frontend" / "ticket_store.py"
+
+
+def _ticket(ticket_id: str, priority: int, category: str, created_at: str) -> dict:
+    """Ticket in the layout the UI writes."""
+    return {
+        "ticket_id": ticket_id,
+        "priority": str(priority),
+        "ticket_title": f"Ticket {ticket_id}",
+        "Summary": "",
+        "Category": category,
+        "Creation Datetime": created_at,
+    }
+
+
+@pytest.fixture
+def db_path(tmp_path: Path) -> Path:
+    """Database with tickets in two categories and priorities, one per day."""
+    path = tmp_path / "tickets.db"
+    TicketStore(path).add_many([
+        _ticket("a", 1, "Fraud and Security", "20250418_090000"),
+        _ticket("b", 2, "Card Services", "20250419_090000"),
+        _ticket("c", 1, "Fraud and Security", "20250420_090000"),
+        _ticket("d", 3, "Card Services", "20250421_090000"),
+    ])
+    return path
+
+
+def test_query_filters_and_pages(db_path: Path) -> None:
+    """Filters combine, results are newest first and pages do not overlap."""
+    store = TicketStore(db_path)
+
+    assert [t["ticket_id"] for t in store.query(category="Fraud and Security")] == ["c", "a"]
+    assert [t["ticket_id"] for t in store.query(priority=1, since="20250419_000000")] == ["c"]
+    assert [t["ticket_id"] for t in store.query(until="20250420_000000")] == ["b", "a"]
+    assert [t["ticket_id"] for t in store.query(page=2, page_size=3)] == ["a"]
+    assert store.count(category="Card Services", priority=3) == 1
+
+
+def test_cli_list(db_path: Path) -> None:
+    """`list` passes its filters to the store and prints one JSON ticket per line."""
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, str(TICKET_STORE), "--db", str(db_path), "list", "--category", "Card Services", "--page-size", "1"],
+        capture_output=True, check=True, text=True,
+    )
+
+    assert [json.loads(line) for line in result.stdout.splitlines()] == [_ticket("d", 3, "Card Services", "20250421_090000")]
@@ -0,0 +1,84 @@
+"""Measure log pipeline throughput in messages per second."""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from config_types import LoggingConfigs
+from logging_client import setup_network_logger_client
+from loguru import logger
+
+SERVER_SCRIPT = Path(__file__).with_name("logging_server.py")
+
+
+def count_lines(path: Path) -> int:
+    """Lines written to the log file so far."""
+    if not path.exists():
+        return 0
+    with path.open("rb") as file:
+        return sum(chunk.count(b"\n") for chunk in iter(lambda: file.read(1 << 20), b""))
+
+
+def wait_for_lines(path: Path, expected: int, idle_timeout: float) -> int:
+    """Wait until the file holds `expected` lines or stops growing; returns the line count."""
+    written, last_change = count_lines(path), time.monotonic()
+    while written < expected and time.monotonic() - last_change < idle_timeout:
+        time.sleep(0.05)
+        now_written = count_lines(path)
+        if now_written != written:
+            written, last_change = now_written, time.monotonic()
+    return written
+
+
+def run(args: argparse.Namespace) -> dict[str, float]:
+    """Start a log server, log `args.messages` records through the client and time both ends."""
+    configs = LoggingConfigs.load_from_path(args.config_file_path)
+    with tempfile.TemporaryDirectory() as tmp:
+        log_file = Path(tmp) / "bench.txt"
+        overrides = configs.model_dump() | {"log_server_port": args.port, "log_file_name": str(log_file), "log_rotation": ""}
+        config_file = Path(tmp) / "configs.toml"
+        config_file.write_text("".join(f"{key} = {json.dumps(value)}\n" for key, value in overrides.items()))
+        server = subprocess.Popen([sys.executable, str(SERVER_SCRIPT), "--config_file_path", str(config_file)])  # noqa: S603
+        try:
+            sink = setup_network_logger_client(LoggingConfigs.model_validate(overrides), logger)
+            time.sleep(args.warmup)  # Let the connection come up
+
+            start = time.perf_counter()
+            for index in range(args.messages):
+                logger.info("benchmark message {} with some payload text", index)
+            client_seconds = time.perf_counter() - start
+            sink.close()
+            written = wait_for_lines(log_file, args.messages, idle_timeout=2.0)
+            total_seconds = time.perf_counter() - start
+        finally:
+            server.terminate()
+            server.wait()
+
+    stats = sink.stats()
+    return {
+        "messages": args.messages,
+        "client_seconds": round(client_seconds, 3),
+        "client_messages_per_second": round(args.messages / client_seconds, 1),
+        "end_to_end_seconds": round(total_seconds, 3),
+        "end_to_end_messages_per_second": round(written / total_seconds, 1),
+        "sent": stats["sent"],
+        "dropped": stats["dropped"],
+        "written": written,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the batched log pipeline.")
+    parser.add_argument(
+        "--config_file_path",
+        default=str(Path.cwd() / "unified_logging" / "configs.toml"),
+        help="Path to the logging configuration file",
+    )
+    parser.add_argument("--messages", type=int, default=200_000, help="Records to log")
+    parser.add_argument("--port", type=int, default=9989, help="Port for the benchmark's own log server")
+    parser.add_argument("--warmup", type=float, default=0.5, help="Seconds to wait for the connection first")
+    print(json.dumps(run(parser.parse_args()), indent=2))  # noqa: T201
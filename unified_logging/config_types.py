@@ -25,6 +25,19 @@ class LoggingConfigs(BaseModel):
     log_rotation: str = "00:00"
     log_file_name: str = "logs/logs.txt"
     log_compression: str = "zip"
+    # JSON records (time, level, message, source location and bound extras such as trace_id) instead of formatted text
+    log_structured: bool = True
+    # Client: records buffered while the shipping thread is behind; more are dropped and counted
+    log_buffer_size: int = 10000
+    # Client: records per multipart message, and the longest a record waits for its batch
+    log_batch_size: int = 256
+    log_flush_interval: float = 0.2
+    # Batches ZeroMQ queues per socket before the client drops and the server stops reading
+    log_send_hwm: int = 1000
+    log_receive_hwm: int = 1000
+    # Server: batches received per file write, and the size of the file write buffer in bytes
+    log_drain_batches: int = 64
+    log_write_buffer: int = 65536
 
     @staticmethod
     def load_from_path(file_path: str) -> "LoggingConfigs":
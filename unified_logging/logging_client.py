@@ -3,32 +3,154 @@ from __future__ import (
     annotations,
 )
 
+import atexit
+import json
+import threading
+import traceback
+from collections import deque
 from typing import TYPE_CHECKING
 
 import zmq
-from zmq.log.handlers import PUBHandler
 
 if TYPE_CHECKING:
     from config_types import LoggingConfigs
-    from loguru import Logger
+    from loguru import Logger, Message, Record
 
 
-def setup_network_logger_client(
-    logging_configs: LoggingConfigs, logger: Logger,
-) -> None:
-    """Client logger setup."""
-    zmq_socket = zmq.Context().socket(zmq.PUB)
+def structured_record(record: Record, service: str | None = None) -> str:
+    """One loguru record as a JSON object, with its bound extras (trace_id, span, duration_ms, ...) as fields."""
+    entry = {
+        "time": record["time"].isoformat(timespec="milliseconds"),
+        "level": record["level"].name,
+        "service": service,
+        "message": record["message"],
+        "module": record["module"],
+        "function": record["function"],
+        "line": record["line"],
+        **record["extra"],
+    }
+    if record["exception"] is not None:
+        entry["exception"] = "".join(traceback.format_exception(*record["exception"]))
+    return json.dumps(entry, default=str)
+
+
+class BatchingLogSink:
+    """Loguru sink that buffers records and ships them in batches over a PUSH socket.
+
+    Logging never blocks: records beyond the buffer, and batches the socket cannot queue
+    because the server is slow or down, are dropped and counted instead.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self, address: str, *, buffer_size: int, batch_size: int, flush_interval: float, send_hwm: int, service: str | None = None, structured: bool = False,
+    ) -> None:
+        """Connect the socket and start the thread that sends the batches; structured sinks send JSON records."""
+        self.service = service
+        self.structured = structured
+        self.buffer_size = buffer_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.socket = zmq.Context.instance().socket(zmq.PUSH)
+        self.socket.setsockopt(zmq.SNDHWM, send_hwm)
+        self.socket.connect(address)
+        self._buffer: deque[tuple[str, str]] = deque()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self.sent = 0
+        self.dropped = 0
+        self._reported_drops = 0
+        self._thread = threading.Thread(target=self._run, name="log-shipper", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def __call__(self, message: Message) -> None:
+        """Buffer one formatted record."""
+        with self._lock:
+            if len(self._buffer) >= self.buffer_size:
+                self.dropped += 1
+                return
+            text = structured_record(message.record, self.service) if self.structured else str(message)
+            self._buffer.append((message.record["level"].name, text))
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def _take(self) -> list[tuple[str, str]]:
+        """Remove up to one batch of records from the buffer."""
+        with self._lock:
+            return [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+
+    def _send(self, batch: list[tuple[str, str]]) -> None:
+        """Send a batch as one multipart message of alternating level and text frames."""
+        if self.dropped > self._reported_drops:
+            # Let the log file show that records are missing
+            batch.append(("WARNING", f"Log client dropped {self.dropped - self._reported_drops} records (buffer or socket full)"))
+            self._reported_drops = self.dropped
+        frames = [part.encode() for record in batch for part in record]
+        try:
+            self.socket.send_multipart(frames, flags=zmq.NOBLOCK)
+        except zmq.Again:
+            with self._lock:
+                self.dropped += len(batch)
+        else:
+            self.sent += len(batch)
 
-    zmq_socket.connect(f"tcp://127.0.0.1:{logging_configs.log_server_port}")
-    handler = PUBHandler(zmq_socket)
+    def flush(self) -> None:
+        """Send everything buffered so far; only called from the shipping thread or after it stopped."""
+        while batch := self._take():
+            self._send(batch)
+
+    def _run(self) -> None:
+        """Send batches when one is full or the flush interval has passed."""
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def stats(self) -> dict[str, int]:
+        """Return records sent, dropped and still buffered."""
+        return {"sent": self.sent, "dropped": self.dropped, "buffered": len(self._buffer)}
+
+    def close(self, linger_ms: int = 1000) -> None:
+        """Stop the shipping thread, send what is left and close the socket."""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join()
+        self.flush()
+        self.socket.close(linger=linger_ms)
+
+
+# One sink per server address, so repeated setup (e.g. Streamlit reruns) reuses its socket and thread
+_sinks: dict[str, BatchingLogSink] = {}
+
+
+def setup_network_logger_client(
+    logging_configs: LoggingConfigs, logger: Logger, service: str | None = None,
+) -> BatchingLogSink:
+    """Client logger setup; returns the sink, whose stats() count sent and dropped records."""
+    address = f"tcp://127.0.0.1:{logging_configs.log_server_port}"
+    if address not in _sinks:
+        _sinks[address] = BatchingLogSink(
+            address,
+            buffer_size=logging_configs.log_buffer_size,
+            batch_size=logging_configs.log_batch_size,
+            flush_interval=logging_configs.log_flush_interval,
+            send_hwm=logging_configs.log_send_hwm,
+            service=service,
+            structured=logging_configs.log_structured,
+        )
+    sink = _sinks[address]
 
     # remove the previous settings so that it does not print in stderr and only to file
     logger.remove()
     logger.add(
-        handler,
+        sink,
         format=logging_configs.client_log_format,
-        enqueue=True,
         level=logging_configs.min_log_level,
         backtrace=True,  # Detailed error traces
         diagnose=True,  # Enable exception diagnostics
     )
+    return sink
@@ -1,44 +1,146 @@
 """Server side of logger."""
 
 import argparse
+import gzip
+import json
+import re
+import shutil
+import zipfile
+from datetime import datetime, timedelta
 from pathlib import Path
 
 import zmq
 from config_types import LoggingConfigs
 from loguru import logger
 
+LEVELS = {"TRACE": 5, "DEBUG": 10, "INFO": 20, "SUCCESS": 25, "WARNING": 30, "ERROR": 40, "CRITICAL": 50}
+SIZE_UNITS = {"B": 1, "KB": 1 << 10, "MB": 1 << 20, "GB": 1 << 30}
+POLL_MS = 1000
 
-def set_logging_configs(logging_configs: LoggingConfigs) -> None:
-    """Configure logger."""
-    logger.remove()
 
-    logger.add(
-        logging_configs.log_file_name,
-        rotation=logging_configs.log_rotation,  # Rotate at 00:00
-        compression=logging_configs.log_compression,  # Compress rotated files
-        format=logging_configs.server_log_format,
-        level=logging_configs.min_log_level,
-        enqueue=True,  # Thread-safe logging
-        backtrace=True,  # Detailed error traces
-        diagnose=True,  # Enable exception diagnostics
+class LogFile:
+    """Append-only log file written a batch at a time, with daily or size-based rotation."""
+
+    def __init__(self, path: Path, rotation: str, compression: str, write_buffer: int) -> None:
+        """Open the file; rotation is "HH:MM" (daily) or a size such as "100 MB"."""
+        self.path = path
+        self.compression = compression
+        self.write_buffer = write_buffer
+        self.max_bytes = None
+        self.rotation_time = None
+        self.rotate_at = None
+        if match := re.fullmatch(r"(\d+(?:\.\d+)?)\s*([KMG]?B)", rotation.strip(), re.IGNORECASE):
+            self.max_bytes = float(match[1]) * SIZE_UNITS[match[2].upper()]
+        elif match := re.fullmatch(r"(\d{1,2}):(\d{2})", rotation.strip()):
+            self.rotation_time = (int(match[1]), int(match[2]))
+            self.rotate_at = self._next_rotation(datetime.now().astimezone())
+        elif rotation:
+            error_msg = f"Unsupported log_rotation {rotation!r}; use 'HH:MM' or a size such as '100 MB'"
+            raise ValueError(error_msg)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = self.path.open("a", encoding="utf-8", buffering=write_buffer)
+
+    def _next_rotation(self, now: datetime) -> datetime:
+        """Next time of day at which the file is rotated."""
+        hour, minute = self.rotation_time
+        # Work on the wall clock and resolve the offset last, so a DST change does not shift the rotation
+        at = now.replace(hour=hour, minute=minute, second=0, microsecond=0, tzinfo=None)
+        if at.astimezone() <= now:
+            at += timedelta(days=1)
+        return at.astimezone()
+
+    def _should_rotate(self, now: datetime) -> bool:
+        """Whether the current file is due for rotation."""
+        if self.rotate_at is not None and now >= self.rotate_at:
+            self.rotate_at = self._next_rotation(now)
+            return True
+        return self.max_bytes is not None and self.file.tell() >= self.max_bytes
+
+    def _rotate(self, now: datetime) -> None:
+        """Rename the current file with a timestamp, compress it and start a new one."""
+        self.file.close()
+        rotated = self.path.with_name(f"{self.path.stem}.{now:%Y-%m-%d_%H-%M-%S_%f}{self.path.suffix}")
+        self.path.rename(rotated)
+        if self.compression == "zip":
+            with zipfile.ZipFile(f"{rotated}.zip", "w", zipfile.ZIP_DEFLATED) as archive:
+                archive.write(rotated, rotated.name)
+            rotated.unlink()
+        elif self.compression == "gz":
+            with rotated.open("rb") as source, gzip.open(f"{rotated}.gz", "wb") as target:
+                shutil.copyfileobj(source, target)
+            rotated.unlink()
+        self.file = self.path.open("a", encoding="utf-8", buffering=self.write_buffer)
+
+    def write_lines(self, lines: list[str]) -> None:
+        """Write formatted lines with one buffered write and flush them to the OS."""
+        if not lines:
+            return
+        now = datetime.now().astimezone()
+        if self._should_rotate(now):
+            self._rotate(now)
+        self.file.write("".join(lines))
+        self.file.flush()
+
+    def close(self) -> None:
+        """Flush and close the file."""
+        self.file.close()
+
+
+def open_log_file(logging_configs: LoggingConfigs) -> LogFile:
+    """Open the log file described by the configs."""
+    return LogFile(
+        Path(logging_configs.log_file_name),
+        rotation=logging_configs.log_rotation,
+        compression=logging_configs.log_compression,
+        write_buffer=logging_configs.log_write_buffer,
     )
 
 
-def start_logging_server(logging_configs: LoggingConfigs) -> None:
-    """Log Server Action."""
-    socket = zmq.Context().socket(zmq.SUB)
+def structured_line(level: str, message: str, now: datetime) -> str:
+    """Return a JSON record sent by a structured client as is, or wrap a plain text record into one."""
+    if message.startswith("{"):
+        return message
+    return json.dumps({"time": now.isoformat(timespec="milliseconds"), "level": level, "message": message})
+
+
+def format_records(frames: list[bytes], line_format: str, min_level: int, *, structured: bool = False) -> list[str]:
+    """Lines for one received batch of alternating level and text frames; JSON lines when structured."""
+    now = datetime.now().astimezone()
+    lines = []
+    for level_frame, text_frame in zip(frames[::2], frames[1::2], strict=False):
+        level = level_frame.decode("utf8").strip()
+        if LEVELS.get(level, min_level) < min_level:
+            continue
+        message = text_frame.decode("utf8", errors="replace").strip()
+        if structured:
+            lines.append(structured_line(level, message, now) + "\n")
+        else:
+            lines.append(line_format.format(level=level, message=message, time=now) + "\n")
+    return lines
+
+
+def start_logging_server(logging_configs: LoggingConfigs, log_file: LogFile | None = None) -> None:
+    """Log Server Action: drain the batches queued by all clients and write them together."""
+    log_file = log_file or open_log_file(logging_configs)
+    socket = zmq.Context.instance().socket(zmq.PULL)
+    socket.setsockopt(zmq.RCVHWM, logging_configs.log_receive_hwm)
     socket.bind(f"tcp://127.0.0.1:{logging_configs.log_server_port}")
-    socket.subscribe("")
+    min_level = LEVELS[logging_configs.min_log_level]
 
     while True:
         try:
-            ret_val = socket.recv_multipart()
-            log_level_name, message = ret_val
-
-            log_level_name = log_level_name.decode("utf8").strip()
-            message = message.decode("utf8").strip()
-
-            logger.log(log_level_name, message)
+            if not socket.poll(POLL_MS):
+                continue
+            lines = []
+            for _ in range(logging_configs.log_drain_batches):
+                try:
+                    frames = socket.recv_multipart(flags=zmq.NOBLOCK)
+                except zmq.Again:
+                    break
+                lines.extend(
+                    format_records(frames, logging_configs.server_log_format, min_level, structured=logging_configs.log_structured),
+                )
+            log_file.write_lines(lines)
 
         except Exception:  # noqa: BLE001
             logger.exception("Got an exception when logging: ")
@@ -55,5 +157,4 @@ if __name__ == "__main__":
 
     CONFIG_FILE_NAME = Path(args.config_file_path)
     logging_configs = LoggingConfigs.load_from_path(CONFIG_FILE_NAME)
-    set_logging_configs(logging_configs)
     start_logging_server(logging_configs)
@@ -0,0 +1,128 @@
+"""Rebuild per-request latency breakdowns from the structured log files."""
+
+import argparse
+import gzip
+import io
+import json
+import statistics
+import zipfile
+from collections import defaultdict
+from collections.abc import Iterator
+from datetime import datetime
+from pathlib import Path
+
+from config_types import LoggingConfigs
+
+
+def log_files(path: Path) -> list[Path]:
+    """Rotated (and possibly compressed) files of the log, oldest first, then the current file."""
+    rotated = sorted(path.parent.glob(f"{path.stem}.*"), key=lambda file: file.stat().st_mtime)
+    return [file for file in rotated if file != path] + ([path] if path.exists() else [])
+
+
+def read_lines(path: Path) -> Iterator[str]:
+    """Lines of a plain, zip or gzip log file."""
+    if path.suffix == ".zip":
+        with zipfile.ZipFile(path) as archive:
+            for name in archive.namelist():
+                with archive.open(name) as member:
+                    yield from io.TextIOWrapper(member, encoding="utf-8", errors="replace")
+    elif path.suffix == ".gz":
+        with gzip.open(path, "rt", encoding="utf-8", errors="replace") as file:
+            yield from file
+    else:
+        with path.open(encoding="utf-8", errors="replace") as file:
+            yield from file
+
+
+def traced_records(paths: list[Path]) -> dict[str, list[dict]]:
+    """JSON records that carry a trace id, grouped by trace in file order; text lines are skipped."""
+    traces: dict[str, list[dict]] = defaultdict(list)
+    for path in paths:
+        for line in read_lines(path):
+            if not line.startswith("{"):
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("trace_id"):
+                # Every record carries its UTC offset; naive times from older files are read as local time
+                record["at"] = datetime.fromisoformat(record["time"]).astimezone()
+                traces[record["trace_id"]].append(record)
+    return traces
+
+
+def spans(records: list[dict]) -> list[dict]:
+    """Span records with their start time; spans are logged when they end."""
+    return sorted(
+        (
+            {**record, "start": record["at"].timestamp() - record["duration_ms"] / 1000}
+            for record in records if "span" in record and "duration_ms" in record
+        ),
+        key=lambda record: record["start"],
+    )
+
+
+def details(record: dict) -> str:
+    """Extra fields of a span, such as the path, model or section."""
+    skip = {"time", "at", "start", "level", "service", "trace_id", "span", "duration_ms", "message", "module", "function", "line"}
+    return " ".join(f"{key}={value}" for key, value in record.items() if key not in skip and value is not None)
+
+
+def print_trace(trace_id: str, records: list[dict]) -> None:
+    """Timeline of one trace followed by the total time spent in each stage."""
+    timeline = spans(records)
+    if not timeline:
+        print(f"trace {trace_id}: {len(records)} records, no spans")  # noqa: T201
+        return
+    begin = timeline[0]["start"]
+    end = max(record["at"].timestamp() for record in timeline)
+    services = sorted({record.get("service") or "?" for record in timeline})
+    print(f"trace {trace_id}  {timeline[0]['at']:%Y-%m-%d %H:%M:%S}  {(end - begin) * 1000:.1f} ms  [{', '.join(services)}]")  # noqa: T201
+    print(f"  {'start ms':>10} {'ms':>10}  {'service':<18} {'span':<16} details")  # noqa: T201
+    for record in timeline:
+        print(  # noqa: T201
+            f"  {(record['start'] - begin) * 1000:>10.1f} {record['duration_ms']:>10.1f}  "
+            f"{record.get('service') or '?':<18} {record['span']:<16} {details(record)}",
+        )
+    stages: dict[str, list[float]] = defaultdict(list)
+    for record in timeline:
+        stages[record["span"]].append(record["duration_ms"])
+    breakdown = ", ".join(f"{name} {sum(values):.1f} ms x{len(values)}" for name, values in sorted(stages.items(), key=lambda item: -sum(item[1])))
+    print(f"  stages: {breakdown}\n")  # noqa: T201
+
+
+def print_stats(traces: dict[str, list[dict]]) -> None:
+    """Count, median, 95th percentile and max of every span per service across the traces."""
+    durations: dict[tuple[str, str], list[float]] = defaultdict(list)
+    for records in traces.values():
+        for record in spans(records):
+            durations[record.get("service") or "?", record["span"]].append(record["duration_ms"])
+    print(f"{'service':<18} {'span':<16} {'count':>7} {'p50 ms':>10} {'p95 ms':>10} {'max ms':>10}")  # noqa: T201
+    for (service, name), values in sorted(durations.items()):
+        p95 = statistics.quantiles(values, n=20, method="inclusive")[-1] if len(values) > 1 else values[0]
+        print(f"{service:<18} {name:<16} {len(values):>7} {statistics.median(values):>10.1f} {p95:>10.1f} {max(values):>10.1f}")  # noqa: T201
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show where the time of traced requests went.")
+    parser.add_argument(
+        "--config_file_path",
+        default=str(Path.cwd() / "unified_logging" / "configs.toml"),
+        help="Path to the logging configuration file",
+    )
+    parser.add_argument("--log_file", help="Log file to read instead of log_file_name from the configs (rotated files are included)")
+    parser.add_argument("--trace", help="Trace id (or its prefix) to show")
+    parser.add_argument("--last", type=int, default=5, help="Show the latest N traces")
+    parser.add_argument("--stats", action="store_true", help="Print per-span latency statistics over all traces instead")
+    args = parser.parse_args()
+
+    log_path = Path(args.log_file or LoggingConfigs.load_from_path(args.config_file_path).log_file_name)
+    traces = traced_records(log_files(log_path))
+    if args.stats:
+        print_stats(traces)
+    else:
+        selected = [trace_id for trace_id in traces if trace_id.startswith(args.trace)] if args.trace else list(traces)[-args.last:]
+        for trace_id in selected:
+            print_trace(trace_id, traces[trace_id])